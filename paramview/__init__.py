@@ -1,5 +1,21 @@
 """GUI for viewing the contents of a ParamDB database."""
 
-from paramview._server import start_server
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from paramview._server import start_server
 
 __all__ = ["start_server"]
+
+
+def __getattr__(name: str) -> Any:
+    # The server is imported when first used rather than when this package is imported,
+    # since it imports Flask, eventlet, and ParamDB, which are slow to import. This
+    # means the command line interface can parse arguments (e.g. --help) quickly.
+    if name == "start_server":
+        # pylint: disable-next=import-outside-toplevel
+        from paramview._server import start_server as _start_server
+
+        return _start_server
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
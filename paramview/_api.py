@@ -1,31 +1,360 @@
 """Flask blueprint for the backend API."""
 
 from __future__ import annotations
-import os
+import json
+import hashlib
 import traceback
-from typing import Any, cast
-from werkzeug.exceptions import HTTPException
-from flask import Blueprint, Response, jsonify, has_app_context, current_app, request
-from paramdb import ParamDB, CommitEntry
+from functools import partial
+from typing import Any, Callable, Hashable, Iterator, TypeVar, cast
+from werkzeug.exceptions import HTTPException, BadRequest, NotFound
+from flask import Blueprint, Response, jsonify, has_app_context, current_app, request, g
+from paramview._database import ParamViewDB
+from paramview._cache import CommitCache, data_size
+from paramview._single_flight import SingleFlight
+from paramview._metrics import Metrics
+from paramview._compress import (
+    COMPRESSION_THRESHOLD,
+    accepted_encoding,
+    compress,
+    compress_response,
+)
+from paramview._offload import offload
+from paramview._profile import (
+    start_server_timing,
+    server_timing,
+    add_server_timing_header,
+)
+from paramview._subtree import parse_data_path, get_subtree, truncate
+from paramview._stream import (
+    STREAMING_THRESHOLD,
+    decompressed_size,
+    decompress,
+    iter_decompressed,
+)
 
 api = Blueprint("api", __name__, url_prefix="/api")
-"""Flask blueprint for the backend API."""
+"""
+Flask blueprint for the backend API. It is registered at ``/api`` for the only database
+if there is one, and at ``/db/<db_name>/api`` for each database (see
+``paramview._app.create_app()``).
+"""
 
 
 # pylint: disable-next=too-few-public-methods
 class _CurrentDB:
-    """Wrapper to get properties from the database for the current Flask app."""
+    """
+    Wrapper to get properties from the database for the current request. Methods are
+    called in the thread pool (see ``paramview._offload``), since they block on SQLite,
+    and timed for the ``Server-Timing`` header and metrics (if enabled).
+    """
 
     def __getattribute__(self, name: str) -> Any:
-        # Get attributes from the current Flask app's database, if available
-        if has_app_context():
-            db: ParamDB[Any] = current_app.config["db"]
-            return getattr(db, name)
+        # Get attributes from the current request's database, if available
+        if has_app_context() and "db_name" in g:
+            db: ParamViewDB = current_app.config["dbs"][g.db_name]
+            attr = getattr(db, name)
+            if not callable(attr):
+                return attr
+            metrics: Metrics | None = current_app.config["metrics"]
+            db_method = partial(_call_db, attr)
+            return db_method if metrics is None else metrics.timed(name, db_method)
         return super().__getattribute__(name)
 
 
-_current_db = cast(ParamDB[Any], _CurrentDB())
-"""Database for the current Flask app."""
+_current_db = cast(ParamViewDB, _CurrentDB())
+"""Database for the current request."""
+
+
+_T = TypeVar("_T")
+_D = TypeVar("_D", str, bytes)
+
+_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+"""Max age in seconds for responses that never change (one year)."""
+
+_DB_INDEPENDENT_ENDPOINTS = ("_metrics",)
+"""Endpoints that are not specific to a database, so can be requested at ``/api``."""
+
+
+def _call_db(method: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """
+    Call the given database method in the thread pool, timing it for the
+    ``Server-Timing`` header.
+    """
+    with server_timing("db"):
+        return offload(method, *args, **kwargs)
+
+
+def _serialize(func: Callable[..., _T], *args: Any) -> _T:
+    """
+    Call the given function, which decodes or encodes data, in the thread pool, timing
+    it for the ``Server-Timing`` header.
+    """
+    with server_timing("serialize"):
+        return offload(func, *args)
+
+
+def _int_arg(name: str) -> int | None:
+    """
+    Return the query parameter with the given name as a non-negative integer, or None if
+    it is not given. Raise a ``BadRequest`` error if it is not a non-negative integer.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        int_value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer, not '{value}'") from None
+    if int_value < 0:
+        raise BadRequest(f"{name} must be non-negative, not {int_value}")
+    return int_value
+
+
+def _commit_key(commit_id: int) -> tuple[str, int, float]:
+    """
+    Return a key identifying the given commit, consisting of the database name and the
+    commit's ID and timestamp. The timestamp is included because IDs can be reused if
+    commits are deleted from the database. Timestamps are cached until the database is
+    modified (see ``ParamViewDB.cached_commit_timestamp()``), so repeated requests for
+    the same commit do not access the database. Raise an ``IndexError`` if the commit
+    does not exist.
+    """
+    db: ParamViewDB = current_app.config["dbs"][g.db_name]
+    timestamp = db.cached_commit_timestamp(commit_id)
+    if timestamp is None:
+        file_version = db.file_version()
+        timestamp = _current_db.load_commit_entry(commit_id).timestamp.timestamp()
+        db.cache_commit_timestamp(commit_id, timestamp, file_version)
+    return g.db_name, commit_id, timestamp
+
+
+def _single_flight(key: Hashable, load: Callable[[], _T]) -> _T:
+    """
+    Return the result of ``load()``, sharing the result of a concurrent load with the
+    same key if there is one (see ``paramview._single_flight``). This is useful since
+    after a database update, every client requests the same data at once.
+    """
+    single_flight: SingleFlight = current_app.config["single_flight"]
+    return single_flight.do(key, load)
+
+
+def _load_and_cache(key: Hashable, load: Callable[[], _D]) -> _D:
+    """
+    Load data using ``load()`` and put it in the commit cache under the given key.
+    Concurrent requests share a single load.
+    """
+    commit_cache: CommitCache = current_app.config["commit_cache"]
+
+    def load_and_cache() -> _D:
+        loaded_data = load()
+        commit_cache.put(key, loaded_data)
+        return loaded_data
+
+    return _single_flight(key, load_and_cache)
+
+
+def _load_cached(key: Hashable, load: Callable[[], str]) -> str:
+    """
+    Return the JSON in the commit cache for the given key, or otherwise load it using
+    ``load()`` and cache it. Concurrent requests share a single load.
+    """
+    commit_cache: CommitCache = current_app.config["commit_cache"]
+    cached_json = commit_cache.get(key)
+    if cached_json is not None:
+        return cast(str, cached_json)
+    return _load_and_cache(key, load)
+
+
+def _load_json_body(commit_key: tuple[str, int, float]) -> str | Iterator[bytes]:
+    """
+    Load raw JSON data for the given commit to use as a response body, using the commit
+    cache if possible. If the data is at least ``STREAMING_THRESHOLD`` bytes, it is not
+    cached and is instead returned as an iterator over chunks of bytes that are
+    decompressed as the response is sent, so the full data is never held in memory.
+    Concurrent requests share a single load.
+    """
+    commit_cache: CommitCache = current_app.config["commit_cache"]
+    raw_json = commit_cache.get(commit_key)
+    if raw_json is not None:
+        return cast(str, raw_json)
+    _, commit_id, _ = commit_key
+
+    def load() -> str | bytes:
+        # Compressed data is returned for data that will be streamed, so that
+        # concurrent requests can share it while each getting their own iterator
+        compressed_data = _current_db.load_compressed(commit_id)
+        size = decompressed_size(compressed_data)
+        if size is None or size >= STREAMING_THRESHOLD:
+            return compressed_data
+        loaded_json = _serialize(decompress, compressed_data)
+        commit_cache.put(commit_key, loaded_json)
+        return loaded_json
+
+    body = _single_flight(("body", commit_key), load)
+    return iter_decompressed(body) if isinstance(body, bytes) else body
+
+
+def _parse_compressed(compressed_data: bytes) -> tuple[Any, int]:
+    """
+    Decompress and parse the given compressed JSON data, returning the parsed data and
+    its estimated size in bytes (see ``paramview._cache.data_size()``).
+    """
+    data = json.loads(decompress(compressed_data))
+    return data, data_size(data)
+
+
+def _load_parsed_data(commit_key: tuple[str, int, float]) -> Any:
+    """
+    Load and parse data for the given commit, using the commit cache if possible. The
+    parsed data is cached under its estimated size, since requests for subtrees of the
+    same commit usually come one after another. The raw JSON is not cached, so only the
+    parsed data counts towards the memory budget. Concurrent requests share a single
+    load.
+    """
+    commit_cache: CommitCache = current_app.config["commit_cache"]
+    parsed_key = ("parsed", commit_key)
+    data = commit_cache.get(parsed_key)
+    if data is not None:
+        return data
+    _, commit_id, _ = commit_key
+
+    def load() -> Any:
+        compressed_data = _current_db.load_compressed(commit_id)
+        loaded_data, size = _serialize(_parse_compressed, compressed_data)
+        commit_cache.put(parsed_key, loaded_data, size)
+        return loaded_data
+
+    return _single_flight(parsed_key, load)
+
+
+def _subtree_json(data: Any, path: list[str], depth: int | None) -> str:
+    """
+    Return JSON for the subtree of the given data at the given path, truncated to the
+    given depth if it is not None. Raise a ``NotFound`` error if the path does not
+    exist.
+    """
+    try:
+        subtree = get_subtree(data, path)
+    except (KeyError, IndexError) as exc:
+        raise NotFound(exc.args[0]) from None
+    if depth is not None:
+        subtree = truncate(subtree, depth)
+    return json.dumps(subtree, separators=(",", ":"))
+
+
+def _commit_etag(commit_key: tuple[str, int, float]) -> str:
+    """Return the entity tag for data from the commit with the given key."""
+    _, commit_id, timestamp = commit_key
+    return f"{commit_id}-{timestamp}"
+
+
+def _compress_json(raw_json: str, encoding: str) -> bytes:
+    """
+    Compress the given raw JSON using the given encoding in the thread pool, timing it
+    for the ``Server-Timing`` header.
+    """
+    with server_timing("compress"):
+        return offload(lambda: compress(raw_json.encode(), encoding))
+
+
+def _immutable_response(
+    etag: str, load_json: Callable[[], str | Iterator[bytes]]
+) -> Response:
+    """
+    Return a response for JSON data that never changes, with the given entity tag and
+    headers allowing it to be cached indefinitely. If the request has a matching
+    ``If-None-Match`` header, return an empty 304 response without calling
+    ``load_json``. If ``load_json`` returns an iterator, the response is streamed.
+
+    If the client accepts compression, the compressed JSON is cached in the commit cache
+    for each encoding, so the same data is only compressed once and ``load_json`` is not
+    called while it stays cached. (Streamed responses are compressed as they are sent by
+    ``paramview._compress.compress_response()``.)
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+    else:
+        commit_cache: CommitCache = current_app.config["commit_cache"]
+        encoding = accepted_encoding()
+        compressed_key = ("compressed", g.db_name, etag, encoding)
+        body: str | bytes | Iterator[bytes] | None = (
+            None if encoding is None else commit_cache.get(compressed_key)
+        )
+        if body is None:
+            body = load_json()
+            if (
+                encoding is not None
+                and isinstance(body, str)
+                and len(body) >= COMPRESSION_THRESHOLD
+            ):
+                raw_json = body
+                body = _load_and_cache(
+                    compressed_key, lambda: _compress_json(raw_json, encoding)
+                )
+        response = current_app.response_class(body, mimetype="application/json")
+        if isinstance(body, bytes) and encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+            # The compressed body is not byte-for-byte identical to the original, so
+            # the entity tag must be weak (see compress_response())
+            response.set_etag(etag, weak=True)
+        else:
+            response.set_etag(etag)
+    response.cache_control.max_age = _IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+@api.url_value_preprocessor
+def _pull_db_name(endpoint: str | None, values: dict[str, Any] | None) -> None:
+    """
+    Store the name of the database for the current request in ``g.db_name``, taken
+    from the URL if given, or otherwise the only database. Raise a ``NotFound`` error if
+    there is no such database, unless the endpoint does not need one.
+    """
+    dbs: dict[str, ParamViewDB] = current_app.config["dbs"]
+    db_name = None if values is None else values.pop("db_name", None)
+    if db_name is None:
+        if (
+            endpoint is not None
+            and endpoint.split(".")[-1] in _DB_INDEPENDENT_ENDPOINTS
+        ):
+            return
+        if len(dbs) != 1:
+            raise NotFound(
+                "there are multiple databases, so requests must use /db/<name>/api"
+            )
+        db_name = next(iter(dbs))
+    elif db_name not in dbs:
+        raise NotFound(f"database '{db_name}' does not exist")
+    g.db_name = db_name
+
+
+api.before_request(start_server_timing)
+
+
+@api.before_request
+def _check_replaced() -> None:
+    """
+    If the database file was replaced, clear the commit cache, since cached commits are
+    unlikely to be in the new database. The cache is shared by all databases, so this
+    also clears commits from other databases.
+    """
+    if "db_name" in g and _current_db.check_replaced():
+        commit_cache: CommitCache = current_app.config["commit_cache"]
+        commit_cache.clear()
+
+
+# After request functions are called in reverse order, so the Server-Timing header is
+# added after the response is compressed
+api.after_request(add_server_timing_header)
+
+
+@api.after_request
+def _compress_response(response: Response) -> Response:
+    """Compress the response (see ``paramview._compress.compress_response()``)."""
+    with server_timing("compress"):
+        return compress_response(response)
 
 
 @api.errorhandler(HTTPException)
@@ -40,23 +369,86 @@ def _exception(exc: HTTPException) -> tuple[dict[str, Any], int]:
 @api.get("/database-name")
 def _database_name() -> Response:
     """Return the database name."""
-    db_path = cast(str, current_app.config["db_path"])
-    return jsonify(os.path.basename(db_path))
+    return jsonify(g.db_name)
+
+
+@api.get("/metrics")
+def _metrics() -> Response:
+    """
+    Return metrics for the whole server in Prometheus text format (see
+    ``paramview._metrics``), or a 404 error if metrics are not enabled.
+    """
+    metrics: Metrics | None = current_app.config["metrics"]
+    if metrics is None:
+        raise NotFound("metrics are not enabled (see the --metrics option)")
+    commit_cache: CommitCache = current_app.config["commit_cache"]
+    single_flight: SingleFlight = current_app.config["single_flight"]
+    return current_app.response_class(
+        metrics.render(commit_cache.stats, single_flight.stats),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 
 @api.get("/commit-history")
-def _commit_history() -> list[CommitEntry]:
-    """Return the commit history."""
-    commit_history = _current_db.commit_history()
-    return commit_history
+def _commit_history() -> Response:
+    """
+    Return the commit history. If the ``after`` query parameter is given, only commits
+    with IDs greater than it are returned, and if the ``limit`` query parameter is
+    given, at most that many commits are returned.
+
+    The response includes an entity tag and must be revalidated by clients, so requests
+    with a matching ``If-None-Match`` header receive an empty 304 response.
+    """
+    after = _int_arg("after")
+    limit = _int_arg("limit")
+    # The database file version is part of the key so that requests made after a commit
+    # do not share a load that started before it
+    commit_history = _single_flight(
+        ("commit_history", g.db_name, _current_db.file_version(), after, limit),
+        lambda: _current_db.commit_history_after(after, limit),
+    )
+    with server_timing("serialize"):
+        response = jsonify(commit_history)
+    response.add_etag()
+    response.cache_control.no_cache = True
+    response.make_conditional(request)
+    return response
 
 
 @api.get("/data/<int:commit_id>")
-def _params(commit_id: int) -> Response:
-    """Return data from the commit with the given ID."""
-    return current_app.response_class(
-        _current_db.load(commit_id, raw_json=True),
-        mimetype="application/json",
+@api.get("/data/<int:commit_id>/<path:data_path>")
+def _params(commit_id: int, data_path: str | None = None) -> Response:
+    """
+    Return data from the commit with the given ID. Commit data never changes, so the
+    response includes an entity tag and can be cached indefinitely. Requests with a
+    matching ``If-None-Match`` header receive an empty 304 response without loading the
+    data. Data for very large commits is streamed (see ``_load_json_body()``).
+
+    If a data path is given as a JSON pointer (keys separated by "/", with "~" and "/"
+    in keys escaped as "~0" and "~1"), only the subtree at that path is returned. If
+    the ``depth`` query parameter is given, groups more than that many levels below the
+    returned data have their children removed (see ``paramview._subtree.truncate()``),
+    so that large parameter trees can be loaded as they are expanded.
+    """
+    commit_key = _commit_key(commit_id)
+    depth = _int_arg("depth")
+    if data_path is None and depth is None:
+        return _immutable_response(
+            _commit_etag(commit_key), lambda: _load_json_body(commit_key)
+        )
+    path = [] if data_path is None else parse_data_path(data_path)
+
+    def load_subtree_json() -> str:
+        return _load_cached(
+            ("subtree", commit_key, tuple(path), depth),
+            lambda: _serialize(
+                _subtree_json, _load_parsed_data(commit_key), path, depth
+            ),
+        )
+
+    subtree_hash = hashlib.sha1(json.dumps([path, depth]).encode()).hexdigest()
+    return _immutable_response(
+        f"{_commit_etag(commit_key)}-{subtree_hash}", load_subtree_json
     )
 
 
@@ -1,15 +1,26 @@
 """WSGI app to serve the frontend and the backend API."""
 
 from __future__ import annotations
-from typing import Any
 import os
+import time
+from urllib.parse import quote
+from markupsafe import escape
 from werkzeug.exceptions import NotFound
-from flask import Flask, Response, send_from_directory
+from flask import Flask, Response, json, request, g
 from flask.json.provider import DefaultJSONProvider
-from flask_socketio import SocketIO  # type: ignore
-from paramdb import ParamDB
+from flask_socketio import SocketIO, join_room, rooms  # type: ignore
+from socketio import PubSubManager  # type: ignore
+from paramview._database import ParamViewDB, database_paths
+from paramview._cache import CommitCache
+from paramview._single_flight import SingleFlight
+from paramview._metrics import Metrics
+from paramview._profile import profile_requests
+from paramview._compress import send_precompressed_file
 from paramview._api import api
 
+DEFAULT_CACHE_SIZE = 128 * 1024 * 1024
+"""Default memory budget for cached commit data in bytes."""
+
 
 class _CustomJSONProvider(DefaultJSONProvider):
     """
@@ -21,28 +32,102 @@ class _CustomJSONProvider(DefaultJSONProvider):
 
 
 class _CustomFlask(Flask):
-    """Custom Flask class that includes our customized JSON provider."""
+    """
+    Custom Flask class that includes our customized JSON provider and serves
+    precompressed static files.
+    """
 
     json_provider_class = _CustomJSONProvider
 
+    def send_static_file(self, filename: str) -> Response:
+        """
+        Send a file from the static folder, or a precompressed version of it if one
+        exists and the client accepts its encoding.
+        """
+        static_folder = self.static_folder
+        assert static_folder is not None, "no static folder set"
+        response = send_precompressed_file(static_folder, filename)
+        if response is not None:
+            return response
+        return super().send_static_file(filename)
+
+
+def _record_request_metrics(metrics: Metrics, app: Flask) -> None:
+    """Record metrics for each request handled by the given app."""
+
+    @app.before_request
+    def start_timer() -> None:
+        g.request_start_time = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response: Response) -> Response:
+        if request.url_rule is not None and "request_start_time" in g:
+            metrics.observe_request(
+                request.url_rule.rule,
+                request.method,
+                response.status_code,
+                time.perf_counter() - g.request_start_time,
+                None if response.is_streamed else response.content_length,
+            )
+        return response
+
+
+def create_app(
+    db_path: str | list[str],
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    metrics: bool = False,
+    profile_dir: str | None = None,
+    client_manager: PubSubManager | None = None,
+) -> tuple[Flask, SocketIO]:
+    """
+    Return the WSGI app for ParamView with the given database path. Up to
+    ``cache_size`` bytes of commit data are cached in memory. If ``metrics`` is True,
+    metrics are collected and served in Prometheus text format at ``/api/metrics``
+    (see ``paramview._metrics``). If ``profile_dir`` is given, each request is profiled
+    and its profile is saved to that directory (see ``paramview._profile``).
+
+    Multiple database paths (or directories containing databases) can be given, in
+    which case the frontend and API for each database are served under
+    ``/db/<name>/``, where the name is the database's file name (see
+    ``paramview._database.database_paths()``), and the root path lists the databases.
+    Clients connecting to SocketIO join the room for the database given by the
+    ``database`` query parameter, to which database update events are emitted. If
+    there is only one database, it is also served from the root path, and clients join
+    its room by default.
 
-def create_app(db_path: str) -> tuple[Flask, SocketIO]:
-    """Return the WSGI app for ParamView with the given database path."""
-    if not os.path.exists(db_path):
-        raise FileNotFoundError(f"database file '{db_path}' does not exist")
+    If ``client_manager`` is given, SocketIO events are sent through it to clients of
+    other processes serving the same databases (see ``paramview._workers``). In this
+    case, only the WebSocket transport is allowed, since the HTTP long-polling requests
+    of one client could be handled by different processes.
+    """
+    db_paths = database_paths(db_path)
     app = _CustomFlask(__name__, static_url_path="/")
-    app.config["db_path"] = db_path
-    app.config["db"] = ParamDB[Any](db_path)
+    app.config["dbs"] = {name: ParamViewDB(path) for name, path in db_paths.items()}
+    app.config["commit_cache"] = CommitCache(cache_size)
+    app.config["single_flight"] = SingleFlight()
+    app.config["metrics"] = Metrics() if metrics else None
+    if app.config["metrics"] is not None:
+        _record_request_metrics(app.config["metrics"], app)
     app.register_blueprint(api)
-    socketio = SocketIO(app)
+    app.register_blueprint(api, url_prefix="/db/<db_name>/api", name="db_api")
+    if profile_dir is not None:
+        profile_requests(app, profile_dir)
+    # Flask's JSON module is used so that SocketIO events can contain the same objects
+    # as API responses (e.g. commit entries)
+    socketio = (
+        SocketIO(app, json=json)
+        if client_manager is None
+        else SocketIO(
+            app, json=json, client_manager=client_manager, transports=["websocket"]
+        )
+    )
 
-    @app.route("/")
-    def index() -> Response | str:
+    def send_index_html() -> Response | str:
         """Serve index.html."""
         static_folder = app.static_folder
         assert static_folder is not None, "no static folder set"
         try:
-            return send_from_directory(static_folder, "index.html")
+            return app.send_static_file("index.html")
         except NotFound:
             index_html_path = os.path.join(static_folder, "index.html")
             github_link = "https://github.com/PainterQubits/paramview"
@@ -56,4 +141,52 @@ def create_app(db_path: str) -> tuple[Flask, SocketIO]:
 <p>See <a href="{github_link}">{github_link}</a> for more information.</p>
 """
 
+    @app.route("/")
+    def index() -> Response | str:
+        """Serve index.html if there is one database, or a list of databases."""
+        if len(db_paths) == 1:
+            return send_index_html()
+        db_links = "\n".join(
+            f'  <li><a href="db/{quote(name)}/">{escape(name)}</a></li>'
+            for name in db_paths
+        )
+        return f"""
+<title>ParamView</title>
+<h1>Databases</h1>
+<ul>
+{db_links}
+</ul>
+"""
+
+    @app.route("/db/<db_name>/")
+    def db_index(db_name: str) -> Response | str:
+        """Serve index.html for the given database."""
+        if db_name not in db_paths:
+            raise NotFound(f"database '{db_name}' does not exist")
+        return send_index_html()
+
+    @socketio.on("connect")  # type: ignore
+    def connect() -> bool:
+        """
+        Add the client to the room for its database, or reject the connection if the
+        database does not exist.
+        """
+        db_name = request.args.get("database")
+        if db_name is None and len(db_paths) == 1:
+            db_name = next(iter(db_paths))
+        if db_name not in db_paths:
+            return False
+        join_room(db_name)
+        if app.config["metrics"] is not None:
+            app.config["metrics"].socketio_connected(db_name)
+        return True
+
+    @socketio.on("disconnect")  # type: ignore
+    def disconnect(*_args: object) -> None:
+        """Record that the client disconnected from the room for its database."""
+        if app.config["metrics"] is not None:
+            for room in rooms():
+                if room in db_paths:
+                    app.config["metrics"].socketio_connected(room, -1)
+
     return app, socketio
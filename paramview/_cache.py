@@ -0,0 +1,124 @@
+"""Least recently used cache for commit data with a memory budget."""
+
+from __future__ import annotations
+from typing import Any, Hashable
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Statistics for a :py:class:`CommitCache`."""
+
+    hits: int
+    """Number of lookups that found an entry."""
+    misses: int
+    """Number of lookups that did not find an entry."""
+    evictions: int
+    """Number of entries removed to stay within the memory budget."""
+    clears: int
+    """Number of times the cache was cleared (because the database was replaced)."""
+    num_entries: int
+    """Current number of entries."""
+    size: int
+    """Current memory used by entries in bytes."""
+    max_size: int
+    """Memory budget in bytes."""
+
+
+def data_size(data: Any) -> int:
+    """
+    Return an estimate of the memory used by the given data in bytes, including the
+    lists and dictionaries it contains (e.g. data parsed from JSON). Objects that are
+    shared (e.g. interned strings and small integers) are counted each time they occur.
+    """
+    size = 0
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return size
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CommitCache:
+    """
+    Thread-safe least recently used cache mapping keys identifying commits to raw JSON
+    data (or other data derived from commits, such as compressed JSON or parsed data).
+    Commits are immutable, so entries never need to be updated, only evicted when the
+    total size of the cached data would exceed ``max_size`` bytes. Data larger than
+    ``max_size`` is not cached, so a ``max_size`` of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 0:
+            raise ValueError(f"cache size must be non-negative, not {max_size}")
+        self._max_size = max_size
+        self._size = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._clears = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the current cache statistics."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                clears=self._clears,
+                num_entries=len(self._entries),
+                size=self._size,
+                max_size=self._max_size,
+            )
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached data for the given key, or None if not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, data: Any, size: int | None = None) -> None:
+        """
+        Cache the given data for the given key, evicting the least recently used
+        entries as necessary to stay within the memory budget. The size of the data in
+        bytes can be given (e.g. using :py:func:`data_size` for parsed data); otherwise,
+        the size of the data object itself is used, which is correct for strings and
+        bytes.
+        """
+        entry_size = sys.getsizeof(data) if size is None else size
+        if entry_size > self._max_size:
+            return
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._size -= old_entry[1]
+            while self._size + entry_size > self._max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+            self._entries[key] = data, entry_size
+            self._size += entry_size
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._clears += 1
@@ -1,12 +1,31 @@
 """Command-line interface to start ParamView."""
 
 from __future__ import annotations
-from argparse import ArgumentParser, Namespace
-from importlib.metadata import distribution
-from paramview._server import start_server
+from typing import Any, NoReturn
+from argparse import Action, ArgumentParser, Namespace
+
+# Modules that are slow to import (the server, which imports Flask, eventlet, and
+# ParamDB, and importlib.metadata, which searches the installed packages) are imported
+# when they are needed, so that options like --help and --version are fast
 
 _PACKAGE_NAME = "paramview"
-_VERSION = distribution(_PACKAGE_NAME).version
+
+_WATCH_BACKENDS = ("events", "poll")
+"""Same as ``paramview._watch_db.WATCH_BACKENDS``, which is slow to import."""
+
+
+class _VersionAction(Action):
+    """Like argparse's ``"version"`` action, but looks up the version when called."""
+
+    def __init__(self, option_strings: list[str], dest: str, **kwargs: Any) -> None:
+        super().__init__(option_strings, dest, nargs=0, **kwargs)
+
+    def __call__(self, parser: ArgumentParser, *_args: Any, **_kwargs: Any) -> NoReturn:
+        # pylint: disable-next=import-outside-toplevel
+        from importlib.metadata import distribution
+
+        print(f"{_PACKAGE_NAME} {distribution(_PACKAGE_NAME).version}")
+        parser.exit()
 
 
 def _parse_args(args: list[str] | None = None) -> Namespace:
@@ -18,13 +37,17 @@ def _parse_args(args: list[str] | None = None) -> Namespace:
     parser.add_argument(
         "-V",
         "--version",
-        action="version",
-        version=f"{_PACKAGE_NAME} {_VERSION}",
+        action=_VersionAction,
+        help="show program's version number and exit",
     )
     parser.add_argument(
-        "db_path",
+        "db_paths",
         metavar="<database path>",
-        help="path to the ParamDB database file",
+        nargs="+",
+        help=(
+            "path to a ParamDB database file, or a directory containing database files"
+            " (multiple databases are served under /db/<name>/)"
+        ),
     )
     parser.add_argument(
         "-p",
@@ -33,6 +56,79 @@ def _parse_args(args: list[str] | None = None) -> Namespace:
         type=int,
         help="port to use (default is 5050)",
     )
+    parser.add_argument(
+        "--cache-size",
+        metavar="MB",
+        default=128,
+        type=int,
+        help="memory in MB to use for caching commit data (default is 128)",
+    )
+    parser.add_argument(
+        "--min-interval",
+        metavar="MS",
+        default=50,
+        type=int,
+        help=(
+            "time in ms without database changes to wait before notifying clients"
+            " (default is 50)"
+        ),
+    )
+    parser.add_argument(
+        "--max-latency",
+        metavar="MS",
+        default=500,
+        type=int,
+        help=(
+            "maximum time in ms to wait before notifying clients of database changes"
+            " (default is 500)"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        choices=_WATCH_BACKENDS,
+        default="events",
+        help=(
+            "how to detect database changes: watch file system events in the database"
+            " directory, or poll the database file (default is events)"
+        ),
+    )
+    parser.add_argument(
+        "--poll-interval",
+        metavar="MS",
+        default=100,
+        type=int,
+        help="time in ms between checks when using --watch poll (default is 100)",
+    )
+    parser.add_argument(
+        "--threads",
+        metavar="N",
+        default=20,
+        type=int,
+        help="number of threads to use for database operations (default is 20)",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        default=1,
+        type=int,
+        help=(
+            "number of processes to serve requests from, which allows using more than"
+            " one CPU core (default is 1)"
+        ),
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="serve metrics in Prometheus format at /api/metrics (default is off)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=(
+            "profile each request, saving profiles to this directory (slows down the"
+            " server, so only use for debugging)"
+        ),
+    )
     parser.add_argument(
         "--no-open",
         action="store_true",
@@ -47,4 +143,20 @@ def main() -> None:
     program calls this function.
     """
     args = _parse_args()
-    start_server(args.db_path, default_port=args.port, open_window=not args.no_open)
+    # pylint: disable-next=import-outside-toplevel
+    from paramview._server import start_server
+
+    start_server(
+        args.db_paths,
+        default_port=args.port,
+        open_window=not args.no_open,
+        cache_size=args.cache_size * 1024 * 1024,
+        min_interval=args.min_interval / 1000,
+        max_latency=args.max_latency / 1000,
+        watch_backend=args.watch,
+        poll_interval=args.poll_interval / 1000,
+        num_threads=args.threads,
+        metrics=args.metrics,
+        profile_dir=args.profile,
+        num_workers=args.workers,
+    )
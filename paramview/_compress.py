@@ -0,0 +1,127 @@
+"""Content negotiation and compression for responses."""
+
+from __future__ import annotations
+from typing import Iterable, Iterator
+import os
+import gzip
+import zlib
+import mimetypes
+from werkzeug.security import safe_join
+from flask import Response, request, send_from_directory
+from paramview._offload import offload
+
+try:
+    import brotli  # type: ignore
+
+    _BROTLI_INSTALLED = True
+except ImportError:
+    _BROTLI_INSTALLED = False
+
+COMPRESSION_THRESHOLD = 1024
+"""Minimum size in bytes of a response body to compress."""
+
+_ENCODINGS = ["br", "gzip"] if _BROTLI_INSTALLED else ["gzip"]
+"""Encodings that responses can be compressed with, in order of preference."""
+
+_PRECOMPRESSED_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+"""File extensions of precompressed static files for each encoding."""
+
+
+def accepted_encoding() -> str | None:
+    """
+    Return the best encoding accepted by the client of the current request, or None if
+    it does not accept any encoding that responses can be compressed with.
+    """
+    return request.accept_encodings.best_match(_ENCODINGS)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress the given data using the given encoding. This takes a long time for large
+    data, so it should be called in the thread pool (see ``paramview._offload``).
+    """
+    if encoding == "br":
+        return bytes(brotli.compress(data, quality=5))
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress the given chunks of data as a stream using the given encoding. Each chunk
+    is compressed in the thread pool, so that the eventlet hub is not blocked while the
+    response is sent.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5)
+        for chunk in chunks:
+            yield offload(compressor.process, chunk)
+        yield offload(compressor.finish)
+    else:
+        # A window bits value of 16 + 15 produces gzip output (with an mtime of 0)
+        compressobj = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            yield offload(compressobj.compress, chunk)
+        yield offload(compressobj.flush)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Compress the body of the given response with the best encoding accepted by the
+    client, if the body is at least ``COMPRESSION_THRESHOLD`` bytes. Streamed responses
+    are always compressed, and remain streamed. Compression runs in the thread pool.
+    Responses that are already compressed (e.g. cached compressed commit data) are
+    returned as is. This function is intended to be registered using ``after_request``.
+    """
+    response.vary.add("Accept-Encoding")
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    if response.is_streamed:
+        encoding = accepted_encoding()
+        if encoding is None:
+            return response
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_THRESHOLD:
+            return response
+        encoding = accepted_encoding()
+        if encoding is None:
+            return response
+        response.set_data(offload(compress, data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        # The compressed body is not byte-for-byte identical to the original, so the
+        # entity tag must be weak (as web servers like Nginx do).
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_precompressed_file(directory: str, filename: str) -> Response | None:
+    """
+    Send a precompressed version of the given file (with a ``.br`` or ``.gz`` extension)
+    if one exists in the given directory and the client accepts its encoding. Return
+    None if there is no such file.
+    """
+    available_encodings = []
+    for encoding, extension in _PRECOMPRESSED_EXTENSIONS.items():
+        path = safe_join(directory, filename + extension)
+        if path is not None and os.path.isfile(path):
+            available_encodings.append(encoding)
+    best_encoding = request.accept_encodings.best_match(available_encodings)
+    if best_encoding is None:
+        return None
+    mimetype, _ = mimetypes.guess_type(filename)
+    response = send_from_directory(
+        directory,
+        filename + _PRECOMPRESSED_EXTENSIONS[best_encoding],
+        mimetype=mimetype or "application/octet-stream",
+    )
+    response.headers["Content-Encoding"] = best_encoding
+    response.vary.add("Accept-Encoding")
+    return response
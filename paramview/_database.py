@@ -0,0 +1,183 @@
+"""ParamDB database with additional queries used by ParamView."""
+
+from __future__ import annotations
+from typing import Any
+import os
+from sqlalchemy import select, func
+from paramdb import ParamDB, CommitEntry
+from paramdb._database import _Snapshot
+
+_SQLITE_HEADER = b"SQLite format 3\x00"
+"""Header at the start of every SQLite database file."""
+
+
+def _is_sqlite_file(path: str) -> bool:
+    """Whether the given path is a SQLite database file."""
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as db_file:
+        return db_file.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+
+
+def database_paths(paths: str | list[str]) -> dict[str, str]:
+    """
+    Return a dictionary mapping database names to paths for the given database path or
+    paths, where the name of each database is its file name. Directories are replaced by
+    the SQLite database files they directly contain, sorted by name.
+
+    Raise a ``FileNotFoundError`` if a path does not exist or a directory contains no
+    databases, and a ``ValueError`` if no paths are given or multiple databases have the
+    same name.
+    """
+    db_paths: dict[str, str] = {}
+    for path in [paths] if isinstance(paths, str) else paths:
+        if os.path.isdir(path):
+            dir_db_paths = [
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if _is_sqlite_file(os.path.join(path, name))
+            ]
+            if len(dir_db_paths) == 0:
+                raise FileNotFoundError(f"directory '{path}' contains no databases")
+        elif os.path.exists(path):
+            dir_db_paths = [path]
+        else:
+            raise FileNotFoundError(f"database file '{path}' does not exist")
+        for db_path in dir_db_paths:
+            db_name = os.path.basename(db_path)
+            if db_name in db_paths:
+                raise ValueError(
+                    f"databases '{db_paths[db_name]}' and '{db_path}' have the same"
+                    " name"
+                )
+            db_paths[db_name] = db_path
+    if len(db_paths) == 0:
+        raise ValueError("no database paths were given")
+    return db_paths
+
+
+class ParamViewDB(ParamDB[Any]):
+    """
+    ParamDB database with additional queries used by ParamView that are not part of the
+    public ParamDB API.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file_id = self._get_file_id()
+        self._commit_timestamps: tuple[
+            tuple[tuple[int, int, int] | None, ...] | None, dict[int, float]
+        ] = (None, {})
+
+    def _get_file_id(self) -> tuple[int, int] | None:
+        """
+        Return the device and inode numbers identifying the database file, or None if
+        the file does not exist.
+        """
+        try:
+            stat_result = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat_result.st_dev, stat_result.st_ino
+
+    def check_replaced(self) -> bool:
+        """
+        Return whether the database file has been replaced by a different file since the
+        last check (or since this object was created). If so, the connection pool is
+        disposed of so that subsequent queries use the new file.
+        """
+        file_id = self._get_file_id()
+        if file_id is None or file_id == self._file_id:
+            return False
+        self._file_id = file_id
+        self.dispose()
+        return True
+
+    def file_version(self) -> tuple[tuple[int, int, int] | None, ...]:
+        """
+        Return a value that changes whenever the database is modified, consisting of the
+        inode numbers, modification times, and sizes of the database file and its WAL
+        file (None for files that do not exist). This is used to tell whether the
+        result of a query that started earlier could be out of date.
+        """
+        version: list[tuple[int, int, int] | None] = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                stat_result = os.stat(path)
+            except FileNotFoundError:
+                version.append(None)
+            else:
+                version.append(
+                    (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+                )
+        return tuple(version)
+
+    def commit_history_after(
+        self, after_id: int | None = None, limit: int | None = None
+    ) -> list[CommitEntry]:
+        """
+        Retrieve commit entries with IDs greater than ``after_id``, sorted by ID and
+        containing at most ``limit`` entries. If ``after_id`` is None, entries start
+        from the first commit, and if ``limit`` is None, all remaining entries are
+        returned.
+
+        Unlike :py:meth:`ParamDB.commit_history`, the filtering is done in the SQL
+        query, so only the requested entries are read from the database.
+        """
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must be non-negative, not {limit}")
+        select_stmt = select(_Snapshot.id, _Snapshot.message, _Snapshot.timestamp)
+        if after_id is not None:
+            select_stmt = select_stmt.where(_Snapshot.id > after_id)
+        select_stmt = select_stmt.order_by(_Snapshot.id).limit(limit)
+        with self._Session() as session:
+            entries = session.execute(select_stmt).mappings()
+            return [CommitEntry(**dict(row_mapping)) for row_mapping in entries]
+
+    def latest_commit_id(self) -> int | None:
+        """Return the ID of the latest commit, or None if there are no commits."""
+        with self._Session() as session:
+            return session.scalar(select(func.max(_Snapshot.id)))
+
+    def load_compressed(self, commit_id: int) -> bytes:
+        """
+        Load data from the commit with the given ID as it is stored in the database,
+        i.e. as JSON compressed using Zstandard. Raise an ``IndexError`` if the commit
+        does not exist.
+        """
+        select_stmt = self._select_commit(select(_Snapshot.data), commit_id)
+        with self._Session() as session:
+            data = session.scalar(select_stmt)
+        if data is None:
+            raise self._index_error(commit_id)
+        return data
+
+    def cached_commit_timestamp(self, commit_id: int) -> float | None:
+        """
+        Return the timestamp of the commit with the given ID in seconds since the epoch
+        if it was cached using :py:meth:`cache_commit_timestamp` and the database has
+        not been modified since (see :py:meth:`file_version`), or otherwise None. This
+        does not query the database.
+        """
+        file_version, timestamps = self._commit_timestamps
+        if file_version != self.file_version():
+            return None
+        return timestamps.get(commit_id)
+
+    def cache_commit_timestamp(
+        self,
+        commit_id: int,
+        timestamp: float,
+        file_version: tuple[tuple[int, int, int] | None, ...],
+    ) -> None:
+        """
+        Cache the timestamp of the commit with the given ID, which was loaded when the
+        database had the given file version (see :py:meth:`cached_commit_timestamp`).
+        Timestamps cached for a different file version are discarded, since they can no
+        longer be used.
+        """
+        cached_file_version, timestamps = self._commit_timestamps
+        if cached_file_version != file_version:
+            timestamps = {}
+            self._commit_timestamps = file_version, timestamps
+        timestamps[commit_id] = timestamp
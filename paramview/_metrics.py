@@ -0,0 +1,246 @@
+"""Metrics about requests, database operations, and watching, in Prometheus format."""
+
+from __future__ import annotations
+from typing import Callable, TypeVar
+import time
+import bisect
+from collections import defaultdict
+from threading import Lock
+from paramview._cache import CacheStats
+from paramview._single_flight import SingleFlightStats
+
+_T = TypeVar("_T")
+
+_Labels = tuple[tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+"""Upper bounds in seconds of histogram buckets for latencies."""
+
+SIZE_BUCKETS = tuple(4**i for i in range(4, 14))
+"""Upper bounds in bytes of histogram buckets for response sizes (256 B to 64 MB)."""
+
+_METRIC_TYPES = {
+    "paramview_requests_total": (
+        "counter",
+        "Requests handled.",
+    ),
+    "paramview_request_duration_seconds": (
+        "histogram",
+        "Time to handle requests, not including streaming the response.",
+    ),
+    "paramview_response_size_bytes": (
+        "histogram",
+        "Size of responses after compression, not including streamed responses.",
+    ),
+    "paramview_db_operation_duration_seconds": (
+        "histogram",
+        "Time for database operations, including waiting for the thread pool.",
+    ),
+    "paramview_commit_cache_hits_total": (
+        "counter",
+        "Commit cache lookups that found an entry.",
+    ),
+    "paramview_commit_cache_misses_total": (
+        "counter",
+        "Commit cache lookups that did not find an entry.",
+    ),
+    "paramview_commit_cache_hit_ratio": (
+        "gauge",
+        "Fraction of commit cache lookups that found an entry.",
+    ),
+    "paramview_commit_cache_evictions_total": (
+        "counter",
+        "Commit cache entries removed to stay within the memory budget.",
+    ),
+    "paramview_commit_cache_size_bytes": (
+        "gauge",
+        "Memory used by commit cache entries.",
+    ),
+    "paramview_single_flight_calls_total": (
+        "counter",
+        "Loads that could share the result of a concurrent identical load.",
+    ),
+    "paramview_single_flight_deduplicated_total": (
+        "counter",
+        "Loads that shared the result of a load already in flight.",
+    ),
+    "paramview_socketio_clients": (
+        "gauge",
+        "Connected SocketIO clients.",
+    ),
+    "paramview_watch_events_total": (
+        "counter",
+        "Raw file system events (or detected changes, if polling) for the database.",
+    ),
+    "paramview_watch_updates_total": (
+        "counter",
+        "Database update events emitted to SocketIO clients.",
+    ),
+    "paramview_watch_lag_seconds": (
+        "histogram",
+        "Time from the first raw event of a database update to it being handled.",
+    ),
+}
+"""Type and help text for each metric, in the order they are rendered."""
+
+
+def _sample(name: str, labels: _Labels, value: float) -> str:
+    """Return a line in Prometheus text format for a sample with the given labels."""
+    if len(labels) == 0:
+        return f"{name} {value}"
+    formatted_labels = ",".join(
+        f'{key}="{_escape(label_value)}"' for key, label_value in labels
+    )
+    return f"{name}{{{formatted_labels}}} {value}"
+
+
+def _escape(label_value: str) -> str:
+    """Escape the given label value for Prometheus text format."""
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    """Counts of observed values in buckets with the given upper bounds."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)  # The last bucket is +Inf
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add the given value to the histogram."""
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._sum += value
+
+    def samples(self, name: str, labels: _Labels) -> list[str]:
+        """Return lines for this histogram in Prometheus text format."""
+        samples = []
+        cumulative_count = 0
+        for bound, count in zip((*self._buckets, "+Inf"), self._counts):
+            cumulative_count += count
+            bucket_labels = (*labels, ("le", str(bound)))
+            samples.append(_sample(f"{name}_bucket", bucket_labels, cumulative_count))
+        samples.append(_sample(f"{name}_sum", labels, self._sum))
+        samples.append(_sample(f"{name}_count", labels, cumulative_count))
+        return samples
+
+
+class Metrics:
+    """
+    Thread-safe collection of metrics for the server, which are rendered in Prometheus
+    text format by :py:meth:`render`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._values: defaultdict[tuple[str, _Labels], int] = defaultdict(int)
+        self._histograms: dict[tuple[str, _Labels], _Histogram] = {}
+
+    def _add(self, name: str, labels: _Labels, value: int) -> None:
+        """Add the given value to the counter or gauge with the given labels."""
+        with self._lock:
+            self._values[name, labels] += value
+
+    def _observe(
+        self,
+        name: str,
+        labels: _Labels,
+        value: float,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """Add the given value to the histogram with the given labels."""
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[name, labels] = _Histogram(buckets)
+            histogram.observe(value)
+
+    # pylint: disable-next=too-many-arguments
+    def observe_request(
+        self, route: str, method: str, status: int, seconds: float, size: int | None
+    ) -> None:
+        """
+        Record a request to the given route (URL rule) that took the given number of
+        seconds to handle and whose response had the given size in bytes (None if the
+        response is streamed).
+        """
+        labels = (("route", route), ("method", method))
+        self._add("paramview_requests_total", (*labels, ("status", str(status))), 1)
+        self._observe("paramview_request_duration_seconds", labels, seconds)
+        if size is not None:
+            self._observe("paramview_response_size_bytes", labels, size, SIZE_BUCKETS)
+
+    def timed(self, operation: str, func: Callable[..., _T]) -> Callable[..., _T]:
+        """Return a wrapper for the given database operation that records its time."""
+
+        def timed_func(*args: object, **kwargs: object) -> _T:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._observe(
+                    "paramview_db_operation_duration_seconds",
+                    (("operation", operation),),
+                    time.perf_counter() - start,
+                )
+
+        return timed_func
+
+    def socketio_connected(self, db_name: str, change: int = 1) -> None:
+        """
+        Record that a SocketIO client connected to (or disconnected from, if ``change``
+        is -1) the room for the given database.
+        """
+        self._add("paramview_socketio_clients", (("database", db_name),), change)
+
+    def observe_watch_update(
+        self, db_name: str, num_events: int, lag: float, emitted: bool
+    ) -> None:
+        """
+        Record a database update for the given database coalesced from the given
+        number of raw events, which was handled ``lag`` seconds after the first event.
+        ``emitted`` is False if the update was not emitted because the latest commit
+        did not change.
+        """
+        labels = (("database", db_name),)
+        self._add("paramview_watch_events_total", labels, num_events)
+        if emitted:
+            self._add("paramview_watch_updates_total", labels, 1)
+        self._observe("paramview_watch_lag_seconds", labels, lag)
+
+    def render(
+        self, cache_stats: CacheStats, single_flight_stats: SingleFlightStats
+    ) -> str:
+        """
+        Return the metrics in Prometheus text format, along with the given cache and
+        single-flight statistics.
+        """
+        lookups = cache_stats.hits + cache_stats.misses
+        samples: defaultdict[str, list[str]] = defaultdict(list)
+        for name, value in (
+            ("paramview_commit_cache_hits_total", cache_stats.hits),
+            ("paramview_commit_cache_misses_total", cache_stats.misses),
+            (
+                "paramview_commit_cache_hit_ratio",
+                cache_stats.hits / lookups if lookups > 0 else 0,
+            ),
+            ("paramview_commit_cache_evictions_total", cache_stats.evictions),
+            ("paramview_commit_cache_size_bytes", cache_stats.size),
+            ("paramview_single_flight_calls_total", single_flight_stats.calls),
+            (
+                "paramview_single_flight_deduplicated_total",
+                single_flight_stats.deduplicated,
+            ),
+        ):
+            samples[name].append(_sample(name, (), value))
+        with self._lock:
+            for (name, labels), value in self._values.items():
+                samples[name].append(_sample(name, labels, value))
+            for (name, labels), histogram in self._histograms.items():
+                samples[name].extend(histogram.samples(name, labels))
+        lines = []
+        for name, (metric_type, help_text) in _METRIC_TYPES.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+"""
+Function to run blocking work in eventlet's thread pool. The server runs on eventlet
+without monkeypatching, so database operations and other long computations would
+otherwise block the eventlet hub, delaying all other requests and SocketIO heartbeats.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Iterator, TypeVar, cast
+from contextlib import contextmanager
+from contextvars import ContextVar
+from eventlet import tpool  # type: ignore
+
+DEFAULT_NUM_THREADS = 20
+"""Default number of threads in the thread pool (the same as eventlet's default)."""
+
+_T = TypeVar("_T")
+
+_run_inline = ContextVar("_run_inline", default=False)
+"""Whether :py:func:`offload` calls functions directly (see :py:func:`run_inline`)."""
+
+
+def set_num_threads(num_threads: int) -> None:
+    """
+    Set the number of threads in the thread pool, which bounds the number of blocking
+    operations that run at once. One thread is always used to wait for database
+    changes (see ``paramview._watch_db``), so there must be at least 2. If the thread
+    pool has already started, it is restarted with the new number of threads.
+    """
+    if num_threads < 2:
+        raise ValueError(f"number of threads must be at least 2, not {num_threads}")
+    tpool.killall()
+    tpool.set_num_threads(num_threads)
+
+
+def _call(
+    func: Callable[..., _T], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> tuple[bool, _T | Exception]:
+    """
+    Call the given function with the given arguments. Return whether it raised an
+    exception, and its return value or the exception.
+    """
+    try:
+        return False, func(*args, **kwargs)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        return True, exc
+
+
+def offload(func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """
+    Call the given function with the given arguments in a thread from eventlet's thread
+    pool, blocking only the current greenthread until it returns. Exceptions are raised
+    in the current greenthread (rather than being printed by eventlet).
+
+    The function is called outside of the Flask application context, so it should not
+    use ``current_app``, ``g``, or ``request``.
+    """
+    if _run_inline.get():
+        return func(*args, **kwargs)
+    raised, result = tpool.execute(_call, func, args, kwargs)
+    if raised:
+        raise cast(Exception, result)
+    return cast(_T, result)
+
+
+@contextmanager
+def run_inline() -> Iterator[None]:
+    """
+    Within this context, :py:func:`offload` calls functions directly in the current
+    greenthread rather than in the thread pool, so that they are seen by a profiler
+    running in it (see ``paramview._profile``). This blocks the eventlet hub while they
+    run, so it should only be used for debugging.
+    """
+    token = _run_inline.set(True)
+    try:
+        yield
+    finally:
+        _run_inline.reset(token)
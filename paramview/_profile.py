@@ -0,0 +1,94 @@
+"""Request profiling and ``Server-Timing`` headers."""
+
+from __future__ import annotations
+from typing import Iterable, Iterator
+import os
+import time
+from contextlib import contextmanager
+from collections import defaultdict
+from eventlet.semaphore import Semaphore  # type: ignore
+from flask import Flask, Response, g, has_request_context
+from paramview._offload import run_inline
+
+SERVER_TIMING_METRICS = {
+    "db": "Database",
+    "serialize": "Serialization",
+    "compress": "Compression",
+    "total": "Total",
+}
+"""
+Names and descriptions of the metrics in ``Server-Timing`` headers. Serialization
+includes decompressing, parsing, and encoding JSON, and extracting subtrees. The time to
+transfer the response is not included, since it is not known until after the headers
+are sent (browsers show it separately).
+"""
+
+
+def start_server_timing() -> None:
+    """Start timing the current request for its ``Server-Timing`` header."""
+    g.server_timing_start = time.perf_counter()
+    g.server_timing = defaultdict(float)
+
+
+@contextmanager
+def server_timing(name: str) -> Iterator[None]:
+    """
+    Add the time spent in this context to the ``Server-Timing`` metric with the given
+    name for the current request, if timing was started for it.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context() and "server_timing" in g:
+            g.server_timing[name] += time.perf_counter() - start
+
+
+def add_server_timing_header(response: Response) -> Response:
+    """
+    Add a ``Server-Timing`` header to the given response with the times recorded for
+    the current request, so that they are shown in browser developer tools.
+    """
+    if "server_timing" in g:
+        g.server_timing["total"] = time.perf_counter() - g.server_timing_start
+        response.headers["Server-Timing"] = ", ".join(
+            f'{name};dur={g.server_timing[name] * 1000:.1f};desc="{description}"'
+            for name, description in SERVER_TIMING_METRICS.items()
+            if name in g.server_timing
+        )
+    return response
+
+
+def profile_requests(app: Flask, profile_dir: str) -> None:
+    """
+    Profile each request to the given app with ``cProfile``, saving the profile of each
+    request as a ``.pstats`` file in the given directory, which can be viewed with
+    ``pstats`` or tools such as SnakeViz, or converted to a flame graph.
+
+    Requests are profiled one at a time, since only one profiler can be active at once,
+    and functions that would be run in the thread pool run directly in the request's
+    greenthread so that they are included in its profile (see
+    ``paramview._offload.run_inline()``). Responses are buffered rather than streamed.
+    This must be called before SocketIO is initialized for the app, so that SocketIO
+    requests (which can wait a long time for events) are not profiled.
+    """
+    # Imported here since it imports cProfile and pstats, which are otherwise not needed
+    # pylint: disable-next=import-outside-toplevel
+    from werkzeug.middleware.profiler import ProfilerMiddleware
+
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = ProfilerMiddleware(
+        app.wsgi_app,
+        stream=None,
+        profile_dir=profile_dir,
+        filename_format="{time:.6f}.{method}.{path}.{elapsed:.0f}ms.pstats",
+    )
+    semaphore = Semaphore()
+
+    def profiled_wsgi_app(
+        environ: dict[str, object], start_response: object
+    ) -> Iterable[bytes]:
+        with semaphore, run_inline():
+            return profiler(environ, start_response)  # type: ignore
+
+    app.wsgi_app = profiled_wsgi_app  # type: ignore
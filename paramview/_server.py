@@ -1,13 +1,21 @@
 """WSGI server for frontend and backend API."""
 
 from __future__ import annotations
+from typing import Any
 import os
 import sys
 import socket
 import mimetypes
-import webbrowser
-from paramview._app import create_app
-from paramview._watch_db import watch_db
+from paramview._database import database_paths
+from paramview._offload import DEFAULT_NUM_THREADS, set_num_threads
+from paramview._app import DEFAULT_CACHE_SIZE, create_app
+from paramview._workers import Workers, check_num_workers
+from paramview._watch_db import (
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MAX_LATENCY,
+    DEFAULT_POLL_INTERVAL,
+    watch_db,
+)
 
 # Fix JavaScript MIME type for Windows
 mimetypes.add_type("text/javascript", ".js")
@@ -31,24 +39,89 @@ def _available_port(host: str, default_port: int) -> int:
         sock.close()
 
 
+# pylint: disable-next=too-many-arguments,too-many-locals
 def start_server(
-    db_path: str,
+    db_path: str | list[str],
     host: str = "127.0.0.1",
     default_port: int = 5050,
     open_window: bool = True,
+    *,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_latency: float = DEFAULT_MAX_LATENCY,
+    watch_backend: str = "events",
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    num_threads: int = DEFAULT_NUM_THREADS,
+    metrics: bool = False,
+    profile_dir: str | None = None,
+    num_workers: int = 1,
 ) -> None:
     """
     Start the server locally on the given port using SocketIO, and open in a new browser
     window if ``open_window`` is ``True``. If the given port is in use, find another
-    available port.
+    available port. Up to ``cache_size`` bytes of commit data are cached in memory.
+    Multiple database paths (or directories containing databases) can be given, which
+    are served by the same server (see ``paramview._app.create_app()``).
+    Database update notifications are coalesced using ``min_interval`` and
+    ``max_latency`` in seconds, and changes are detected using ``watch_backend``,
+    polling every ``poll_interval`` seconds for the ``"poll"`` backend (see
+    ``paramview._watch_db.watch_db()``). Blocking database operations run in a pool of
+    ``num_threads`` threads (see ``paramview._offload``). If ``metrics`` is True,
+    metrics are served at ``/api/metrics`` (see ``paramview._metrics``). If
+    ``profile_dir`` is given, each request is profiled and its profile is saved to that
+    directory (see ``paramview._profile``).
+
+    If ``num_workers`` is greater than 1, requests are served by that many worker
+    processes sharing the port, so that requests can use multiple CPU cores, and this
+    process only watches the databases (see ``paramview._workers``). Metrics and caches
+    are then kept separately by each worker.
     """
+    set_num_threads(num_threads)
+    check_num_workers(num_workers)
+    # Directories are only searched once, so the app and watcher use the same databases
+    db_paths = list(database_paths(db_path).values())
     port = _available_port(host, default_port)
-    app, socketio = create_app(db_path)
-    stop_watch_db = watch_db(db_path, socketio)
+    app_options: dict[str, Any] = {
+        "cache_size": cache_size,
+        "metrics": metrics,
+        "profile_dir": profile_dir,
+    }
+    workers = None
+    if num_workers == 1:
+        app, socketio = create_app(db_paths, **app_options)
+        watch_metrics = app.config["metrics"]
+    else:
+        workers = Workers(
+            db_paths,
+            host,
+            port,
+            num_workers=num_workers,
+            num_threads=num_threads,
+            app_options=app_options,
+        )
+        socketio = workers.socketio
+        watch_metrics = None  # No worker serves this process's metrics
+    stop_watch_db = watch_db(
+        db_paths,
+        socketio,
+        min_interval=min_interval,
+        max_latency=max_latency,
+        backend=watch_backend,
+        poll_interval=poll_interval,
+        metrics=watch_metrics,
+    )
     try:
         print(f"Serving on http://{host}:{port}", file=sys.stderr)
         if open_window:
+            # pylint: disable-next=import-outside-toplevel
+            import webbrowser
+
             webbrowser.open(f"http://{host}:{port}", new=2)
-        socketio.run(app, host, port)
+        if workers is None:
+            socketio.run(app, host, port)
+        else:
+            workers.wait()
     finally:
         stop_watch_db()
+        if workers is not None:
+            workers.stop()
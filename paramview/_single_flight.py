@@ -0,0 +1,68 @@
+"""Coalescing of concurrent identical loads, so that they share a single load."""
+
+from __future__ import annotations
+from typing import Callable, Hashable, TypeVar
+from dataclasses import dataclass
+from eventlet.event import Event  # type: ignore
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    """Statistics for a :py:class:`SingleFlight`."""
+
+    calls: int
+    """Number of calls to :py:meth:`SingleFlight.do`."""
+    deduplicated: int
+    """Number of calls that shared the result of a load already in flight."""
+    in_flight: int
+    """Current number of loads in flight."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so that only the first call runs its
+    load function, and calls made while it is in flight wait for and share its result
+    (or exception). Once a load finishes, the next call with the same key runs a new
+    load, so results are never reused after the fact (that is the job of the cache).
+
+    Callers are greenthreads running on the same eventlet hub, so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, Event] = {}
+        self._calls = 0
+        self._deduplicated = 0
+
+    @property
+    def stats(self) -> SingleFlightStats:
+        """Snapshot of the current statistics."""
+        return SingleFlightStats(
+            calls=self._calls,
+            deduplicated=self._deduplicated,
+            in_flight=len(self._in_flight),
+        )
+
+    def do(self, key: Hashable, load: Callable[[], _T]) -> _T:
+        """
+        Return the result of ``load()``, sharing the result of a load already in flight
+        for the given key if there is one.
+        """
+        self._calls += 1
+        in_flight_event = self._in_flight.get(key)
+        if in_flight_event is not None:
+            self._deduplicated += 1
+            result: _T = in_flight_event.wait()
+            return result
+        event = Event()
+        self._in_flight[key] = event
+        try:
+            result = load()
+        except BaseException as exc:
+            event.send_exception(exc)
+            raise
+        finally:
+            del self._in_flight[key]
+        event.send(result)
+        return result
@@ -0,0 +1,38 @@
+"""Streaming of commit data that is too large to load into memory at once."""
+
+from __future__ import annotations
+from typing import Iterator
+import io
+from zstandard import ZstdDecompressor, frame_content_size
+
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+"""Minimum size in bytes of commit data to stream rather than load at once."""
+
+STREAMING_CHUNK_SIZE = 256 * 1024
+"""Size in bytes of the chunks that streamed commit data is sent in."""
+
+
+def decompressed_size(compressed_data: bytes) -> int | None:
+    """
+    Return the size in bytes of the given data compressed using Zstandard once it is
+    decompressed, or None if the size is not recorded in the compressed data.
+    """
+    size = frame_content_size(compressed_data)
+    return size if size >= 0 else None
+
+
+def decompress(compressed_data: bytes) -> str:
+    """Decompress the given text compressed using Zstandard."""
+    return ZstdDecompressor().decompress(compressed_data).decode()
+
+
+def iter_decompressed(
+    compressed_data: bytes, chunk_size: int = STREAMING_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Decompress the given data compressed using Zstandard, yielding chunks of at most
+    ``chunk_size`` bytes. Only one chunk of decompressed data is in memory at a time.
+    """
+    yield from ZstdDecompressor().read_to_iter(
+        io.BytesIO(compressed_data), write_size=chunk_size
+    )
@@ -0,0 +1,75 @@
+"""
+Functions to get parts of data loaded from ParamDB commits, used to load large
+parameter trees lazily.
+"""
+
+from __future__ import annotations
+from typing import Any
+
+_PARAM_DATA = "ParamData"
+_LIST = "list"
+_DICT = "dict"
+
+
+def parse_data_path(pointer: str) -> list[str]:
+    """
+    Parse the given JSON pointer (without the leading "/") into a path of keys, where
+    list indices are strings of integers. Keys are separated by "/", and "~" and "/"
+    within keys are escaped as "~0" and "~1", respectively.
+    """
+    return [key.replace("~1", "/").replace("~0", "~") for key in pointer.split("/")]
+
+
+def _inner_data(data: Any) -> Any:
+    """Return the given data unwrapped from any ParamData wrappers."""
+    while isinstance(data, dict) and data.get("type") == _PARAM_DATA:
+        data = data["data"]
+    return data
+
+
+def get_subtree(data: Any, path: list[str]) -> Any:
+    """
+    Return the data at the given path within the given data. Raise a ``KeyError`` or
+    ``IndexError`` if the path does not exist.
+    """
+    for i, key in enumerate(path):
+        inner_data = _inner_data(data)
+        group_type = inner_data.get("type") if isinstance(inner_data, dict) else None
+        if group_type == _DICT:
+            if key not in inner_data["data"]:
+                raise KeyError(f"path {path[: i + 1]} does not exist")
+            data = inner_data["data"][key]
+        elif group_type == _LIST:
+            if not key.isdigit() or int(key) >= len(inner_data["data"]):
+                raise IndexError(f"path {path[: i + 1]} does not exist")
+            data = inner_data["data"][int(key)]
+        else:
+            raise KeyError(
+                f"path {path[: i + 1]} does not exist (parent is not a group)"
+            )
+    return data
+
+
+def truncate(data: Any, depth: int) -> Any:
+    """
+    Return the given data with the children of groups (lists and dictionaries) more than
+    ``depth`` levels below the root removed. These groups are returned with empty data
+    and ``numChildren`` set to their number of children. ParamData wrappers are kept and
+    do not count as levels. Data that is not truncated is not copied.
+    """
+    if depth < 0:
+        raise ValueError(f"depth must be non-negative, not {depth}")
+    data_type = data.get("type") if isinstance(data, dict) else None
+    if data_type == _PARAM_DATA:
+        return {**data, "data": truncate(data["data"], depth)}
+    if data_type not in (_LIST, _DICT):
+        return data
+    children = data["data"]
+    if depth == 0:
+        return {**data, "data": type(children)(), "numChildren": len(children)}
+    if data_type == _LIST:
+        return {**data, "data": [truncate(child, depth - 1) for child in children]}
+    return {
+        **data,
+        "data": {name: truncate(child, depth - 1) for name, child in children.items()},
+    }
@@ -1,106 +1,411 @@
 """Function to watch the database and emit a SocketIO event when it is updated."""
 
 from __future__ import annotations
-from typing import Callable
+from typing import Any, Callable
 import os
-from threading import Event, Condition
-from eventlet import tpool, spawn  # type: ignore
+import time
+import logging
+import sqlite3
+from pathlib import Path
+from dataclasses import dataclass
+from threading import Thread, Event, Condition
+from eventlet import spawn  # type: ignore
+from sqlalchemy.exc import SQLAlchemyError
 from flask_socketio import SocketIO  # type: ignore
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from paramview._database import ParamViewDB, database_paths
+from paramview._offload import offload
+from paramview._metrics import Metrics
 
+_logger = logging.getLogger(__name__)
 
-class _DBEventHandler(FileSystemEventHandler):
-    """Watchdog event handler for watching the ParamDB file."""
-
-    # pylint: disable-next=too-many-arguments
-    def __init__(
-        self,
-        db_dir: str,
-        db_name: str,
-        watch_db_condition: Condition,
-        db_update_event: Event,
-    ):
-        self._db_path = os.path.join(db_dir, db_name)
-        self._watch_db_condition = watch_db_condition
-        self._db_update_event = db_update_event
-
-    def _db_update(self) -> None:
+DEFAULT_MIN_INTERVAL = 0.05
+"""Default minimum interval in seconds between database update events."""
+
+DEFAULT_MAX_LATENCY = 0.5
+"""Default maximum latency in seconds from a database change to an update event."""
+
+WATCH_BACKENDS = ("events", "poll")
+"""
+Ways to detect database changes: ``"events"`` watches file system events in the
+database's directory, and ``"poll"`` periodically checks the database itself.
+"""
+
+DEFAULT_POLL_INTERVAL = 0.1
+"""Default interval in seconds between checks when using the ``"poll"`` backend."""
+
+
+@dataclass
+class _PendingEvents:
+    """Raw events for one database that have not yet been taken."""
+
+    first_time: float
+    """Monotonic time of the first event."""
+    last_time: float
+    """Monotonic time of the most recent event."""
+    num_events: int = 1
+    """Number of events."""
+
+
+class _DBUpdates:
+    """
+    Raw events indicating that databases may have been updated, which are counted for
+    each database until they are taken by :py:meth:`wait_for_db_updates`. Events are
+    coalesced using the given minimum interval and maximum latency in seconds.
+    """
+
+    def __init__(self, min_interval: float, max_latency: float):
+        self._min_interval = min_interval
+        self._max_latency = max_latency
+        self._condition = Condition()
+        self._pending: dict[str, _PendingEvents] = {}
+        self.stopped = Event()
+        """Event that is set when watching the databases is stopped."""
+
+    def register(self, db_name: str) -> None:
+        """
+        Register that the given database may have been updated by counting the event and
+        notify threads waiting for an update.
+        """
+        with self._condition:
+            now = time.monotonic()
+            pending = self._pending.get(db_name)
+            if pending is None:
+                self._pending[db_name] = _PendingEvents(now, now)
+            else:
+                pending.last_time = now
+                pending.num_events += 1
+            self._condition.notify()
+
+    def stop(self) -> None:
+        """Stop watching the databases, waking up threads waiting for an update."""
+        with self._condition:
+            self.stopped.set()
+            self._condition.notify_all()
+
+    def _ready_time(self, pending: _PendingEvents) -> float:
+        """Return the monotonic time when the given pending events are ready."""
+        return min(
+            pending.last_time + self._min_interval,
+            pending.first_time + self._max_latency,
+        )
+
+    def wait_for_db_updates(self) -> dict[str, _PendingEvents]:
         """
-        Register that the database has been updated by seting the database update event
-        and notify threads waiting on the condition variable.
+        Wait for databases to be updated and return the raw events that occurred for
+        each updated database, or an empty dictionary if watching was stopped first.
+
+        Events are coalesced: after the first event for a database, this function waits
+        until no events have occurred for that database for the minimum interval, but no
+        longer than the maximum latency after the first event. This means that
+        notifications for a burst of commits are at least the minimum interval apart.
         """
-        with self._watch_db_condition:
-            self._db_update_event.set()
-            self._watch_db_condition.notify()
+        with self._condition:
+            while not self.stopped.is_set():
+                now = time.monotonic()
+                ready = {
+                    db_name: pending
+                    for db_name, pending in self._pending.items()
+                    if self._ready_time(pending) <= now
+                }
+                if len(ready) > 0:
+                    for db_name in ready:
+                        del self._pending[db_name]
+                    return ready
+                timeout = min(
+                    (
+                        self._ready_time(pending) - now
+                        for pending in self._pending.values()
+                    ),
+                    default=None,
+                )
+                self._condition.wait(timeout)
+            return {}
+
+
+class _DBEventHandler(FileSystemEventHandler):
+    """
+    Watchdog event handler for watching a ParamDB file, in either rollback journal mode
+    (the SQLite default) or WAL mode.
+    """
+
+    def __init__(self, db_path: str, db_name: str, db_updates: _DBUpdates):
+        db_path = os.path.abspath(db_path)
+        self._journal_path = f"{db_path}-journal"
+        self._wal_path = f"{db_path}-wal"
+        self._db_name = db_name
+        self._db_updates = db_updates
 
     def dispatch(self, event: FileSystemEvent) -> None:
-        # Only dispatch events that match the database path with or without the
-        # SQLite "-journal" suffix. On macOS, it appears that only the journal file
-        # triggers Watchdog on a database write.
-        if event.src_path == f"{self._db_path}-journal":
+        # Only dispatch events that match the SQLite "-journal" or "-wal" files. On
+        # macOS, it appears that only these files trigger Watchdog on a database write.
+        if event.src_path in (self._journal_path, self._wal_path):
             super().dispatch(event)
 
     def on_deleted(self, event: FileSystemEvent) -> None:
-        # Triggers an update if the database file was deleted, or if the database
-        # journal file was deleted, which indicates a commit may have occured.
-        self._db_update()
+        # In rollback journal mode, the journal file is deleted at the end of each
+        # write transaction, which indicates a commit may have occured.
+        if event.src_path == self._journal_path:
+            self._db_updates.register(self._db_name)
 
+    def on_modified(self, event: FileSystemEvent) -> None:
+        # In WAL mode, commits are appended to the WAL file instead, and the database
+        # file itself is only modified when the WAL is checkpointed.
+        if event.src_path == self._wal_path:
+            self._db_updates.register(self._db_name)
 
-def _wait_for_db_update(
-    watch_db_condition: Condition, db_update_event: Event, stop_watch_db_event: Event
-) -> None:
-    with watch_db_condition:
-        while not db_update_event.is_set() and not stop_watch_db_event.is_set():
-            watch_db_condition.wait()
-        db_update_event.clear()
+
+class _PolledDB:
+    """
+    A database checked for changes by :py:class:`_DBPoller`.
+
+    Commits are detected using ``PRAGMA data_version`` on a dedicated read-only
+    connection, which changes when any other connection commits in either rollback
+    journal or WAL mode. The database file's identity and modification time are also
+    checked to detect the file being replaced, in which case the connection is
+    reopened.
+    """
+
+    def __init__(self, db_path: str, db_name: str, db_updates: _DBUpdates):
+        self._db_uri = f"{Path(db_path).absolute().as_uri()}?mode=ro"
+        self._db_path = db_path
+        self._db_name = db_name
+        self._db_updates = db_updates
+        self._connection: sqlite3.Connection | None = None
+        # The initial state is read when this object is created rather than when
+        # polling starts so that changes made in between are not missed
+        self._last_file_state = self._file_state()
+        self._last_data_version = self._data_version(reconnect=False)
+
+    def _file_state(self) -> tuple[int, int, int] | None:
+        """
+        Return the device number, inode number, and modification time of the database
+        file, or None if it does not exist.
+        """
+        try:
+            stat_result = os.stat(self._db_path)
+        except FileNotFoundError:
+            return None
+        return stat_result.st_dev, stat_result.st_ino, stat_result.st_mtime_ns
+
+    def _data_version(self, reconnect: bool) -> int | None:
+        """
+        Return the data version of the database, or None if it could not be read. If
+        ``reconnect`` is True, a new connection is opened first.
+        """
+        try:
+            if reconnect or self._connection is None:
+                if self._connection is not None:
+                    self._connection.close()
+                self._connection = sqlite3.connect(
+                    self._db_uri, uri=True, check_same_thread=False
+                )
+            data_version: int = self._connection.execute(
+                "PRAGMA data_version"
+            ).fetchone()[0]
+            return data_version
+        except sqlite3.Error:
+            return None
+
+    def poll(self) -> None:
+        """Check the database for changes, registering an event if it has changed."""
+        file_state = self._file_state()
+        replaced = file_state is not None and (
+            self._last_file_state is None or file_state[:2] != self._last_file_state[:2]
+        )
+        data_version = self._data_version(reconnect=replaced)
+        if (
+            file_state != self._last_file_state
+            or data_version != self._last_data_version
+        ):
+            self._db_updates.register(self._db_name)
+        self._last_file_state = file_state
+        self._last_data_version = data_version
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        if self._connection is not None:
+            self._connection.close()
+
+
+class _DBPoller(Thread):
+    """
+    Thread that checks the given databases for changes every ``poll_interval`` seconds,
+    which unlike watching file system events, does not depend on activity in the rest of
+    the databases' directories.
+    """
+
+    def __init__(self, polled_dbs: list[_PolledDB], poll_interval: float):
+        super().__init__(daemon=True)
+        self._polled_dbs = polled_dbs
+        self._poll_interval = poll_interval
+        self._stopped = Event()
+
+    def stop(self) -> None:
+        """Stop polling. The thread should then be joined."""
+        self._stopped.set()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self._poll_interval):
+            for polled_db in self._polled_dbs:
+                polled_db.poll()
+        for polled_db in self._polled_dbs:
+            polled_db.close()
+
+
+def _database_update(
+    db: ParamViewDB, previous_commit_id: int | None, num_file_events: int
+) -> dict[str, Any] | None:
+    """
+    Return the payload for a ``"database_update"`` event, where ``previous_commit_id``
+    is the latest commit ID as of the previous event and ``num_file_events`` is the
+    number of raw file events coalesced into this event. Return None if the latest
+    commit has not changed (e.g. if the journal file was deleted after a read).
+
+    The payload contains the latest and previous commit IDs (None if there are no
+    commits) and entries for commits made since the previous commit, so clients that are
+    already up to date can append them directly. If the database was replaced or
+    commits were deleted, ``reset`` is True and no commits are included, indicating that
+    clients should request the full commit history.
+    """
+    replaced = db.check_replaced()
+    commits = [] if replaced else db.commit_history_after(previous_commit_id)
+    if len(commits) > 0:
+        latest_commit_id: int | None = commits[-1].id
+    else:
+        latest_commit_id = db.latest_commit_id()
+        if not replaced and latest_commit_id == previous_commit_id:
+            return None
+    return {
+        "latestCommitId": latest_commit_id,
+        "previousCommitId": previous_commit_id,
+        "commits": commits,
+        "reset": len(commits) == 0,
+        "numFileEvents": num_file_events,
+    }
 
 
 def _watch_db_helper(
-    watch_db_condition: Condition,
-    db_update_event: Event,
-    stop_watch_db_event: Event,
+    db_updates: _DBUpdates,
     socketio: SocketIO,
+    dbs: dict[str, ParamViewDB],
+    latest_commit_ids: dict[str, int | None],
+    metrics: Metrics | None,
 ) -> None:
-    while not stop_watch_db_event.is_set():
-        tpool.execute(
-            _wait_for_db_update,
-            watch_db_condition,
-            db_update_event,
-            stop_watch_db_event,
-        )
-        socketio.emit("database_update")
+    while True:
+        pending_events = offload(db_updates.wait_for_db_updates)
+        if db_updates.stopped.is_set():
+            break
+        for db_name, pending in pending_events.items():
+            db = dbs[db_name]
+            try:
+                update = offload(
+                    _database_update, db, latest_commit_ids[db_name], pending.num_events
+                )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # The database could not be read (e.g. it was deleted), so emit the
+                # event without a payload and let clients request the commit history.
+                # Other errors are also caught so that the watcher keeps running.
+                if not isinstance(exc, SQLAlchemyError):
+                    _logger.exception("Failed to read updates to database %r", db_name)
+                socketio.emit("database_update", to=db_name)
+                emitted = True
+            else:
+                emitted = update is not None
+                if update is not None:
+                    latest_commit_ids[db_name] = update["latestCommitId"]
+                    socketio.emit("database_update", update, to=db_name)
+            if metrics is not None:
+                metrics.observe_watch_update(
+                    db_name,
+                    pending.num_events,
+                    time.monotonic() - pending.first_time,
+                    emitted,
+                )
 
 
-def watch_db(db_path: str, socketio: SocketIO) -> Callable[[], None]:
+def _create_observer(
+    db_paths: dict[str, str],
+    db_updates: _DBUpdates,
+    backend: str,
+    poll_interval: float,
+) -> BaseObserver | _DBPoller:
     """
-    Watch the database and emit the SocketIO event ``"database updated"`` when it is
-    modified. Return a function that should be called to stop the observer thread.
+    Return a thread (not yet started) that registers changes to the given databases
+    using the given backend.
     """
-    db_dir, db_name = os.path.split(os.path.abspath(db_path))
-    watch_db_condition = Condition()
-    db_update_event = Event()
-    stop_watch_db_event = Event()
-    event_handler = _DBEventHandler(
-        db_dir, db_name, watch_db_condition, db_update_event
-    )
-    observer = Observer()
-    observer.schedule(event_handler, db_dir)  # type: ignore
-    observer.start()  # type: ignore
+    if backend == "events":
+        observer = Observer()
+        for db_name, db_path in db_paths.items():
+            event_handler = _DBEventHandler(db_path, db_name, db_updates)
+            db_dir = os.path.dirname(os.path.abspath(db_path))
+            observer.schedule(event_handler, db_dir)  # type: ignore
+        return observer
+    polled_dbs = [
+        _PolledDB(db_path, db_name, db_updates) for db_name, db_path in db_paths.items()
+    ]
+    return _DBPoller(polled_dbs, poll_interval)
+
+
+# pylint: disable-next=too-many-arguments
+def watch_db(
+    db_path: str | list[str],
+    socketio: SocketIO,
+    *,
+    min_interval: float = DEFAULT_MIN_INTERVAL,
+    max_latency: float = DEFAULT_MAX_LATENCY,
+    backend: str = "events",
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    metrics: Metrics | None = None,
+) -> Callable[[], None]:
+    """
+    Watch the database and emit the SocketIO event ``"database_update"`` when a commit
+    is made (see ``_database_update()`` for the payload). Return a function that should
+    be called to stop watching. Databases in both rollback journal mode (the SQLite
+    default) and WAL mode are supported.
+
+    Multiple database paths (or directories containing databases) can be given, in
+    which case they are all watched by a single observer thread (see
+    ``paramview._database.database_paths()``). Events for each database are emitted to
+    the SocketIO room with the database's name.
+
+    Changes are detected using the given backend (see ``WATCH_BACKENDS``), checking
+    every ``poll_interval`` seconds for the ``"poll"`` backend. Changes are coalesced so
+    that a burst of commits results in few events: an event is emitted once there have
+    been no changes for ``min_interval`` seconds, or ``max_latency`` seconds after the
+    first change, whichever is sooner. If ``metrics`` is given, the number of changes
+    and the time from the first change to each event are recorded in it.
+    """
+    if backend not in WATCH_BACKENDS:
+        raise ValueError(
+            f"watch backend must be one of {', '.join(WATCH_BACKENDS)}, not '{backend}'"
+        )
+    if min_interval < 0:
+        raise ValueError(f"minimum interval must be non-negative, not {min_interval}")
+    if max_latency < 0:
+        raise ValueError(f"maximum latency must be non-negative, not {max_latency}")
+    if poll_interval <= 0:
+        raise ValueError(f"poll interval must be positive, not {poll_interval}")
+    db_paths = database_paths(db_path)
+    dbs = {db_name: ParamViewDB(path) for db_name, path in db_paths.items()}
+    db_updates = _DBUpdates(min_interval, max_latency)
+    observer = _create_observer(db_paths, db_updates, backend, poll_interval)
+    # The initial latest commit IDs are loaded after creating and starting the observer
+    # (and before returning) so that no commits are missed
+    observer.start()
+    latest_commit_ids = {db_name: db.latest_commit_id() for db_name, db in dbs.items()}
     watch_db_thread = spawn(
-        _watch_db_helper,
-        watch_db_condition,
-        db_update_event,
-        stop_watch_db_event,
-        socketio,
+        _watch_db_helper, db_updates, socketio, dbs, latest_commit_ids, metrics
     )
 
     def stop_watch_db() -> None:
-        observer.stop()  # type: ignore
-        with watch_db_condition:
-            stop_watch_db_event.set()
-            watch_db_condition.notify()
+        observer.stop()
+        db_updates.stop()
         watch_db_thread.wait()
         observer.join()
+        for db in dbs.values():
+            db.dispose()
 
     return stop_watch_db
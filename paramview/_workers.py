@@ -0,0 +1,208 @@
+"""
+Serving from multiple worker processes, which share one port and receive SocketIO
+broadcasts through a local message broker.
+"""
+
+from __future__ import annotations
+from typing import Any, Iterator
+import os
+import socket
+import multiprocessing
+from threading import Thread, Lock
+from multiprocessing.connection import Listener, Client, Connection
+from eventlet import sleep  # type: ignore
+from eventlet.hubs import trampoline  # type: ignore
+from socketio import PubSubManager  # type: ignore
+from flask_socketio import SocketIO  # type: ignore
+from paramview._offload import set_num_threads
+from paramview._app import create_app
+
+
+class MessageBroker:
+    """
+    Local stand-in for a pub/sub message queue, which relays each message sent by a
+    connected process (see :py:class:`QueueManager`) to all other connected processes.
+    Messages are relayed by a thread for each connection, so this does not need the
+    eventlet hub.
+    """
+
+    def __init__(self) -> None:
+        self.authkey = os.urandom(32)
+        """Key that processes must use to connect."""
+        self._listener = Listener(("127.0.0.1", 0), authkey=self.authkey)
+        self._connections: list[Connection] = []
+        self._lock = Lock()
+        Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Address that processes connect to."""
+        address: tuple[str, int] = self._listener.address
+        return address
+
+    def _accept(self) -> None:
+        """Accept connections until the broker is closed."""
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return  # The listener was closed
+            with self._lock:
+                self._connections.append(connection)
+            Thread(target=self._relay, args=(connection,), daemon=True).start()
+
+    def _relay(self, connection: Connection) -> None:
+        """Relay messages from the given connection until it is closed."""
+        while True:
+            try:
+                message = connection.recv_bytes()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                for other_connection in self._connections:
+                    if other_connection is not connection:
+                        try:
+                            other_connection.send_bytes(message)
+                        except OSError:
+                            pass  # The process exited, so its relay thread will stop
+        with self._lock:
+            self._connections.remove(connection)
+        connection.close()
+
+    def close(self) -> None:
+        """Stop accepting connections."""
+        self._listener.close()
+
+
+class QueueManager(PubSubManager):  # type: ignore[misc]
+    """
+    SocketIO client manager that sends and receives messages through a
+    :py:class:`MessageBroker`, so that events emitted by one process are sent to
+    clients connected to any process. This works like python-socketio's managers for
+    Redis or Kafka, without needing a separate server.
+    """
+
+    name = "paramview"
+
+    def __init__(
+        self, address: tuple[str, int], authkey: bytes, write_only: bool = False
+    ) -> None:
+        super().__init__(write_only=write_only)
+        self._connection = Client(address, authkey=authkey)
+
+    def _publish(self, data: Any) -> None:
+        self._connection.send(data)
+
+    def _listen(self) -> Iterator[Any]:
+        while True:
+            # Wait for a message without blocking the eventlet hub
+            trampoline(self._connection.fileno(), read=True)
+            try:
+                yield self._connection.recv()
+            except EOFError:
+                return  # The broker was closed
+
+
+# pylint: disable-next=too-many-arguments
+def _run_worker(
+    db_paths: list[str],
+    host: str,
+    port: int,
+    *,
+    broker_address: tuple[str, int],
+    authkey: bytes,
+    num_threads: int,
+    app_options: dict[str, Any],
+) -> None:
+    """
+    Serve the given databases on the given port from a worker process, with SocketIO
+    messages relayed through the broker at the given address.
+    """
+    set_num_threads(num_threads)
+    app, socketio = create_app(
+        db_paths, client_manager=QueueManager(broker_address, authkey), **app_options
+    )
+    try:
+        socketio.run(app, host, port)
+    except KeyboardInterrupt:
+        pass  # The main process also receives the interrupt and stops the workers
+
+
+def check_num_workers(num_workers: int) -> None:
+    """
+    Raise a ``ValueError`` if the given number of worker processes is not supported. For
+    multiple workers to share one port, the platform must support ``SO_REUSEPORT``.
+    """
+    if num_workers < 1:
+        raise ValueError(f"number of workers must be at least 1, not {num_workers}")
+    if num_workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("multiple workers are not supported on this platform")
+
+
+class Workers:
+    """
+    Worker processes serving the given databases on the given port, which are started
+    when this object is created. ``app_options`` are passed to
+    ``paramview._app.create_app()``. Each worker listens on the port with
+    ``SO_REUSEPORT``, so the operating system distributes connections between them.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        db_paths: list[str],
+        host: str,
+        port: int,
+        *,
+        num_workers: int,
+        num_threads: int,
+        app_options: dict[str, Any],
+    ) -> None:
+        self._broker = MessageBroker()
+        # Processes are spawned rather than forked, since this process may already have
+        # threads (e.g. the thread pool), which are not safe to fork
+        context = multiprocessing.get_context("spawn")
+        self._processes = [
+            context.Process(
+                target=_run_worker,
+                args=(db_paths, host, port),
+                kwargs={
+                    "broker_address": self._broker.address,
+                    "authkey": self._broker.authkey,
+                    "num_threads": num_threads,
+                    "app_options": app_options,
+                },
+                daemon=True,
+            )
+            for _ in range(num_workers)
+        ]
+        for process in self._processes:
+            process.start()
+        # message_queue is given so that SocketIO is initialized without an app, like
+        # for an external process emitting through a message queue
+        self.socketio = SocketIO(
+            message_queue=None,
+            client_manager=QueueManager(
+                self._broker.address, self._broker.authkey, write_only=True
+            ),
+        )
+        """SocketIO instance that emits events to the clients of all workers."""
+
+    def wait(self) -> None:
+        """
+        Wait until any worker exits (e.g. because of an error or a keyboard interrupt),
+        running the eventlet hub in the meantime.
+        """
+        try:
+            while all(process.is_alive() for process in self._processes):
+                sleep(0.1)
+        except KeyboardInterrupt:
+            pass  # Exit like the server does when running in this process
+
+    def stop(self) -> None:
+        """Stop the workers and wait for them to exit."""
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        self._broker.close()
@@ -1,7 +1,7 @@
 import { atom } from "jotai";
-import { loadable } from "jotai/utils";
-import { CommitEntry, Data } from "@/types";
-import { requestData } from "@/utils/api";
+import { atomFamily } from "jotai/utils";
+import { CommitEntry, DatabaseUpdate, Data, Path } from "@/types";
+import { requestData, requestCommitData } from "@/utils/api";
 import { selectedCommitIndexAtom } from "@/atoms/commitSelect";
 
 /**
@@ -17,8 +17,47 @@ const databaseNameRequest = requestData<string>("api/database-name").then((name)
 /** Database name retrieved from the server. */
 export const databaseNameAtom = atom(() => databaseNameRequest);
 
-/** Request the commit history. */
-const requestCommitHistory = async () => requestData<CommitEntry[]>("api/commit-history");
+/**
+ * Request the commit history. If an ID is given, only commits after that ID are
+ * requested.
+ */
+const requestCommitHistory = async (afterId?: number) =>
+  requestData<CommitEntry[]>(
+    afterId === undefined ? "api/commit-history" : `api/commit-history?after=${afterId}`,
+  );
+
+/** Return the ID of the latest commit in the given commit history, or null if empty. */
+const latestCommitId = (commitHistory: CommitEntry[]) =>
+  commitHistory.length > 0 ? commitHistory[commitHistory.length - 1].id : null;
+
+/**
+ * Request commits made after the last commit in the given commit history and return the
+ * updated commit history. If there are no new commits, the given commit history is
+ * returned as is.
+ */
+const updateCommitHistory = async (commitHistory: CommitEntry[]) => {
+  const newCommits = await requestCommitHistory(latestCommitId(commitHistory) ?? 0);
+  return newCommits.length === 0 ? commitHistory : [...commitHistory, ...newCommits];
+};
+
+/**
+ * Return the commit history updated using the given database update from the server,
+ * which must not already be up to date. If the commit history was up to date as of the
+ * previous update, the new commits are appended without a request. Otherwise, the commit
+ * history is requested, in full if the update is a reset.
+ */
+const applyDatabaseUpdate = async (
+  commitHistory: CommitEntry[],
+  { previousCommitId, commits, reset }: DatabaseUpdate,
+) => {
+  if (reset) return requestCommitHistory();
+
+  if (latestCommitId(commitHistory) === previousCommitId) {
+    return [...commitHistory, ...commits];
+  }
+
+  return updateCommitHistory(commitHistory);
+};
 
 /**
  * The request for the initial commit history, used as the initial value for
@@ -35,7 +74,9 @@ const commitHistoryStateAtom = atom(initialCommitHistory);
 
 /**
  * Commit history retrieved from the server, and a function that updates this atom to the
- * latest latest commit history.
+ * latest commit history. Updates only request commits that are newer than the latest
+ * commit already loaded, unless `full` is true or the previous request failed, in which
+ * case the full commit history is requested.
  */
 export const commitHistoryAtom = atom(
   async (get) => {
@@ -48,24 +89,130 @@ export const commitHistoryAtom = atom(
 
     return commitHistory;
   },
-  (_, set) => set(commitHistoryStateAtom, requestCommitHistory()),
+  (get, set, full = false) =>
+    set(
+      commitHistoryStateAtom,
+      full
+        ? requestCommitHistory()
+        : get(commitHistoryStateAtom).then(updateCommitHistory, () =>
+            requestCommitHistory(),
+          ),
+    ),
 );
 
-/** Original (i.e. unedited) data for the currently selected commit. */
-export const originalDataAtom = atom(async (get) => {
+/**
+ * Write-only atom to update the commit history using a database update received from
+ * the server (see applyDatabaseUpdate). Nothing is updated if the commit history is
+ * already up to date. If the previous request for the commit history failed, the full
+ * commit history is requested.
+ */
+export const databaseUpdateAtom = atom(
+  null,
+  async (get, set, databaseUpdate: DatabaseUpdate) => {
+    let commitHistory: CommitEntry[];
+
+    try {
+      commitHistory = await get(commitHistoryStateAtom);
+    } catch {
+      set(commitHistoryStateAtom, requestCommitHistory());
+      return;
+    }
+
+    if (
+      !databaseUpdate.reset &&
+      latestCommitId(commitHistory) === databaseUpdate.latestCommitId
+    ) {
+      return;
+    }
+
+    set(commitHistoryStateAtom, applyDatabaseUpdate(commitHistory, databaseUpdate));
+  },
+);
+
+/**
+ * Number of levels of groups that are loaded at a time when viewing (but not editing)
+ * data. Deeper groups are loaded when they are expanded.
+ */
+const lazyDepth = 1;
+
+/** Escape the given key for use in a JSON pointer within a URL. */
+const escapeKey = (key: string) =>
+  encodeURIComponent(key.replace(/~/g, "~0").replace(/\//g, "~1"));
+
+/**
+ * Return the URL to request the data at the given path within the commit with the given
+ * ID. The path is sent as a JSON pointer. If a depth is given, groups more than that many
+ * levels below the data are sent with empty data and `numChildren` set.
+ */
+const dataUrl = (commitId: number, path: Path, depth?: number) =>
+  `api/data/${[commitId, ...path.map(escapeKey)].join("/")}` +
+  (depth === undefined ? "" : `?depth=${depth}`);
+
+/** Commit history entry for the currently selected commit. */
+export const selectedCommitAtom = atom(async (get) => {
   const commitHistory = await get(commitHistoryAtom);
   const selectedCommitIndex = await get(selectedCommitIndexAtom);
-  return requestData<Data>(`api/data/${commitHistory[selectedCommitIndex].id}`);
+  return commitHistory[selectedCommitIndex];
+});
+
+/**
+ * Original (i.e. unedited) data for the currently selected commit. Commit data is stored
+ * in the browser's persistent cache (see `requestCommitData()`).
+ */
+export const originalDataAtom = atom(async (get) => {
+  const selectedCommit = await get(selectedCommitAtom);
+  return requestCommitData<Data>(dataUrl(selectedCommit.id, []), selectedCommit);
 });
 
 /**
- * Synchronous atom containing the most recently loaded original data, intended to be used
- * for testing against the edited data to synchronously check if it has changed.
+ * Original data for the currently selected commit, where only the top levels of groups
+ * are loaded. Used to display large parameter trees without loading all of the data; the
+ * children of collapsed groups are loaded from subtreeAtom when they are expanded.
+ */
+export const lazyOriginalDataAtom = atom(async (get) => {
+  const selectedCommit = await get(selectedCommitAtom);
+  return requestCommitData<Data>(
+    dataUrl(selectedCommit.id, [], lazyDepth),
+    selectedCommit,
+  );
+});
+
+/**
+ * Atoms for the requests of subtrees, keyed by the commit ID and timestamp followed by
+ * the path as a JSON array, so each subtree is only requested once (until it is removed,
+ * see `removeSubtreeAtoms()`). Subtrees are stored in the browser's persistent cache like
+ * the rest of the commit data (see `requestCommitData()`).
+ */
+const subtreeRequestAtomFamily = atomFamily((key: string) => {
+  const [commitId, timestamp, ...path] = JSON.parse(key) as [number, string, ...Path];
+  return atom(() =>
+    requestCommitData<Data>(dataUrl(commitId, path, lazyDepth), { timestamp }),
+  );
+});
+
+/**
+ * Data at the given path within the given commit, where only the top levels of groups are
+ * loaded (as in lazyOriginalDataAtom).
+ */
+export const subtreeAtom = ({ id, timestamp }: CommitEntry, path: Path) =>
+  subtreeRequestAtomFamily(JSON.stringify([id, timestamp, ...path]));
+
+/**
+ * Remove the atoms for subtrees that are not from the commit with the given ID, or whose
+ * paths do not satisfy the given condition, so that their data can be garbage collected.
+ * A subtree is requested again if it is used after being removed.
  */
-export const originalDataLoadableAtom = loadable(originalDataAtom);
+export const removeSubtreeAtoms = (commitId: number, keep: (path: Path) => boolean) => {
+  subtreeRequestAtomFamily.setShouldRemove((_, key) => {
+    const [subtreeCommitId, , ...path] = JSON.parse(key) as [number, string, ...Path];
+    return subtreeCommitId !== commitId || !keep(path);
+  });
+  subtreeRequestAtomFamily.setShouldRemove(null);
+};
 
 /** Data for the latest commit. */
 export const latestDataAtom = atom(async (get) => {
   const commitHistory = await get(commitHistoryAtom);
-  return requestData<Data>(`api/data/${commitHistory[commitHistory.length - 1].id}`);
+  const latestCommit = commitHistory[commitHistory.length - 1];
+  return requestCommitData<Data>(dataUrl(latestCommit.id, []), latestCommit);
 });
@@ -1,19 +1,58 @@
-import { atom } from "jotai";
-import { loadable } from "jotai/utils";
-import { Data } from "@/types";
-import { getDataDiff } from "@/utils/dataDiff";
+import deepEqual from "fast-deep-equal";
+import { atom, PrimitiveAtom } from "jotai";
+import { atomFamily, loadable } from "jotai/utils";
+import { Path, Data, Leaf, LeafType } from "@/types";
+import { unwrapParamData, getData, setData, updateLastUpdated } from "@/utils/data";
+import { applyDataDiffLastUpdated } from "@/utils/dataDiff";
+import { getDataDiffInWorker } from "@/utils/dataDiffWorker";
+import { requestData } from "@/utils/api";
+import { pathKey } from "@/utils/paramTree";
 import { originalDataAtom, latestDataAtom } from "@/atoms/api";
 
 /** Primitive atom to store the current value of collapseAtom. */
 const collapseStateAtom = atom(Symbol());
 
+/** Path keys of the groups in the parameter list that are open by default. */
+const defaultOpenPaths = () => new Set([pathKey([])]);
+
+/**
+ * Primitive atom to store the current value of openPathsAtom. Only the root is open by
+ * default.
+ */
+const openPathsStateAtom = atom(defaultOpenPaths());
+
 /**
  * Value that causes parameter lists to collapse when it changes and a function to change
  * it.
  */
 export const collapseAtom = atom(
   (get) => get(collapseStateAtom),
-  (_, set) => set(collapseStateAtom, Symbol()),
+  (_, set) => {
+    set(collapseStateAtom, Symbol());
+    set(openPathsStateAtom, defaultOpenPaths());
+  },
+);
+
+/**
+ * Path keys (see `pathKey()`) of the open groups in the parameter list, and a function to
+ * open or close the group at a given path. This is stored here rather than in each item
+ * so that the parameter list can find the row of any item, and so that groups stay open
+ * when their items are scrolled out of view and unmounted.
+ */
+export const openPathsAtom = atom(
+  (get) => get(openPathsStateAtom),
+  (get, set, path: Path) => {
+    const key = pathKey(path);
+    const openPaths = new Set(get(openPathsStateAtom));
+
+    if (openPaths.has(key)) {
+      openPaths.delete(key);
+    } else {
+      openPaths.add(key);
+    }
+
+    set(openPathsStateAtom, openPaths);
+  },
 );
 
 /** Primitive atom to store the current value of roundStateAtom. */
@@ -50,19 +89,142 @@ export const editModeAtom = atom(
   (get) => get(editModeStateAtom),
   (get, set, newEditMode: boolean) => {
     if (newEditMode) {
-      // Reset editedDataAtom
-      set(
-        editedDataAtom,
-        get(originalDataAtom).then((originalData) =>
-          JSON.parse(JSON.stringify(originalData)),
-        ),
+      // Reset editedDataAtom. The original data is not copied, since edits copy the data
+      // they change rather than mutating it (see editLeafAtom).
+      const editedData = get(originalDataAtom);
+      set(editedDataAtom, editedData);
+
+      // Replace the promise with its value once it has loaded, so that edits can be made
+      // synchronously (see editLeafAtom). Errors are shown where editedDataAtom is used.
+      editedData.then(
+        (loadedEditedData) => {
+          if (get(editedDataStateAtom) === editedData) {
+            set(editedDataStateAtom, loadedEditedData);
+          }
+        },
+        () => {},
       );
     }
 
+    // Discard leaf input from the previous time edit mode was enabled
+    leafInputAtomFamily.setShouldRemove(() => true);
+    leafInputAtomFamily.setShouldRemove(null);
+
     set(editModeStateAtom, newEditMode);
   },
 );
 
+/**
+ * Atoms for the edited data at each path, keyed by path key (see `pathKey()`), which are
+ * undefined if not in edit mode.
+ */
+const editedDataAtPathAtomFamily = atomFamily((key: string) => {
+  const path = JSON.parse(key) as Path;
+
+  return atom((get) => {
+    const editedData = get(editedDataStateAtom);
+
+    if (!get(editModeStateAtom) || editedData === null) return undefined;
+
+    return editedData instanceof Promise
+      ? editedData.then((loadedEditedData) => getData(loadedEditedData, path))
+      : getData(editedData, path);
+  });
+});
+
+/**
+ * Edited data at the given path, or undefined if not in edit mode. Edits only copy the
+ * data along the edited path (see `setData()`), so components using this atom only
+ * rerender when the data at their own path (or within it) is edited, rather than for
+ * every edit.
+ */
+export const editedDataAtPathAtom = (path: Path) =>
+  editedDataAtPathAtomFamily(pathKey(path));
+
+/**
+ * Remove the atom for the edited data at the given path (see editedDataAtPathAtom). This
+ * is called when the item using it is unmounted (e.g. when its group is closed or it is
+ * scrolled out of view), so that an atom is not kept for every item that has been shown.
+ */
+export const removeEditedDataAtPathAtom = (path: Path) =>
+  editedDataAtPathAtomFamily.remove(pathKey(path));
+
+/** User input for a leaf in edit mode. */
+export type LeafInput = {
+  /** Selected leaf type. */
+  leafType: LeafType;
+  /** Input for the value. */
+  input: string;
+  /** Input for the unit, used for quantities. */
+  unitInput: string;
+};
+
+/**
+ * Atoms for the input of each leaf in edit mode, keyed by path key (see `pathKey()`),
+ * which are null until the input is changed. Input is stored here rather than in each
+ * item so that it is kept (even if it is invalid and so not in the edited data) when
+ * items are unmounted, e.g. when they are scrolled out of view. These atoms are removed
+ * when edit mode is enabled or disabled (see editModeAtom).
+ */
+const leafInputAtomFamily = atomFamily<string, PrimitiveAtom<LeafInput | null>>(() =>
+  atom<LeafInput | null>(null),
+);
+
+/** Input for the leaf at the given path, or null if it has not been changed. */
+export const leafInputAtom = (path: Path) => leafInputAtomFamily(pathKey(path));
+
+/**
+ * Write-only atom to set the leaf at the given path in the edited data, and its last
+ * updated timestamp if it is not null. The edited data is only replaced if the leaf or
+ * timestamp has changed.
+ */
+export const editLeafAtom = atom(
+  null,
+  async (
+    get,
+    set,
+    { path, leaf, lastUpdated }: { path: Path; leaf: Leaf; lastUpdated: number | null },
+  ) => {
+    // Wait for the edited data to load if it is still a promise (see editModeAtom)
+    if (get(editedDataStateAtom) instanceof Promise) await get(editedDataStateAtom);
+
+    const editedData = get(editedDataStateAtom);
+
+    if (editedData === null || editedData instanceof Promise) return;
+
+    let newEditedData = editedData;
+
+    if (!deepEqual(unwrapParamData(getData(editedData, path)).innerData, leaf)) {
+      newEditedData =
+        path.length === 0
+          ? leaf
+          : setData(editedData, path, {
+              type: "set",
+              value: leaf,
+              withinParamData: true,
+            });
+    }
+
+    if (lastUpdated !== null) {
+      newEditedData = updateLastUpdated(newEditedData, path, lastUpdated);
+    }
+
+    if (newEditedData !== editedData) {
+      set(editedDataStateAtom, newEditedData);
+    }
+  },
+);
+
+/**
+ * Synchronous atom containing the most recently loaded original data, intended to be used
+ * for testing against the edited data to synchronously check if it has changed. The
+ * original data is only loaded in edit mode (and is null otherwise), since it contains
+ * the full data, while only the top levels are loaded to view it.
+ */
+export const originalDataLoadableAtom = loadable(
+  atom((get) => (get(editModeStateAtom) ? get(originalDataAtom) : null)),
+);
+
 /** Primitive atom to store the current value of commitDialogOpenAtom. */
 export const commitDialogOpenStateAtom = atom(false);
 
@@ -73,10 +235,13 @@ export const commitDialogOpenAtom = atom(
     if (newCommitDialogOpen) {
       set(commitMessageAtom, "");
 
-      // Set commitDataAtom to a fresh copy of editedDataAtom
-      const editedDataCopy = (async () =>
-        JSON.parse(JSON.stringify(await get(editedDataAtom))))();
-      set(commitDataAtom, editedDataCopy);
+      // Set commitDataAtom to the current edited data, which is not mutated by later
+      // edits (see editLeafAtom)
+      const editedData = get(editedDataAtom);
+
+      if (editedData !== null) {
+        set(commitDataAtom, editedData);
+      }
     }
 
     set(commitDialogOpenStateAtom, newCommitDialogOpen);
@@ -86,14 +251,63 @@ export const commitDialogOpenAtom = atom(
 /** User-entered message to use for the next commit. */
 export const commitMessageAtom = atom("");
 
+/** Primitive atom to store the edited data to commit (see commitDataAtom). */
 const commitDataStateAtom = atom<Data | Promise<Data> | null>(null);
 
+/** Primitive atom to store the current value of dataDiffProgressAtom. */
+const dataDiffProgressStateAtom = atom(0);
+
+/**
+ * Difference between the latest data and the edited data to commit, computed in a Web
+ * Worker (see `getDataDiffInWorker()`). If either changes before the difference has been
+ * computed, the worker is stopped. The write function updates dataDiffProgressAtom.
+ */
+const dataDiffTaskAtom = atom(
+  async (get, { signal, setSelf }) => {
+    const latestData = await get(latestDataAtom);
+    const commitData = await get(commitDataStateAtom);
+
+    setSelf(0);
+
+    return getDataDiffInWorker(latestData, commitData, { onProgress: setSelf, signal });
+  },
+  (_, set, progress: number) => set(dataDiffProgressStateAtom, progress),
+);
+
+/** Difference between the latest data and the edited data to commit. */
+export const dataDiffAtom = atom((get) => get(dataDiffTaskAtom));
+
+/**
+ * Fraction of the data that has been compared so far to compute dataDiffAtom, from 0 to
+ * 1.
+ */
+export const dataDiffProgressAtom = atom((get) => get(dataDiffProgressStateAtom));
+
+/**
+ * Data to commit, and a function to set the edited data to commit. This is the edited
+ * data with the last updated timestamps of changed `ParamData` set to the latest of their
+ * children, so it is available once dataDiffAtom has been computed.
+ */
 export const commitDataAtom = atom(
-  (get) => get(commitDataStateAtom),
+  async (get) => {
+    const commitData = await get(commitDataStateAtom);
+    const dataDiff = await get(dataDiffAtom);
+
+    return dataDiff === null
+      ? commitData
+      : applyDataDiffLastUpdated(commitData, dataDiff);
+  },
   (_, set, newCommitData: Data | Promise<Data>) =>
     set(commitDataStateAtom, newCommitData),
 );
 
-export const dataDiffAtom = atom(async (get) =>
-  getDataDiff(await get(latestDataAtom), await get(commitDataAtom)),
+/**
+ * Write-only atom to commit the data to commit (see commitDataAtom) with the given
+ * message. Returns the ID of the new commit.
+ */
+export const commitAtom = atom(null, async (get, _, message: string) =>
+  requestData<number>("api/commit", {
+    message,
+    data: JSON.stringify(await get(commitDataAtom)),
+  }),
 );
@@ -1,9 +1,9 @@
 import deepEqual from "fast-deep-equal";
 import { useAtom } from "jotai";
 import { useEffect } from "react";
-import { originalDataLoadableAtom } from "@/atoms/api";
 import {
   editModeAtom,
+  originalDataLoadableAtom,
   editedDataLoadableAtom,
   commitMessageAtom,
   commitDialogOpenAtom,
@@ -1,35 +1,76 @@
 import { io } from "socket.io-client";
 import { useSetAtom } from "jotai";
 import { startTransition, useEffect } from "react";
-import { commitHistoryAtom } from "@/atoms/api";
+import { DatabaseUpdate } from "@/types";
+import { commitHistoryAtom, databaseUpdateAtom } from "@/atoms/api";
+
+const databasePathMatch = window.location.pathname.match(/^\/db\/([^/]+)\//);
+
+/**
+ * Name of the database that this page is for, if it is served under `/db/<name>/` (which
+ * is the case when the server has multiple databases). Otherwise, the server uses its
+ * only database.
+ */
+const databaseName =
+  databasePathMatch === null ? undefined : decodeURIComponent(databasePathMatch[1]);
 
 /** Set up SocketIO to sync database changes. */
 export default function useSocketIO() {
   const updateCommitHistory = useSetAtom(commitHistoryAtom);
+  const applyDatabaseUpdate = useSetAtom(databaseUpdateAtom);
 
   useEffect(() => {
     const socket = io({
+      // Join the room for this page's database, so that only its updates are received
+      query: databaseName === undefined ? undefined : { database: databaseName },
       // Prevent SocketIO from disconnecting on beforeunload. (If this was the default
       // value of true, then if the user tries to leave the page with unsaved changes and
       // chooses not to leave, database changes would no longer sync. See
       // useBeforeUnload.ts for usage of the beforeunload event in this app.)
       closeOnBeforeunload: false,
+      // Connect with a WebSocket first, since when the server runs multiple workers,
+      // HTTP long-polling is not supported (its requests could reach different workers)
+      transports: ["websocket", "polling"],
     });
 
     /** Actions to perform when the database may have been updated. */
     const databaseUpdate = () => {
-      startTransition(updateCommitHistory);
+      startTransition(() => updateCommitHistory());
+    };
+
+    /**
+     * Actions to perform when the server reports that the database was updated. The
+     * update contains the new commits, so the commit history usually does not need to be
+     * requested. If there is no update (e.g. the server could not read the database),
+     * new commits are requested.
+     */
+    const databaseUpdateEvent = (databaseUpdate?: DatabaseUpdate) => {
+      startTransition(() => {
+        if (databaseUpdate === undefined) {
+          updateCommitHistory();
+        } else {
+          applyDatabaseUpdate(databaseUpdate);
+        }
+      });
+    };
+
+    /**
+     * Actions to perform when the connection is (re)established. The full commit history
+     * is requested since the server may have restarted with a different database.
+     */
+    const connect = () => {
+      startTransition(() => updateCommitHistory(true));
     };
 
     // Trigger an update when the WebSocket connection is established, when there is a
     // connection error, when disconnected, and when the database is updated.
-    socket.on("connect", databaseUpdate);
+    socket.on("connect", connect);
     socket.on("connect_error", databaseUpdate);
     socket.on("disconnect", databaseUpdate);
-    socket.on("database_update", databaseUpdate);
+    socket.on("database_update", databaseUpdateEvent);
 
     return () => {
       socket.disconnect();
     };
-  }, [updateCommitHistory]);
+  }, [updateCommitHistory, applyDatabaseUpdate]);
 }
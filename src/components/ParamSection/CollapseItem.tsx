@@ -19,7 +19,16 @@ const collapseSx = {
 
 type ParamCollapseProps = {
   /** Whether this component is open by default. Default value is false. */
-  defaultOpen: boolean;
+  defaultOpen?: boolean;
+  /**
+   * Whether this component is open, if this is controlled by the parent (in which case
+   * `defaultOpen` is ignored).
+   */
+  open?: boolean;
+  /** Function called when the button is clicked, if `open` is given. */
+  onToggle?: () => void;
+  /** Duration of the transition when opening or closing. Default value is "auto". */
+  timeout?: number | "auto";
   /** Item content to show in the button. */
   itemContent: JSX.Element;
   /** Children that are shown below when this component is open. */
@@ -33,23 +42,28 @@ type ParamCollapseProps = {
  * is open or closed. Displays children below when open.
  */
 export default function ParamCollapseItem({
-  defaultOpen,
+  defaultOpen = false,
+  open: controlledOpen,
+  onToggle,
+  timeout = "auto",
   itemContent,
   children,
   backgroundColor = "white",
 }: ParamCollapseProps) {
   const [collapse] = useAtom(collapseAtom);
-  const [open, setOpen] = useState(defaultOpen);
+  const [uncontrolledOpen, setOpen] = useState(defaultOpen);
 
   useEffect(() => setOpen(defaultOpen), [collapse, defaultOpen]);
 
+  const open = controlledOpen ?? uncontrolledOpen;
+
   return (
     <>
       <Box sx={{ backgroundColor }}>
         <ListItemButton
           disableGutters
           sx={{ ...listItemButtonSx }}
-          onClick={() => setOpen(!open)}
+          onClick={() => (onToggle !== undefined ? onToggle() : setOpen(!open))}
         >
           <ListItemIcon sx={iconSx}>
             {open ? <ExpandMore /> : <ChevronRight />}
@@ -57,7 +71,7 @@ export default function ParamCollapseItem({
           {itemContent}
         </ListItemButton>
       </Box>
-      <Collapse sx={collapseSx} in={open} timeout="auto" unmountOnExit>
+      <Collapse sx={collapseSx} in={open} timeout={timeout} unmountOnExit>
         {children}
       </Collapse>
     </>
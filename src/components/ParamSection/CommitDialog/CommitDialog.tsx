@@ -10,12 +10,11 @@ import {
   DialogActions,
 } from "@mui/material";
 import { LoadingButton } from "@mui/lab";
-import { requestData } from "@/utils/api";
 import {
   editModeAtom,
   commitDialogOpenAtom,
   commitMessageAtom,
-  commitDataAtom,
+  commitAtom,
 } from "@/atoms/paramList";
 import ComparisonList from "./ComparisonList";
 
@@ -54,7 +53,7 @@ export default function CommitDialog() {
 
   const [commitDialogOpen, setCommitDialogOpen] = useAtom(commitDialogOpenAtom);
   const [commitMessage, setCommitMessage] = useAtom(commitMessageAtom);
-  const [commitData] = useAtom(commitDataAtom);
+  const makeCommit = useSetAtom(commitAtom);
 
   // We load this using useAtom, not useSetAtom, so this component updates when
   // setCommitId is called.
@@ -65,12 +64,7 @@ export default function CommitDialog() {
   const close = () => setCommitDialogOpen(commitLoading || false);
   const commit = () => {
     startCommitTransition(() => {
-      setCommitId(
-        requestData<number>("api/commit", {
-          message: commitMessage,
-          data: JSON.stringify(commitData),
-        }),
-      );
+      setCommitId(makeCommit(commitMessage));
       setCommitDialogOpen(false);
       setEditMode(false);
     });
@@ -1,9 +1,10 @@
+import { Suspense } from "react";
 import { atom, useAtom } from "jotai";
-import { Box, Typography, List, ListItem } from "@mui/material";
+import { Box, Typography, List, ListItem, LinearProgress } from "@mui/material";
 import { DataType, Data, Diff } from "@/types";
 import { isLeaf, unwrapParamData, getData } from "@/utils/data";
 import { commitHistoryAtom } from "@/atoms/api";
-import { dataDiffAtom } from "@/atoms/paramList";
+import { dataDiffAtom, dataDiffProgressAtom } from "@/atoms/paramList";
 import ItemContent from "../ItemContent";
 import CollapseItem from "../CollapseItem";
 import LeafItemContent from "./LeafItemContent";
@@ -164,8 +165,24 @@ function DataDiffListItem({ name: nameOrUndefined, dataDiff }: DataDiffListItemP
   );
 }
 
+/** Progress bar displayed while the difference is being computed. */
+function ComparisonListProgress() {
+  const [dataDiffProgress] = useAtom(dataDiffProgressAtom);
+
+  return (
+    <Box sx={comparisonListContainerSx}>
+      <Typography>Comparing to the latest commit...</Typography>
+      <LinearProgress
+        data-testid="commit-changes-progress"
+        variant="determinate"
+        value={dataDiffProgress * 100}
+      />
+    </Box>
+  );
+}
+
 /** List displaying the difference between the current edited data and the latest data. */
-export default function ComparisonList() {
+function ComparisonListContent() {
   const [dataDiff] = useAtom(dataDiffAtom);
   const [latestCommitDescription] = useAtom(latestCommitDescriptionAtom);
 
@@ -184,3 +201,15 @@ export default function ComparisonList() {
     </Box>
   );
 }
+
+/**
+ * List displaying the difference between the current edited data and the latest data,
+ * with a progress bar while the difference is being computed.
+ */
+export default function ComparisonList() {
+  return (
+    <Suspense fallback={<ComparisonListProgress />}>
+      <ComparisonListContent />
+    </Suspense>
+  );
+}
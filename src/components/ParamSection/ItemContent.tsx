@@ -1,12 +1,25 @@
 import { SxProps, Box, Typography } from "@mui/material";
 
+/** Minimum height in pixels of item content. */
+export const itemContentHeight = 28;
+
+/**
+ * Styles to fix the height of item content to `itemContentHeight`, used in the parameter
+ * list so that the position of any row can be computed without measuring it, including
+ * in edit mode where items contain input fields.
+ */
+export const fixedHeightItemContentSx = {
+  height: itemContentHeight,
+  overflowY: "clip",
+};
+
 const itemContentSx = {
   display: "flex",
   alignItems: "center",
   justifyContent: "space-between",
   flex: 1,
   pr: 2,
-  minHeight: "28px",
+  minHeight: itemContentHeight,
 };
 
 const nameContainerSx = {
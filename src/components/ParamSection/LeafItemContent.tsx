@@ -1,5 +1,5 @@
-import { useState, useEffect, useMemo, useCallback } from "react";
-import { useAtom } from "jotai";
+import { useState, useMemo } from "react";
+import { useAtom, useSetAtom } from "jotai";
 import { Replay } from "@mui/icons-material";
 import { Box, Typography, TextField, MenuItem, IconButton } from "@mui/material";
 import { Path, LeafType, DataType, Leaf } from "@/types";
@@ -11,15 +11,20 @@ import {
   isLeaf,
   unwrapParamData,
   getData,
-  setData,
-  updateLastUpdated,
 } from "@/utils/data";
 import { nowTimestamp } from "@/utils/timestamp";
 import { originalDataAtom } from "@/atoms/api";
-import { roundAtom, editModeAtom, editedDataAtom } from "@/atoms/paramList";
-import ItemContent from "./ItemContent";
+import {
+  LeafInput,
+  roundAtom,
+  editModeAtom,
+  editLeafAtom,
+  leafInputAtom,
+} from "@/atoms/paramList";
+import ItemContent, { fixedHeightItemContentSx } from "./ItemContent";
 
 const leafItemContentSx = {
+  ...fixedHeightItemContentSx,
   pl: "24px",
   background: "white",
 };
@@ -61,10 +66,15 @@ type LeafItemEditModeContentProps = {
   path: Path;
 };
 
-/** Input fields for entering a new leaf value. */
+/**
+ * Input fields for entering a new leaf value. The input is stored in leafInputAtom, so it
+ * is kept when this component is unmounted, and the edited data is only updated when the
+ * input is changed by the user.
+ */
 function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentProps) {
   const [originalRootData] = useAtom(originalDataAtom);
-  const [editedRootData, setEditedRootData] = useAtom(editedDataAtom);
+  const editLeaf = useSetAtom(editLeafAtom);
+  const [leafInput, setLeafInput] = useAtom(useMemo(() => leafInputAtom(path), [path]));
 
   const { originalLastUpdated, originalLeaf } = useMemo(() => {
     const originalData = getData(originalRootData, path);
@@ -93,11 +103,7 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
     [originalLeaf],
   );
 
-  const {
-    leafType: editedLeafType,
-    input: editedInput,
-    unitInput: editedUnitInput,
-  } = useMemo(
+  const editedLeafInput = useMemo(
     () => ({ leafType: getLeafType(editedLeaf), ...leafToInput(editedLeaf) }),
     [editedLeaf],
   );
@@ -106,55 +112,36 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
   const [unitInputFocused, setUnitInputFocused] = useState(false);
   const [leafTypeFocused, setLeafTypeFocused] = useState(false);
 
-  const [leafType, setLeafType] = useState(editedLeafType);
-  const [input, setInput] = useState(editedInput);
-  const [unitInput, setUnitInput] = useState(editedUnitInput);
+  const { leafType, input, unitInput } = leafInput ?? editedLeafInput;
 
   const changedInput = input !== originalInput;
   const changedUnitInput = unitInput !== originalUnitInput;
   const changedLeafType = leafType !== originalLeafType;
-  const changed = changedInput || changedUnitInput || changedLeafType;
-
-  const setEditedData = useCallback(
-    ({ leaf, lastUpdated }: { leaf: Leaf; lastUpdated: number | null }) => {
-      // Update the corresponding leaf in the edited data object.
-      if (path.length === 0) {
-        setEditedRootData(leaf);
-      } else {
-        setData(editedRootData, path, {
-          type: "set",
-          value: leaf,
-          withinParamData: true,
-        });
-      }
 
-      if (lastUpdated !== null) {
-        updateLastUpdated(editedRootData, path, lastUpdated);
-      }
-    },
-    [editedRootData, path, setEditedRootData],
-  );
+  /** Update the input, and the edited data to match it. */
+  const updateLeafInput = (newLeafInput: Partial<LeafInput>) => {
+    const updatedLeafInput = { leafType, input, unitInput, ...newLeafInput };
+    const parsedLeaf = parseLeaf(
+      updatedLeafInput.leafType,
+      updatedLeafInput.input,
+      updatedLeafInput.unitInput,
+    );
+    const changed =
+      updatedLeafInput.leafType !== originalLeafType ||
+      updatedLeafInput.input !== originalInput ||
+      updatedLeafInput.unitInput !== originalUnitInput;
 
-  useEffect(() => {
-    const parsedLeaf = parseLeaf(leafType, input, unitInput);
+    setLeafInput(updatedLeafInput);
 
     // Edited data is only updated if it is valid and has actually been changed. The
     // changed check is needed to only update the last updated timestamp if a change has
     // been made.
-    setEditedData(
+    editLeaf(
       parsedLeaf !== undefined && changed
-        ? { leaf: parsedLeaf, lastUpdated: nowTimestamp() }
-        : { leaf: originalLeaf, lastUpdated: originalLastUpdated },
+        ? { path, leaf: parsedLeaf, lastUpdated: nowTimestamp() }
+        : { path, leaf: originalLeaf, lastUpdated: originalLastUpdated },
     );
-  }, [
-    leafType,
-    input,
-    unitInput,
-    changed,
-    originalLeaf,
-    originalLastUpdated,
-    setEditedData,
-  ]);
+  };
 
   return (
     <Box sx={{ display: "flex", columnGap: 1 }}>
@@ -176,7 +163,7 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
         onFocus={() => setInputFocused(true)}
         onBlur={() => setInputFocused(false)}
         color={changedInput ? "success" : undefined}
-        onChange={({ target: { value } }) => setInput(value)}
+        onChange={({ target: { value } }) => updateLeafInput({ input: value })}
       >
         <MenuItem data-testid="bool-input-option-True" value="True">
           True
@@ -197,7 +184,7 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
           onFocus={() => setUnitInputFocused(true)}
           onBlur={() => setUnitInputFocused(false)}
           color={changedUnitInput ? "success" : undefined}
-          onChange={({ target: { value } }) => setUnitInput(value)}
+          onChange={({ target: { value } }) => updateLeafInput({ unitInput: value })}
         />
       )}
       <TextField
@@ -213,14 +200,15 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
         color={changedLeafType ? "success" : undefined}
         onChange={({ target: { value } }) => {
           const newLeafType = value as unknown as LeafType;
+          let newInput = input;
 
           if (newLeafType === LeafType.Boolean) {
-            setInput(input.toLowerCase() === "true" ? "True" : "False");
+            newInput = input.toLowerCase() === "true" ? "True" : "False";
           } else if (newLeafType === LeafType.Null) {
-            setInput("None");
+            newInput = "None";
           }
 
-          setLeafType(newLeafType);
+          updateLeafInput({ leafType: newLeafType, input: newInput });
         }}
       >
         <MenuItem data-testid="leaf-type-option-int-float" value={LeafType.Number}>
@@ -246,11 +234,13 @@ function LeafItemEditModeContent({ editedLeaf, path }: LeafItemEditModeContentPr
         data-testid="reset-leaf-button"
         sx={{ width: "1.75rem", height: "1.75rem" }}
         size="small"
-        onClick={() => {
-          setLeafType(originalLeafType);
-          setInput(originalInput);
-          setUnitInput(originalUnitInput);
-        }}
+        onClick={() =>
+          updateLeafInput({
+            leafType: originalLeafType,
+            input: originalInput,
+            unitInput: originalUnitInput,
+          })
+        }
       >
         <Replay fontSize="small" />
       </IconButton>
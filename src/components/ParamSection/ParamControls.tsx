@@ -2,12 +2,12 @@ import deepEqual from "fast-deep-equal";
 import { useAtom, useSetAtom } from "jotai";
 import { startTransition, useTransition, Suspense } from "react";
 import { Box, FormGroup, FormControlLabel, Switch, Button } from "@mui/material";
-import { originalDataLoadableAtom } from "@/atoms/api";
 import { selectedCommitIndexAtom } from "@/atoms/commitSelect";
 import {
   roundAtom,
   collapseAtom,
   editModeAtom,
+  originalDataLoadableAtom,
   editedDataLoadableAtom,
   commitDialogOpenAtom,
 } from "@/atoms/paramList";
@@ -1,14 +1,96 @@
-import { useMemo, Suspense } from "react";
+import {
+  createContext,
+  useCallback,
+  useContext,
+  useEffect,
+  useLayoutEffect,
+  useMemo,
+  useState,
+  memo,
+  Suspense,
+} from "react";
 import { useAtom } from "jotai";
-import { Box, List, ListItem } from "@mui/material";
-import { Path } from "@/types";
-import { isLeaf, unwrapParamData, getData } from "@/utils/data";
-import { originalDataAtom } from "@/atoms/api";
-import { editModeAtom, editedDataAtom } from "@/atoms/paramList";
-import ItemContent from "./ItemContent";
+import { Box, List, ListItem, LinearProgress } from "@mui/material";
+import { CommitEntry, Path, Data, Group } from "@/types";
+import { isLeaf, unwrapParamData, getChildren } from "@/utils/data";
+import {
+  RowOffsets,
+  RowRange,
+  pathKey,
+  getChildPath,
+  isPathOpen,
+  getRowOffsets,
+  getChildOffset,
+  getVisibleChildren,
+} from "@/utils/paramTree";
+import {
+  originalDataAtom,
+  lazyOriginalDataAtom,
+  selectedCommitAtom,
+  subtreeAtom,
+  removeSubtreeAtoms,
+} from "@/atoms/api";
+import {
+  editModeAtom,
+  editedDataAtPathAtom,
+  removeEditedDataAtPathAtom,
+  openPathsAtom,
+} from "@/atoms/paramList";
+import ItemContent, { itemContentHeight, fixedHeightItemContentSx } from "./ItemContent";
 import LeafItemContent from "./LeafItemContent";
 import CollapseItem from "./CollapseItem";
 
+/**
+ * Height in pixels of a row in the parameter list (an item without its children),
+ * including its 1px border. Item content has a fixed height in both view and edit mode
+ * (see `fixedHeightItemContentSx`), so this is exact. Used to find which items are
+ * scrolled into view, and the height of the space taken up by items that are not
+ * rendered.
+ */
+const rowHeight = itemContentHeight + 1;
+
+/** Number of rows to render above and below the rows that are scrolled into view. */
+const overscanRows = 10;
+
+/**
+ * Duration in ms of the transition when opening or closing a group. This is fixed since
+ * the automatic duration depends on the height of the group, which can be very large.
+ */
+const collapseTimeout = 150;
+
+/** Path of the root item, which is constant so that the paths of items are too. */
+const rootPath: Path = [];
+
+/** Subtrees that are not loaded with the rest of the data for a commit. */
+type LoadedSubtrees = {
+  /** ID of the commit the subtrees are from. */
+  commitId: number;
+  /** Subtrees, keyed by their path keys. */
+  subtrees: Map<string, Data>;
+};
+
+/** Empty subtrees, used before any subtrees are loaded for the selected commit. */
+const noSubtrees = new Map<string, Data>();
+
+type ParamListContextValue = {
+  /** Rows to render, including the rows that are scrolled into view. */
+  visibleRows: RowRange;
+  /** Rows taken up by the open children of each open group. */
+  rowOffsets: RowOffsets;
+  /**
+   * Save a subtree that was loaded when its group was opened, so that the rows of its
+   * open groups can be counted.
+   */
+  registerSubtree: (commitId: number, path: Path, subtree: Data) => void;
+};
+
+/** Context to pass the layout of the parameter list to its items. */
+const ParamListContext = createContext<ParamListContextValue>({
+  visibleRows: { start: 0, end: 0 },
+  rowOffsets: new Map(),
+  registerSubtree: () => {},
+});
+
 const rootListSx = {
   borderBottom: 1,
   borderColor: "divider",
@@ -29,33 +111,163 @@ const listItemSx = {
   "&:last-child": { borderBottom: "none" },
 };
 
+type RowsSpacerProps = {
+  /** Number of rows to take up the space of. */
+  numRows: number;
+};
+
+/** Empty space in place of the given number of rows that are not rendered. */
+function RowsSpacer({ numRows }: RowsSpacerProps) {
+  return <Box component="li" aria-hidden sx={{ height: numRows * rowHeight }} />;
+}
+
+type ParamSublistProps = {
+  /** Commit the data is from. */
+  commit: CommitEntry;
+  /** Path to the group this sublist contains the children of. */
+  path: Path;
+  /** Row of the group this sublist contains the children of. */
+  row: number;
+  /** Original group data. */
+  originalGroup: Group;
+};
+
+/**
+ * Sublist containing an item for each child of the given group. Only the items whose
+ * rows overlap the visible rows are rendered, with empty space in place of the others, so
+ * the time to render a group does not depend on its number of children.
+ *
+ * Edits do not change the structure of the data, so the children are taken from the
+ * original group, and the sublist is not rerendered when its children are edited (each
+ * item gets its own edited data).
+ */
+const ParamSublist = memo(function ParamSublist({
+  commit,
+  path,
+  row,
+  originalGroup,
+}: ParamSublistProps) {
+  const { visibleRows, rowOffsets } = useContext(ParamListContext);
+  const originalChildren = getChildren(originalGroup);
+  const childNames = useMemo(() => Object.keys(originalChildren), [originalChildren]);
+  const groupRows = rowOffsets.get(pathKey(path));
+
+  const { start, end } = getVisibleChildren(groupRows, childNames.length, {
+    start: visibleRows.start - row,
+    end: visibleRows.end - row,
+  });
+  const rowsBefore = getChildOffset(groupRows, start) - 1;
+  const rowsAfter =
+    getChildOffset(groupRows, childNames.length) - getChildOffset(groupRows, end);
+
+  return (
+    <List disablePadding sx={sublistSx}>
+      {rowsBefore > 0 && <RowsSpacer numRows={rowsBefore} />}
+      {childNames.slice(start, end).map((childName, i) => (
+        <ParamListItem
+          key={childName}
+          commit={commit}
+          path={getChildPath(path, childName)}
+          row={row + getChildOffset(groupRows, start + i)}
+          originalData={originalChildren[childName]}
+        />
+      ))}
+      {rowsAfter > 0 && <RowsSpacer numRows={rowsAfter} />}
+    </List>
+  );
+});
+
+type LazyParamSublistProps = {
+  /** Commit the data is from. */
+  commit: CommitEntry;
+  /** Path to the group this sublist contains the children of. */
+  path: Path;
+  /** Row of the group this sublist contains the children of. */
+  row: number;
+};
+
+/**
+ * Sublist for a group whose children were not loaded with the rest of the original data.
+ * The children are requested when this component is rendered (i.e. when the group is
+ * expanded).
+ */
+function LazyParamSublist({ commit, path, row }: LazyParamSublistProps) {
+  const [subtree] = useAtom(subtreeAtom(commit, path));
+  const { registerSubtree } = useContext(ParamListContext);
+  const { innerData } = unwrapParamData(subtree);
+
+  useEffect(
+    () => registerSubtree(commit.id, path, subtree),
+    [registerSubtree, commit.id, path, subtree],
+  );
+
+  if (isLeaf(innerData)) {
+    throw new TypeError(`data at path [${path.join(", ")}] is no longer a group`);
+  }
+
+  return <ParamSublist commit={commit} path={path} row={row} originalGroup={innerData} />;
+}
+
 type ParamListItemProps = {
+  /** Commit the data is from. */
+  commit: CommitEntry;
   /** Path to the data this item represents. */
   path: Path;
+  /** Row of this item in the parameter list. */
+  row: number;
+  /** Original data at the path. */
+  originalData: Data;
 };
 
 /**
- * Item in the parameter list displaying the data at the given path. If the data is a
- * group, then the item will contain a sublist.
+ * Item in the parameter list displaying the given data. If the data is a group, then the
+ * item will contain a sublist. In edit mode, the item displays the edited data at its
+ * path, and is only rerendered when that data is edited (see `editedDataAtPathAtom`).
  */
-function ParamListItem({ path }: ParamListItemProps) {
-  const [editMode] = useAtom(editModeAtom);
-  const [originalData] = useAtom(originalDataAtom);
-  const [editedData] = useAtom(editedDataAtom);
+const ParamListItem = memo(function ParamListItem({
+  commit,
+  path,
+  row,
+  originalData,
+}: ParamListItemProps) {
+  const [openPaths, toggleOpenPath] = useAtom(openPathsAtom);
+  const [editedData] = useAtom(useMemo(() => editedDataAtPathAtom(path), [path]));
+
+  useEffect(() => () => removeEditedDataAtPathAtom(path), [path]);
 
-  const { className, lastUpdated, innerData } = useMemo(() => {
-    const unwrappedOriginalData = unwrapParamData(getData(originalData, path));
-    const { lastUpdated } = unwrappedOriginalData;
+  const { className, lastUpdated, originalInnerData, innerData } = useMemo(() => {
+    const unwrappedOriginalData = unwrapParamData(originalData);
+    const { lastUpdated, innerData: originalInnerData } = unwrappedOriginalData;
 
-    const { className, innerData } = editMode
-      ? unwrapParamData(getData(editedData, path))
-      : unwrappedOriginalData;
+    const { className, innerData } =
+      editedData !== undefined ? unwrapParamData(editedData) : unwrappedOriginalData;
 
-    return { className, lastUpdated, innerData };
-  }, [originalData, path, editMode, editedData]);
+    return { className, lastUpdated, originalInnerData, innerData };
+  }, [originalData, editedData]);
 
   const name = path.length > 0 ? path[path.length - 1] : "root";
 
+  let sublist: JSX.Element | null = null;
+
+  if (!isLeaf(innerData)) {
+    if (innerData.numChildren !== undefined) {
+      sublist = (
+        <Suspense fallback={<LinearProgress />}>
+          <LazyParamSublist commit={commit} path={path} row={row} />
+        </Suspense>
+      );
+    } else if (!isLeaf(originalInnerData)) {
+      sublist = (
+        <ParamSublist
+          commit={commit}
+          path={path}
+          row={row}
+          originalGroup={originalInnerData}
+        />
+      );
+    }
+  }
+
   return (
     <ListItem
       data-testid={`parameter-list-item-${name}`}
@@ -73,30 +285,158 @@ function ParamListItem({ path }: ParamListItemProps) {
         />
       ) : (
         <CollapseItem
-          defaultOpen={path.length === 0}
+          open={openPaths.has(pathKey(path))}
+          onToggle={() => toggleOpenPath(path)}
+          timeout={collapseTimeout}
           itemContent={
-            <ItemContent name={name} className={className} timestamp={lastUpdated} />
+            <ItemContent
+              name={name}
+              className={className}
+              timestamp={lastUpdated}
+              extraSx={fixedHeightItemContentSx}
+            />
           }
         >
-          {
-            <List disablePadding sx={sublistSx}>
-              {Object.keys(innerData.data).map((childName) => (
-                <ParamListItem key={childName} path={[...path, childName]} />
-              ))}
-            </List>
-          }
+          {sublist}
         </CollapseItem>
       )}
     </ListItem>
   );
+});
+
+type ParamListRootProps = {
+  /** Rows to render, including the rows that are scrolled into view. */
+  visibleRows: RowRange;
+};
+
+/**
+ * Root item of the parameter list. In edit mode, the full original and edited data is
+ * used. Otherwise, only the top levels of the original data are loaded, and deeper groups
+ * are loaded when they are expanded.
+ */
+function ParamListRoot({ visibleRows }: ParamListRootProps) {
+  const [editMode] = useAtom(editModeAtom);
+  const [selectedCommit] = useAtom(selectedCommitAtom);
+  const selectedCommitId = selectedCommit.id;
+  const [originalData] = useAtom(editMode ? originalDataAtom : lazyOriginalDataAtom);
+  const [openPaths] = useAtom(openPathsAtom);
+  const [loadedSubtrees, setLoadedSubtrees] = useState<LoadedSubtrees>({
+    commitId: selectedCommitId,
+    subtrees: noSubtrees,
+  });
+
+  const registerSubtree = useCallback(
+    (commitId: number, path: Path, subtree: Data) =>
+      setLoadedSubtrees((previous) => {
+        const key = pathKey(path);
+
+        if (previous.commitId === commitId && previous.subtrees.get(key) === subtree) {
+          return previous;
+        }
+
+        const subtrees = new Map(previous.commitId === commitId ? previous.subtrees : []);
+        subtrees.set(key, subtree);
+        return { commitId, subtrees };
+      }),
+    [],
+  );
+
+  // Remove subtrees from other commits and of groups that are no longer open, so their
+  // data can be garbage collected. This waits for groups to finish closing, since their
+  // children are rendered until then.
+  useEffect(() => {
+    const timeout = setTimeout(() => {
+      const keep = (path: Path) => isPathOpen(path, openPaths);
+
+      removeSubtreeAtoms(selectedCommitId, keep);
+      setLoadedSubtrees((previous) => {
+        const subtrees = new Map(
+          previous.commitId === selectedCommitId
+            ? [...previous.subtrees].filter(([key]) => keep(JSON.parse(key) as Path))
+            : [],
+        );
+
+        return subtrees.size === previous.subtrees.size
+          ? previous
+          : { commitId: selectedCommitId, subtrees };
+      });
+    }, collapseTimeout);
+
+    return () => clearTimeout(timeout);
+  }, [selectedCommitId, openPaths]);
+
+  const subtrees =
+    loadedSubtrees.commitId === selectedCommitId ? loadedSubtrees.subtrees : noSubtrees;
+
+  // Edits do not change the structure of the data, so the original data is used in edit
+  // mode as well, and the rows are not recounted for each edit
+  const rowOffsets = useMemo(
+    () => getRowOffsets(originalData, openPaths, subtrees),
+    [originalData, openPaths, subtrees],
+  );
+
+  const contextValue = useMemo(
+    () => ({ visibleRows, rowOffsets, registerSubtree }),
+    [visibleRows, rowOffsets, registerSubtree],
+  );
+
+  return (
+    <ParamListContext.Provider value={contextValue}>
+      <ParamListItem
+        commit={selectedCommit}
+        path={rootPath}
+        row={0}
+        originalData={originalData}
+      />
+    </ParamListContext.Provider>
+  );
+}
+
+/** Rows to render for the given scroll position and height of the parameter list. */
+function getVisibleRows(list: HTMLElement): RowRange {
+  return {
+    start: Math.max(0, Math.floor(list.scrollTop / rowHeight) - overscanRows),
+    end: Math.ceil((list.scrollTop + list.clientHeight) / rowHeight) + overscanRows,
+  };
 }
 
-/** List of parameter data. */
+/**
+ * List of parameter data. Items are only rendered if they are scrolled into view (or
+ * nearly), so that large groups can be expanded and scrolled quickly. Items are still
+ * nested within the items of their parent groups, with empty space in place of the items
+ * that are not rendered.
+ */
 export default function ParamList() {
+  const [list, setList] = useState<HTMLUListElement | null>(null);
+  const [visibleRows, setVisibleRows] = useState<RowRange>({ start: 0, end: 0 });
+
+  const updateVisibleRows = useCallback(() => {
+    if (list === null) return;
+
+    const newVisibleRows = getVisibleRows(list);
+
+    // Only rerender if the rows to render have changed
+    setVisibleRows((previous) =>
+      previous.start === newVisibleRows.start && previous.end === newVisibleRows.end
+        ? previous
+        : newVisibleRows,
+    );
+  }, [list]);
+
+  useLayoutEffect(() => {
+    if (list === null) return;
+
+    updateVisibleRows();
+
+    const resizeObserver = new ResizeObserver(updateVisibleRows);
+    resizeObserver.observe(list);
+    return () => resizeObserver.disconnect();
+  }, [list, updateVisibleRows]);
+
   return (
     <Suspense fallback={<Box />}>
-      <List disablePadding sx={rootListSx}>
-        <ParamListItem path={[]} />
+      <List ref={setList} disablePadding sx={rootListSx} onScroll={updateVisibleRows}>
+        <ParamListRoot visibleRows={visibleRows} />
       </List>
     </Suspense>
   );
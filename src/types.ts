@@ -5,6 +5,23 @@ export type CommitEntry = {
   timestamp: string;
 };
 
+/** Payload of the "database_update" SocketIO event, sent when a commit is made. */
+export type DatabaseUpdate = {
+  /** ID of the latest commit, or null if there are no commits. */
+  latestCommitId: number | null;
+  /** ID of the latest commit as of the previous update, or null if there were none. */
+  previousCommitId: number | null;
+  /** Commits made since the previous update. */
+  commits: CommitEntry[];
+  /**
+   * Whether the database was replaced or commits were deleted, in which case the full
+   * commit history should be requested.
+   */
+  reset: boolean;
+  /** Number of file system events that were coalesced into this update. */
+  numFileEvents: number;
+};
+
 /** Path to data from the root. */
 export type Path = string[];
 
@@ -60,12 +77,16 @@ export type Quantity = { type: DataType.Quantity; value: number; unit: string };
 export type List<LeafType extends AllowedLeafType = Leaf> = {
   type: DataType.List;
   data: Data<LeafType>[];
+  /** Number of children, if they were not loaded (in which case `data` is empty). */
+  numChildren?: number;
 };
 
 /** Dictionary object representation. */
 export type Dict<LeafType extends AllowedLeafType = Leaf> = {
   type: DataType.Dict;
   data: { [key: string]: Data<LeafType> };
+  /** Number of children, if they were not loaded (in which case `data` is empty). */
+  numChildren?: number;
 };
 
 /** Parameter data object representation. */
@@ -1,13 +1,21 @@
 import "whatwg-fetch"; // Polyfill Fetch API for jsdom
-import { requestData } from "./api";
+import { getCachedData, cacheData, dataCacheSize } from "./dataCache";
+import { requestData, requestCommitData } from "./api";
+
+jest.mock("./dataCache");
 
 const url = "api/url"; // Since we mock fetch, this value is arbitrary
 
 // Mock window.fetch
 const mockFetch = jest.spyOn(window, "fetch");
 
+const mockGetCachedData = jest.mocked(getCachedData);
+const mockCacheData = jest.mocked(cacheData);
+
 beforeEach(() => {
   mockFetch.mockReset();
+  mockGetCachedData.mockReset();
+  mockCacheData.mockReset();
 });
 
 it("throws error on fetch error", async () => {
@@ -91,3 +99,87 @@ it("sends a POST request when body is given", async () => {
     body: JSON.stringify({ data: "test" }),
   });
 });
+
+describe("requestCommitData", () => {
+  const commit = { id: 1, message: "Initial commit", timestamp: "2024-01-01T00:00:00Z" };
+  const key = `http://localhost/${url} ${commit.timestamp}`;
+
+  const body = JSON.stringify({ value: 123 });
+
+  /**
+   * Return a response whose body can be read as a stream containing the given chunks of
+   * text (which must be ASCII), since the polyfilled Response does not support this.
+   */
+  const streamedResponse = (chunks: string[], init?: ResponseInit) => {
+    const response = new Response(chunks.join(""), init);
+    const remainingChunks = chunks.map((chunk) =>
+      Uint8Array.from(chunk, (char) => char.charCodeAt(0)),
+    );
+    const reader = {
+      read: async () => {
+        const value = remainingChunks.shift();
+        return value === undefined ? { done: true } : { done: false, value };
+      },
+    };
+    Object.defineProperty(response, "body", { value: { getReader: () => reader } });
+    return response;
+  };
+
+  it("requests and caches data that is not cached", async () => {
+    mockGetCachedData.mockResolvedValueOnce(null);
+    mockFetch.mockResolvedValueOnce(
+      streamedResponse([body], { headers: { "Content-Length": String(body.length) } }),
+    );
+
+    await expect(requestCommitData(url, commit)).resolves.toEqual({ value: 123 });
+    expect(mockGetCachedData).toHaveBeenCalledWith(key);
+    expect(mockFetch).toHaveBeenCalledTimes(1);
+    expect(mockFetch).toHaveBeenCalledWith(url, undefined);
+    expect(mockCacheData).toHaveBeenCalledTimes(1);
+    expect(mockCacheData).toHaveBeenCalledWith(key, expect.any(Blob));
+  });
+
+  it("caches streamed data without a Content-Length", async () => {
+    mockGetCachedData.mockResolvedValueOnce(null);
+    mockFetch.mockResolvedValueOnce(streamedResponse([body.slice(0, 5), body.slice(5)]));
+
+    await expect(requestCommitData(url, commit)).resolves.toEqual({ value: 123 });
+    expect(mockFetch).toHaveBeenCalledTimes(1);
+    expect(mockCacheData).toHaveBeenCalledTimes(1);
+    expect(mockCacheData).toHaveBeenCalledWith(key, expect.any(Blob));
+    const cachedBody = mockCacheData.mock.calls[0][1];
+    await expect(new Response(cachedBody).text()).resolves.toBe(body);
+  });
+
+  it("does not cache data larger than the cache", async () => {
+    mockGetCachedData.mockResolvedValueOnce(null);
+    mockFetch.mockResolvedValueOnce(
+      new Response(body, { headers: { "Content-Length": String(dataCacheSize + 1) } }),
+    );
+
+    await expect(requestCommitData(url, commit)).resolves.toEqual({ value: 123 });
+    expect(mockFetch).toHaveBeenCalledTimes(1);
+    expect(mockCacheData).not.toHaveBeenCalled();
+  });
+
+  it("returns cached data without a request", async () => {
+    mockGetCachedData.mockResolvedValueOnce(new Blob([body]));
+
+    await expect(requestCommitData(url, commit)).resolves.toEqual({ value: 123 });
+    expect(mockGetCachedData).toHaveBeenCalledWith(key);
+    expect(mockFetch).not.toHaveBeenCalled();
+    expect(mockCacheData).not.toHaveBeenCalled();
+  });
+
+  it("does not cache data if the request fails", async () => {
+    mockGetCachedData.mockResolvedValueOnce(null);
+    mockFetch.mockResolvedValueOnce(
+      new Response("URL not found.", { status: 404, statusText: "NOT FOUND" }),
+    );
+
+    await expect(requestCommitData(url, commit)).rejects.toThrow(
+      "Data request responded with error code 404 (NOT FOUND)",
+    );
+    expect(mockCacheData).not.toHaveBeenCalled();
+  });
+});
@@ -1,10 +1,14 @@
+import { CommitEntry } from "@/types";
+import { getCachedData, cacheData, dataCacheSize } from "@/utils/dataCache";
+
 const notRunningMessage = "\n\nPlease check that paramview is running.";
 
 /**
- * Request data from the given URL and parse the response as JSON. If a body is included,
- * a POST request will be sent with the body as JSON; otherwise, a GET request is sent.
+ * Send a request to the given URL and return the response, or throw an error if the
+ * request failed. If a body is included, a POST request will be sent with the body as
+ * JSON; otherwise, a GET request is sent.
  */
-export async function requestData<T>(url: string, body?: object) {
+async function requestResponse(url: string, body?: object) {
   let response: Response;
 
   const requestInit =
@@ -23,11 +27,10 @@ export async function requestData<T>(url: string, body?: object) {
     throw new Error(`${message}${notRunningMessage}`);
   }
 
-  const responseText = await response.text();
-
   // Verify that request was successful
   if (!response.ok) {
     const { status, statusText } = response;
+    const responseText = await response.text();
 
     let message: string;
     try {
@@ -45,5 +48,102 @@ export async function requestData<T>(url: string, body?: object) {
     );
   }
 
-  return JSON.parse(responseText) as T;
+  return response;
+}
+
+/**
+ * Request data from the given URL and parse the response as JSON. If a body is included,
+ * a POST request will be sent with the body as JSON; otherwise, a GET request is sent.
+ */
+export async function requestData<T>(url: string, body?: object) {
+  const response = await requestResponse(url, body);
+
+  // Parse the body directly from the response stream rather than reading it into a
+  // string first, so large responses are not held in memory twice
+  return (await response.json()) as T;
+}
+
+/**
+ * Read the body of the given response into a blob if it is at most `maxSize` bytes. The
+ * size is counted as the body is read, so this works for responses without a
+ * Content-Length (e.g. streamed responses for very large commits). If the body is larger,
+ * reading stops and a stream of the whole body is returned instead, so it can be parsed
+ * without holding all of it in memory.
+ */
+async function readBodyUpTo(response: Response, maxSize: number) {
+  if (response.body === null) return new Blob();
+
+  const reader = response.body.getReader();
+  const chunks: Uint8Array[] = [];
+  let size = 0;
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) return new Blob(chunks);
+
+    chunks.push(value);
+    size += value.length;
+
+    if (size > maxSize) {
+      return new ReadableStream<Uint8Array>({
+        start: (controller) => {
+          chunks.forEach((chunk) => controller.enqueue(chunk));
+          chunks.length = 0;
+        },
+        pull: async (controller) => {
+          const { done, value } = await reader.read();
+          if (done) {
+            controller.close();
+          } else {
+            controller.enqueue(value);
+          }
+        },
+        cancel: (reason) => reader.cancel(reason),
+      });
+    }
+  }
+}
+
+/**
+ * Request data from the given commit like `requestData()`, but first check the browser's
+ * persistent cache (see `dataCache.ts`), and cache the response if it is requested. Data
+ * from a commit never changes, so cached data can be used without contacting the server.
+ * Responses are only cached if they are at most `dataCacheSize` bytes, since caching
+ * requires reading the whole body into memory before it is parsed; larger responses are
+ * parsed as they are read. Responses without a Content-Length (e.g. streamed responses
+ * for very large commits) are counted as they are read.
+ *
+ * Entries are keyed by the absolute URL, which includes the server and database (for
+ * pages under `/db/<name>/`), the commit ID, and the path and depth of the data, and by
+ * the commit timestamp, so data is not reused if the server is later started with a
+ * different database.
+ */
+export async function requestCommitData<T>(
+  url: string,
+  commit: Pick<CommitEntry, "timestamp">,
+) {
+  const key = `${new URL(url, window.location.href).href} ${commit.timestamp}`;
+  let body = await getCachedData(key);
+
+  if (body === null) {
+    const response = await requestResponse(url);
+    const contentLength = response.headers.get("Content-Length");
+
+    if (contentLength !== null && Number(contentLength) > dataCacheSize) {
+      return (await response.json()) as T;
+    }
+
+    const bodyOrStream = await readBodyUpTo(response, dataCacheSize);
+
+    if (!(bodyOrStream instanceof Blob)) {
+      return (await new Response(bodyOrStream).json()) as T;
+    }
+
+    body = bodyOrStream;
+
+    // Not awaited, so the data is returned without waiting for it to be cached
+    cacheData(key, body);
+  }
+
+  return (await new Response(body).json()) as T;
 }
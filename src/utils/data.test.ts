@@ -327,3 +327,102 @@ describe("setData", () => {
   });
 });
 */
+
+import { Data, DataType } from "@/types";
+import { getData, setData, updateLastUpdated } from "./data";
+
+const paramData = (data: Data, lastUpdated = 0): Data => ({
+  type: DataType.ParamData,
+  className: "Param",
+  lastUpdated,
+  data,
+});
+
+// root
+//   a: 1
+//   b
+//     0: 2
+//     1 (ParamData)
+//       c: 3
+//   d
+//     e: 4
+const data: Data = {
+  type: DataType.Dict,
+  data: {
+    a: 1,
+    b: {
+      type: DataType.List,
+      data: [2, paramData({ type: DataType.Dict, data: { c: 3 } })],
+    },
+    d: { type: DataType.Dict, data: { e: 4 } },
+  },
+};
+const dataCopy = JSON.parse(JSON.stringify(data));
+
+describe("setData", () => {
+  it("throws an error when setting the root data", () =>
+    expect(() => setData(data, [], { type: "set", value: 5 })).toThrow(
+      new RangeError("path is empty (setData cannot set the root data)"),
+    ));
+
+  it("throws an error when setting the child of a leaf", () =>
+    expect(() => setData(data, ["a", "x"], { type: "set", value: 5 })).toThrow(
+      new TypeError(`data '1' has no children (trying to set child "x")`),
+    ));
+
+  it("sets a deeply nested child without mutating the data", () => {
+    const newData = setData(data, ["b", "1", "c"], { type: "set", value: 5 });
+    expect(getData(newData, ["b", "1", "c"])).toBe(5);
+    expect(data).toEqual(dataCopy);
+  });
+
+  it("only copies the data along the path", () => {
+    const newData = setData(data, ["b", "1", "c"], { type: "set", value: 5 });
+    expect(newData).not.toBe(data);
+    expect(getData(newData, ["b"])).not.toBe(getData(data, ["b"]));
+    expect(getData(newData, ["b", "1"])).not.toBe(getData(data, ["b", "1"]));
+    expect(getData(newData, ["d"])).toBe(getData(data, ["d"]));
+    expect(getData(newData, ["b", "0"])).toBe(getData(data, ["b", "0"]));
+  });
+
+  it("keeps lists as arrays", () => {
+    const newData = setData(data, ["b", "0"], { type: "set", value: 5 });
+    expect(getData(newData, ["b"])).toEqual({
+      type: DataType.List,
+      data: [5, getData(data, ["b", "1"])],
+    });
+  });
+
+  it("sets the data within ParamData", () => {
+    const value: Data = { type: DataType.Dict, data: {} };
+    const newData = setData(data, ["b", "1"], {
+      type: "set",
+      value,
+      withinParamData: true,
+    });
+    expect(getData(newData, ["b", "1"])).toEqual(paramData(value));
+  });
+
+  it("deletes a child", () => {
+    const newData = setData(data, ["d", "e"], { type: "delete" });
+    expect(getData(newData, ["d"])).toEqual({ type: DataType.Dict, data: {} });
+    expect(data).toEqual(dataCopy);
+  });
+});
+
+describe("updateLastUpdated", () => {
+  it("updates the last updated time of ParamData without mutating the data", () => {
+    const newData = updateLastUpdated(data, ["b", "1"], 1);
+    expect(getData(newData, ["b", "1"])).toEqual(
+      paramData({ type: DataType.Dict, data: { c: 3 } }, 1),
+    );
+    expect(getData(newData, ["d"])).toBe(getData(data, ["d"]));
+    expect(data).toEqual(dataCopy);
+  });
+
+  it("returns the same data if the data at the path is not ParamData", () =>
+    expect(updateLastUpdated(data, ["d"], 1)).toBe(data));
+
+  it("returns the same data if the last updated time has not changed", () =>
+    expect(updateLastUpdated(data, ["b", "1"], 0)).toBe(data));
+});
@@ -206,67 +206,122 @@ export function getData<LeafType extends AllowedLeafType>(
 }
 
 /**
- * Set the data at the given path to the given value. Note that this mutates the data
- * object that is passed in. The path must not be empty (the root data must be reassigned
- * separately).
- *
- * If the value is `undefined`, the data will be deleted instead.
+ * Return a copy of the given data where the data at the given path is replaced by the
+ * result of `update()`, which is passed the current data at the path (or undefined if it
+ * does not exist), or deleted if the result is undefined. Only the data along the path is
+ * copied, so the rest of the data is shared with the original and keeps its identity. If
+ * `update()` returns the current data, the original data is returned. `action` is used in
+ * the error thrown if the path passes through data with no children.
  */
-export function setData<LeafType extends AllowedLeafType>(
+function updateData<LeafType extends AllowedLeafType>(
   data: Data<LeafType>,
   path: Path,
-  action:
-    | { type: "set"; value: Data<LeafType>; withinParamData?: boolean }
-    | { type: "delete" },
-) {
+  update: (data: Data<LeafType> | undefined) => Data<LeafType> | undefined,
+  action: string,
+): Data<LeafType> | undefined {
   if (path.length === 0) {
-    throw new RangeError(`path is empty (setData cannot ${action.type} the root data)`);
+    return update(data);
   }
 
-  const parentData = getData(data, path.slice(0, -1));
-  const { innerData: parentInnerData } = unwrapParamData(parentData);
-  const key = path[path.length - 1];
+  const { innerData } = unwrapParamData(data);
+  const [childName, ...childPath] = path;
 
-  if (isLeaf(parentInnerData) || parentInnerData.type === DataType.Diff) {
+  if (isLeaf(innerData) || innerData.type === DataType.Diff) {
     throw new TypeError(
-      `data '${JSON.stringify(parentData)}' has no children` +
-        ` (trying to set child "${key}")`,
+      `data '${JSON.stringify(data)}' has no children` +
+        ` (trying to ${action} child "${childName}")`,
     );
   }
 
-  const parentChildren = getChildren(parentInnerData);
+  if (typeof data === "object" && data !== null && data.type === DataType.ParamData) {
+    const newData = updateData(data.data, path, update, action) as Data<LeafType>;
+    return newData === data.data ? data : { ...data, data: newData };
+  }
+
+  const group = data as Group<LeafType>;
+  const children = getChildren(group);
+  const childData = children[childName];
+  const newChildData = updateData(childData, childPath, update, action);
 
-  if (action.type === "delete") {
-    delete parentChildren[key];
+  if (newChildData === childData) {
+    return data;
+  }
+
+  const newChildren = Array.isArray(group.data) ? [...group.data] : { ...group.data };
+
+  if (newChildData === undefined) {
+    delete (newChildren as typeof children)[childName];
   } else {
-    const { value, withinParamData = false } = action;
-    const childData = parentChildren[key];
-
-    if (
-      withinParamData &&
-      typeof childData === "object" &&
-      childData !== null &&
-      childData.type === DataType.ParamData
-    ) {
-      childData.data = value;
-    } else {
-      parentChildren[key] = value;
-    }
+    (newChildren as typeof children)[childName] = newChildData;
   }
+
+  return { ...group, data: newChildren } as Group<LeafType>;
 }
 
 /**
- * If the `Data` specified by the given `Data` and `Path` is `ParamData`, then update its
- * last updated time to the given timestamp.
+ * Return a copy of the given data with the data at the given path set to the given
+ * value, or deleted. If `withinParamData` is true and the data at the path is
+ * `ParamData`, the data within it is set instead. The data that is passed in is not
+ * mutated; only the data along the path is copied (see `updateData()`), so this takes the
+ * same time regardless of the size of the data. The path must not be empty (the root
+ * data must be reassigned separately).
+ */
+export function setData<LeafType extends AllowedLeafType>(
+  data: Data<LeafType>,
+  path: Path,
+  action:
+    | { type: "set"; value: Data<LeafType>; withinParamData?: boolean }
+    | { type: "delete" },
+) {
+  if (path.length === 0) {
+    throw new RangeError(`path is empty (setData cannot ${action.type} the root data)`);
+  }
+
+  const newData = updateData(
+    data,
+    path,
+    (childData) => {
+      if (action.type === "delete") return undefined;
+
+      const { value, withinParamData = false } = action;
+
+      if (
+        withinParamData &&
+        typeof childData === "object" &&
+        childData !== null &&
+        childData.type === DataType.ParamData
+      ) {
+        return { ...childData, data: value };
+      }
+
+      return value;
+    },
+    action.type,
+  );
+
+  // The path is not empty, so the root data is a copy rather than deleted
+  return newData as Data<LeafType>;
+}
+
+/**
+ * If the `Data` specified by the given `Data` and `Path` is `ParamData`, then return a
+ * copy of the given `Data` where its last updated time is set to the given timestamp (see
+ * `setData()`). Otherwise, return the given `Data`.
  */
 export function updateLastUpdated(data: Data, path: Path, timestamp: number) {
-  const updatedData = getData(data, path);
+  const newData = updateData(
+    data,
+    path,
+    (updatedData) =>
+      typeof updatedData === "object" &&
+      updatedData !== null &&
+      updatedData.type === DataType.ParamData &&
+      updatedData.lastUpdated !== timestamp
+        ? { ...updatedData, lastUpdated: timestamp }
+        : updatedData,
+    "update",
+  );
 
-  if (
-    typeof updatedData === "object" &&
-    updatedData !== null &&
-    updatedData.type === DataType.ParamData
-  ) {
-    updatedData.lastUpdated = timestamp;
-  }
+  // The root data is only replaced if it is ParamData, so it is not deleted
+  return newData as Data;
 }
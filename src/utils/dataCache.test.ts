@@ -0,0 +1,82 @@
+/**
+ * @jest-environment node
+ */
+import "fake-indexeddb/auto";
+import { IDBFactory as FakeIDBFactory } from "fake-indexeddb";
+
+type DataCache = typeof import("./dataCache");
+
+let getCachedData: DataCache["getCachedData"];
+let cacheData: DataCache["cacheData"];
+
+const mockNow = jest.spyOn(Date, "now");
+
+beforeEach(async () => {
+  // Use a new database and reload the module for each test, since the module keeps the
+  // database open
+  indexedDB = new FakeIDBFactory() as unknown as IDBFactory;
+  jest.resetModules();
+  ({ getCachedData, cacheData } = await import("./dataCache"));
+  mockNow.mockReturnValue(0);
+});
+
+afterAll(() => mockNow.mockRestore());
+
+/** Return the text of the body cached under the given key, or null if there is none. */
+const getCachedText = async (key: string) => {
+  const body = await getCachedData(key);
+  return body === null ? null : body.text();
+};
+
+it("returns null if the key is not cached", async () => {
+  await expect(getCachedData("a")).resolves.toBeNull();
+});
+
+it("returns cached data", async () => {
+  await cacheData("a", new Blob(["123"]));
+  await cacheData("b", new Blob(["456"]));
+
+  await expect(getCachedText("a")).resolves.toBe("123");
+  await expect(getCachedText("b")).resolves.toBe("456");
+});
+
+it("replaces data cached under the same key", async () => {
+  await cacheData("a", new Blob(["123"]));
+  await cacheData("a", new Blob(["456"]));
+
+  await expect(getCachedText("a")).resolves.toBe("456");
+});
+
+it("does not cache data larger than the maximum size", async () => {
+  await cacheData("a", new Blob(["12345"]), 4);
+
+  await expect(getCachedData("a")).resolves.toBeNull();
+});
+
+it("removes the least recently used data over the maximum size", async () => {
+  mockNow.mockReturnValue(1);
+  await cacheData("a", new Blob(["12"]), 4);
+  mockNow.mockReturnValue(2);
+  await cacheData("b", new Blob(["34"]), 4);
+  mockNow.mockReturnValue(3);
+  await expect(getCachedText("a")).resolves.toBe("12"); // Marks "a" as used
+  mockNow.mockReturnValue(4);
+  await cacheData("c", new Blob(["56"]), 4);
+
+  await expect(getCachedData("b")).resolves.toBeNull();
+  await expect(getCachedText("a")).resolves.toBe("12");
+  await expect(getCachedText("c")).resolves.toBe("56");
+});
+
+it("removes as many entries as needed to fit new data", async () => {
+  mockNow.mockReturnValue(1);
+  await cacheData("a", new Blob(["12"]), 4);
+  mockNow.mockReturnValue(2);
+  await cacheData("b", new Blob(["34"]), 4);
+  mockNow.mockReturnValue(3);
+  await cacheData("c", new Blob(["5678"]), 4);
+
+  await expect(getCachedData("a")).resolves.toBeNull();
+  await expect(getCachedData("b")).resolves.toBeNull();
+  await expect(getCachedText("c")).resolves.toBe("5678");
+});
@@ -0,0 +1,148 @@
+/**
+ * Persistent cache of response bodies in the browser's IndexedDB, used for commit data
+ * (which never changes) so it does not need to be requested again when the page is
+ * reopened or the server restarts. If IndexedDB is not available (e.g. in some private
+ * browsing modes), nothing is cached.
+ */
+
+/** Name of the IndexedDB database. */
+const dbName = "paramview-data-cache";
+
+/**
+ * Name of the object store containing cache entries, which contain the size and last used
+ * time of each response body. These are stored separately from the bodies so that the
+ * cache can be limited to `dataCacheSize` without reading any bodies.
+ */
+const entriesStoreName = "entries";
+
+/** Name of the object store containing response bodies, keyed by their cache keys. */
+const bodiesStoreName = "bodies";
+
+/** Name of the index of cache entries by the time they were last used. */
+const lastUsedIndexName = "lastUsed";
+
+/**
+ * Maximum total size of the cached response bodies in bytes. Once this is exceeded, the
+ * least recently used entries are removed.
+ */
+export const dataCacheSize = 256 * 1024 ** 2;
+
+/** Entry in the cache entries object store. */
+type CacheEntry = {
+  /** Key the response body is cached under. */
+  key: string;
+  /** Size of the response body in bytes. */
+  size: number;
+  /** Time the entry was last used in milliseconds since the epoch. */
+  lastUsed: number;
+};
+
+/** Promise for the IndexedDB database, which is opened the first time it is used. */
+let dbPromise: Promise<IDBDatabase> | undefined;
+
+/** Return a promise that resolves to the result of the given IndexedDB request. */
+function requestResult<T>(request: IDBRequest<T>) {
+  return new Promise<T>((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+/** Return a promise that resolves once the given transaction has been committed. */
+function transactionComplete(transaction: IDBTransaction) {
+  return new Promise<void>((resolve, reject) => {
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+  });
+}
+
+/** Open the IndexedDB database (once), creating the object stores if necessary. */
+function openDb() {
+  dbPromise ??= new Promise<IDBDatabase>((resolve, reject) => {
+    if (typeof indexedDB === "undefined") {
+      reject(new Error("IndexedDB is not available."));
+      return;
+    }
+
+    const request = indexedDB.open(dbName, 1);
+
+    request.onupgradeneeded = () => {
+      const db = request.result;
+      const entriesStore = db.createObjectStore(entriesStoreName, { keyPath: "key" });
+      entriesStore.createIndex(lastUsedIndexName, "lastUsed");
+      db.createObjectStore(bodiesStoreName);
+    };
+
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+
+  return dbPromise;
+}
+
+/**
+ * Return the response body cached under the given key, or null if there is none (or it
+ * could not be read). The entry is marked as the most recently used.
+ */
+export async function getCachedData(key: string) {
+  try {
+    const db = await openDb();
+    const transaction = db.transaction([entriesStoreName, bodiesStoreName], "readwrite");
+    const entriesStore = transaction.objectStore(entriesStoreName);
+    const [entry, body] = await Promise.all([
+      requestResult<CacheEntry | undefined>(entriesStore.get(key)),
+      requestResult<Blob | undefined>(transaction.objectStore(bodiesStoreName).get(key)),
+    ]);
+
+    if (entry === undefined || body === undefined) return null;
+
+    entriesStore.put({ ...entry, lastUsed: Date.now() });
+
+    return body;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Cache the given response body under the given key, then remove the least recently used
+ * entries until the total size is at most `maxSize` (by default `dataCacheSize`). Bodies
+ * larger than this are not cached. Errors (e.g. if storage is full) are ignored, since
+ * the data can still be requested from the server.
+ */
+export async function cacheData(key: string, body: Blob, maxSize = dataCacheSize) {
+  if (body.size > maxSize) return;
+
+  try {
+    const db = await openDb();
+    const transaction = db.transaction([entriesStoreName, bodiesStoreName], "readwrite");
+    const entriesStore = transaction.objectStore(entriesStoreName);
+    const bodiesStore = transaction.objectStore(bodiesStoreName);
+    const entry: CacheEntry = { key, size: body.size, lastUsed: Date.now() };
+
+    bodiesStore.put(body, key);
+    entriesStore.put(entry);
+
+    // Entries in order of when they were last used, including the new entry. Only the
+    // entries are read, not the bodies.
+    const entries = await requestResult<CacheEntry[]>(
+      entriesStore.index(lastUsedIndexName).getAll(),
+    );
+    let totalSize = entries.reduce((size, { size: entrySize }) => size + entrySize, 0);
+
+    for (const { key: entryKey, size } of entries) {
+      if (totalSize <= maxSize) break;
+
+      if (entryKey !== key) {
+        entriesStore.delete(entryKey);
+        bodiesStore.delete(entryKey);
+        totalSize -= size;
+      }
+    }
+
+    await transactionComplete(transaction);
+  } catch {
+    // The data was not cached
+  }
+}
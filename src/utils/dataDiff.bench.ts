@@ -0,0 +1,98 @@
+/**
+ * @jest-environment node
+ */
+import { Data, DataType } from "@/types";
+import { getDataDiff } from "./dataDiff";
+
+// Benchmark for getDataDiff() on generated data with 10^5 and 10^6 leaves, where each
+// group is a ParamDict with 10 children. The time to compare the data with a copy of
+// itself (no changes) and with a copy where 100 leaves have changed are measured. Run
+// using `yarn bench`. Results are printed as JSON once all sizes have run.
+
+/** Number of children of each group. */
+const numChildren = 10;
+
+/** Depths of the generated data, so there are numChildren ** depth leaves. */
+const depths = [5, 6];
+
+/** Number of leaves changed in the new data. */
+const numChanged = 100;
+
+/** Number of times to repeat each measurement. */
+const repeat = 3;
+
+const results: { [key: string]: unknown }[] = [];
+
+/** Generate data with groups of the given depth (see `numChildren`). */
+function generateData(depth: number, start = 0): Data {
+  if (depth === 0) return start + 0.5;
+
+  const children: { [key: string]: Data } = {};
+  const numLeavesPerChild = numChildren ** (depth - 1);
+
+  for (let i = 0; i < numChildren; i += 1) {
+    children[`child${i}`] = generateData(depth - 1, start + i * numLeavesPerChild);
+  }
+
+  return {
+    type: DataType.ParamData,
+    className: "ParamDict",
+    lastUpdated: 0,
+    data: { type: DataType.Dict, data: children },
+  };
+}
+
+/** Change the leaf with the given index in data generated with the given depth. */
+function changeLeaf(data: Data, depth: number, index: number) {
+  let group = data as { data: { data: { [key: string]: Data } } };
+
+  for (let level = depth - 1; level >= 0; level -= 1) {
+    const childName = `child${Math.floor(index / numChildren ** level) % numChildren}`;
+
+    if (level === 0) {
+      group.data.data[childName] = -index;
+    } else {
+      group = group.data.data[childName] as typeof group;
+    }
+  }
+}
+
+/** Return the minimum, median, and maximum time in milliseconds to run the function. */
+function time(run: () => void) {
+  const times = Array.from({ length: repeat }, () => {
+    const start = performance.now();
+    run();
+    return performance.now() - start;
+  }).sort((a, b) => a - b);
+
+  return { min: times[0], median: times[Math.floor(repeat / 2)], max: times[repeat - 1] };
+}
+
+describe("getDataDiff benchmark", () => {
+  afterAll(() => process.stdout.write(`${JSON.stringify(results, null, 2)}\n`));
+
+  it.each(depths)(
+    "compares data of depth %i",
+    (depth) => {
+      const numLeaves = numChildren ** depth;
+      const oldData = generateData(depth);
+      const unchangedData = JSON.parse(JSON.stringify(oldData));
+      const changedData = JSON.parse(JSON.stringify(oldData));
+
+      for (let i = 0; i < numChanged; i += 1) {
+        changeLeaf(changedData, depth, Math.floor((i * numLeaves) / numChanged));
+      }
+
+      expect(getDataDiff(oldData, unchangedData)).toBeNull();
+      expect(getDataDiff(oldData, changedData)).not.toBeNull();
+
+      results.push({
+        leaves: numLeaves,
+        changed: numChanged,
+        unchangedMs: time(() => getDataDiff(oldData, unchangedData)),
+        changedMs: time(() => getDataDiff(oldData, changedData)),
+      });
+    },
+    300_000,
+  );
+});
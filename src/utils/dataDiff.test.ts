@@ -259,3 +259,147 @@ describe("group data", () => {
   );
 });
 */
+
+import { Data, DataType, Diff } from "@/types";
+import { getDataDiff, applyDataDiffLastUpdated } from "./dataDiff";
+
+const paramDict = (data: { [key: string]: Data }, lastUpdated: number): Data => ({
+  type: DataType.ParamData,
+  className: "ParamDict",
+  lastUpdated,
+  data: { type: DataType.Dict, data },
+});
+
+const param = (value: number, lastUpdated: number): Data => ({
+  type: DataType.ParamData,
+  className: "Param",
+  lastUpdated,
+  data: { type: DataType.Dict, data: { value } },
+});
+
+const oldData = paramDict(
+  { a: param(1, 1), b: paramDict({ c: param(2, 1), d: param(3, 1) }, 1) },
+  1,
+);
+const newData = paramDict(
+  { a: param(1, 1), b: paramDict({ c: param(2, 1), d: param(4, 3) }, 1) },
+  1,
+);
+
+const quantity = (value: number): Data => ({ type: DataType.Quantity, value, unit: "m" });
+
+const list = (data: Data[]): Data => ({ type: DataType.List, data });
+
+const dict = (data: { [key: string]: Data }): Data => ({ type: DataType.Dict, data });
+
+describe("getDataDiff", () => {
+  it.each`
+    oldLeaf          | newLeaf
+    ${123}           | ${123}
+    ${"test"}        | ${"test"}
+    ${null}          | ${null}
+    ${quantity(123)} | ${quantity(123)}
+  `("returns null for $oldLeaf and $newLeaf", ({ oldLeaf, newLeaf }) =>
+    expect(getDataDiff(oldLeaf, newLeaf)).toBeNull(),
+  );
+
+  it.each`
+    oldLeaf          | newLeaf
+    ${123}           | ${456}
+    ${123}           | ${"test"}
+    ${quantity(123)} | ${quantity(456)}
+    ${true}          | ${quantity(123)}
+    ${123}           | ${dict({})}
+  `("returns a Diff for $oldLeaf and $newLeaf", ({ oldLeaf, newLeaf }) =>
+    expect(getDataDiff(oldLeaf, newLeaf)).toEqual({
+      type: DataType.Diff,
+      old: oldLeaf,
+      new: newLeaf,
+    }),
+  );
+
+  it("returns null for equal groups", () =>
+    expect(getDataDiff(oldData, JSON.parse(JSON.stringify(oldData)))).toBeNull());
+
+  it("returns a Diff for groups with different class names", () => {
+    const oldGroup = param(1, 1);
+    const newGroup = paramDict({ value: 1 }, 1);
+    expect(getDataDiff(oldGroup, newGroup)).toEqual({
+      type: DataType.Diff,
+      old: oldGroup,
+      new: newGroup,
+    });
+  });
+
+  it("includes only the changed children of dicts, followed by deleted children", () => {
+    const dataDiff = getDataDiff(
+      dict({ a: 1, b: 2, c: 3 }),
+      dict({ d: 4, c: 3, b: 5 }),
+    ) as { data: object };
+    expect(dataDiff).toEqual(
+      dict({
+        d: { type: DataType.Diff, new: 4 },
+        b: { type: DataType.Diff, old: 2, new: 5 },
+        a: { type: DataType.Diff, old: 1 },
+      }),
+    );
+    expect(Object.keys(dataDiff.data)).toEqual(["d", "b", "a"]);
+  });
+
+  it("includes only the changed children of lists", () => {
+    const dataDiff = getDataDiff(list([1, 2, 3]), list([1, 4])) as { data: Data[] };
+    expect(dataDiff.type).toBe(DataType.List);
+    expect(Object.keys(dataDiff.data)).toEqual(["1", "2"]);
+    expect(dataDiff.data[1]).toEqual({ type: DataType.Diff, old: 2, new: 4 });
+    expect(dataDiff.data[2]).toEqual({ type: DataType.Diff, old: 3 });
+  });
+
+  it("returns a group with no children if only non-child properties changed", () =>
+    expect(getDataDiff(param(1, 1), param(1, 2))).toEqual({
+      ...(param(1, 2) as object),
+      data: dict({}),
+    }));
+
+  it("updates the last updated times of changed ParamData in the new data", () => {
+    const mutatedNewData = JSON.parse(JSON.stringify(newData));
+    const paramDiff = {
+      ...(param(4, 3) as object),
+      data: dict({ value: { type: DataType.Diff, old: 3, new: 4 } as unknown as Data }),
+    } as Data;
+    expect(getDataDiff(oldData, mutatedNewData)).toEqual(
+      paramDict({ b: paramDict({ d: paramDiff }, 3) }, 3),
+    );
+    expect(mutatedNewData).toEqual(
+      paramDict(
+        { a: param(1, 1), b: paramDict({ c: param(2, 1), d: param(4, 3) }, 3) },
+        3,
+      ),
+    );
+  });
+});
+
+describe("getDataDiff progress", () => {
+  it("reports the number of children compared", () => {
+    const onProgress = jest.fn();
+    getDataDiff(oldData, JSON.parse(JSON.stringify(newData)), onProgress);
+    expect(onProgress.mock.calls).toEqual([
+      [1, 4],
+      [2, 4],
+      [3, 4],
+      [4, 4],
+    ]);
+  });
+});
+
+describe("applyDataDiffLastUpdated", () => {
+  it("applies the timestamps that getDataDiff sets in the new data", () => {
+    const mutatedNewData = JSON.parse(JSON.stringify(newData));
+    const dataDiff = getDataDiff(oldData, mutatedNewData);
+    expect(dataDiff).not.toBeNull();
+
+    const newDataCopy = JSON.parse(JSON.stringify(newData));
+    const updatedData = applyDataDiffLastUpdated(newData, dataDiff as Data<Diff>);
+    expect(updatedData).toEqual(mutatedNewData);
+    expect(newData).toEqual(newDataCopy);
+  });
+});
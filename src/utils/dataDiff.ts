@@ -1,89 +1,211 @@
 import deepEquals from "fast-deep-equal";
-import { DataType, Data, Group, ParamData, Diff } from "@/types";
-import { isLeaf, unwrapParamData, getData, setData } from "@/utils/data";
+import { Path, DataType, Data, Leaf, Group, ParamData, Diff } from "@/types";
+import { isLeaf, unwrapParamData, getChildren, updateLastUpdated } from "@/utils/data";
+
+/**
+ * Whether the two given `Data` objects have the same properties other than the children
+ * of groups, including the properties of any `ParamData` they are wrapped in.
+ */
+function equalExceptChildren(oldData: Data, newData: Data): boolean {
+  if (isLeaf(oldData) || isLeaf(newData)) {
+    return deepEquals(oldData, newData);
+  }
+
+  const oldProperties = oldData as { [key: string]: unknown };
+  const newProperties = newData as { [key: string]: unknown };
+  const keys = Object.keys(oldProperties);
+
+  return (
+    keys.length === Object.keys(newProperties).length &&
+    keys.every((key) =>
+      key === "data"
+        ? oldData.type !== DataType.ParamData ||
+          newData.type !== DataType.ParamData ||
+          equalExceptChildren(oldData.data, newData.data)
+        : oldProperties[key] === newProperties[key],
+    )
+  );
+}
+
+/**
+ * Return the class name (or `null`) and the underlying `Data` value of the given `Data`,
+ * like `unwrapParamData()` but without formatting the last updated timestamp, since this
+ * is called for every item being compared.
+ */
+function unwrapClassName(data: Data) {
+  let className: string | undefined;
+  let innerData = data;
+
+  while (
+    typeof innerData === "object" &&
+    innerData !== null &&
+    innerData.type === DataType.ParamData
+  ) {
+    ({ className, data: innerData } = innerData);
+  }
+
+  return { className: className ?? null, innerData: innerData as Leaf | Group };
+}
+
+/**
+ * Return a copy of the `ParamData` that the given `Data` is wrapped in (if any), wrapping
+ * the given group instead.
+ */
+function rewrapParamData(data: Data, group: Group<Diff>): Group<Diff> | ParamData<Diff> {
+  if (typeof data === "object" && data !== null && data.type === DataType.ParamData) {
+    return { ...data, data: rewrapParamData(data.data, group) } as ParamData<Diff>;
+  }
+
+  return group;
+}
 
 /**
  * Return the difference between the two given `Data` objects.
  *
- * If the two `Data` objects have children and the same `DataType`, then this function
- * will return a `Group` object with the same `DataType` containing differences for each
- * child that has changed.
+ * If the two `Data` objects have children and the same class name, then this function
+ * will return a `Group` object (wrapped in the same `ParamData` as the new `Data`)
+ * containing differences for each child that has changed. Children that have not changed
+ * are omitted. Children that were deleted are included after the other children.
  *
  * Otherwise, it will return a `Diff` object if the old and new `Data` objects are
  * different, or `null` if they are equal.
  *
  * This function also modifies the last updated timestamps of `ParamData` items in the new
  * `Data` to be the latest last updated time of their children.
+ *
+ * Each item is compared once, and objects are only created for the parts of the data
+ * that have changed, so this takes time proportional to the size of the data.
+ *
+ * If `onProgress` is given, it is called with the number of children of the given data
+ * that have been compared so far and the total number to compare, after each one.
  */
-export function getDataDiff(oldData: Data, newData: Data): Data<Diff> | null {
-  const { className: oldClassName, innerData: oldInnerData } = unwrapParamData(oldData);
-  const { className: newClassName, innerData: newInnerData } = unwrapParamData(newData);
-
-  if (deepEquals(oldData, newData)) {
-    return null;
-  }
+export function getDataDiff(
+  oldData: Data,
+  newData: Data,
+  onProgress?: (numCompared: number, numTotal: number) => void,
+): Data<Diff> | null {
+  const { className: oldClassName, innerData: oldInnerData } = unwrapClassName(oldData);
+  const { className: newClassName, innerData: newInnerData } = unwrapClassName(newData);
 
-  // If either Data object has no children or has a different DataType, then return a Diff
-  // comparison object.
+  // If either Data object has no children or has a different class name, then return a
+  // Diff comparison object if they are different.
   if (isLeaf(oldInnerData) || isLeaf(newInnerData) || oldClassName !== newClassName) {
-    return { type: DataType.Diff, old: oldData, new: newData };
+    return deepEquals(oldData, newData)
+      ? null
+      : { type: DataType.Diff, old: oldData, new: newData };
   }
 
-  // Otherwise, return a Group object containing Diffs for its children. Children that
-  // have not been changed are set to undefined.
+  // Otherwise, compare the children. The children of the difference are only created
+  // once a child has changed.
+  const oldChildren = getChildren(oldInnerData);
+  const newChildren = getChildren(newInnerData);
+  const oldChildNames = Object.keys(oldChildren);
+  const newChildNames = Object.keys(newChildren);
+  const numTotal = oldChildNames.length + newChildNames.length;
+  let numCompared = 0;
+  let childDataDiffs = null as { [key: string]: Data<Diff> } | null;
 
-  // Start with deep copy of the new Data. It is important to use the new Data so that the
-  // latest non-child properties are shown, such as the last updated time for Params.
-  const dataDiff: Group<Diff> | ParamData<Diff> = JSON.parse(JSON.stringify(newData));
+  const setChildDataDiff = (childName: string, childDataDiff: Data<Diff>) => {
+    childDataDiffs ??= (Array.isArray(newInnerData.data) ? [] : {}) as {
+      [key: string]: Data<Diff>;
+    };
+    childDataDiffs[childName] = childDataDiff;
+  };
 
-  // Compare each child of the old Data to the corresponding child in the new Data. If
-  // they are the same, delete from groupDiff. Otherwise, set that child to the
-  // difference.
-  Object.entries(oldInnerData.data).forEach(([oldChildName, oldChildData]) => {
-    const newChildData = getData(newData, [oldChildName]);
-    const childDataDiff = getDataDiff(oldChildData, newChildData);
+  // Compare each child of the new Data to the corresponding child in the old Data, if
+  // any
+  for (const childName of newChildNames) {
+    const newChildData = newChildren[childName];
+    const childDataDiff = Object.hasOwn(oldChildren, childName)
+      ? getDataDiff(oldChildren[childName], newChildData)
+      : { type: DataType.Diff as const, new: newChildData };
 
-    setData(
-      dataDiff,
-      [oldChildName],
-      childDataDiff === null ? { type: "delete" } : { type: "set", value: childDataDiff },
-    );
-  });
-
-  // Perform the same operation in reverse (for children that have been added in the
-  // new data).
-  Object.entries(newInnerData.data).forEach(([newChildName, newChildData]) => {
-    const oldChildData = getData(oldData, [newChildName]);
-    const childDataDiff = getDataDiff(oldChildData, newChildData);
-
-    setData(
-      dataDiff,
-      [newChildName],
-      dataDiff === null ? { type: "delete" } : { type: "set", value: childDataDiff },
-    );
-  });
+    if (childDataDiff !== null) {
+      setChildDataDiff(childName, childDataDiff);
+    }
+
+    numCompared += 1;
+    onProgress?.(numCompared, numTotal);
+  }
+
+  // Add children that were deleted in the new Data
+  for (const childName of oldChildNames) {
+    if (!Object.hasOwn(newChildren, childName)) {
+      setChildDataDiff(childName, { type: DataType.Diff, old: oldChildren[childName] });
+    }
+
+    numCompared += 1;
+    onProgress?.(numCompared, numTotal);
+  }
+
+  if (childDataDiffs === null && equalExceptChildren(oldData, newData)) {
+    return null;
+  }
 
-  // Update timestamps for the new `Data` and for the `Data<Diff>`
+  // Update the timestamp of the new Data (and so of the Data<Diff>) to the latest last
+  // updated time of its children
   if (
     typeof newData === "object" &&
     newData !== null &&
     newData.type === DataType.ParamData
   ) {
-    const latestLastUpdated = Math.max(
-      ...Object.values(newInnerData.data).map((newChildData) =>
+    let latestLastUpdated = -Infinity;
+
+    for (const childName of newChildNames) {
+      const newChildData = newChildren[childName];
+
+      if (
         typeof newChildData === "object" &&
         newChildData !== null &&
-        newChildData.type === DataType.ParamData
-          ? newChildData.lastUpdated
-          : -Infinity,
-      ),
-    );
+        newChildData.type === DataType.ParamData &&
+        newChildData.lastUpdated > latestLastUpdated
+      ) {
+        latestLastUpdated = newChildData.lastUpdated;
+      }
+    }
 
     if (isFinite(latestLastUpdated)) {
       newData.lastUpdated = latestLastUpdated;
-      (dataDiff as ParamData).lastUpdated = latestLastUpdated;
     }
   }
 
-  return dataDiff;
+  // Start with a shallow copy of the new Data, so that the latest non-child properties
+  // are shown, such as the last updated time for Params
+  return rewrapParamData(newData, {
+    ...newInnerData,
+    data: childDataDiffs ?? (Array.isArray(newInnerData.data) ? [] : {}),
+  } as Group<Diff>);
+}
+
+/**
+ * Return a copy of the given new `Data` where the last updated timestamps of `ParamData`
+ * items are set to those in the given difference, i.e. the changes `getDataDiff()` makes
+ * to the new `Data` when computing the difference. This is needed when the difference was
+ * computed from a different copy of the data (e.g. in a Web Worker). Only the data along
+ * the paths of changed timestamps is copied (see `updateLastUpdated()`).
+ */
+export function applyDataDiffLastUpdated(newData: Data, dataDiff: Data<Diff>) {
+  let updatedData = newData;
+
+  const applyLastUpdated = (childDataDiff: Data<Diff>, path: Path) => {
+    const { innerData } = unwrapParamData(childDataDiff);
+
+    if (isLeaf(innerData) || innerData.type === DataType.Diff) return;
+
+    if (
+      typeof childDataDiff === "object" &&
+      childDataDiff !== null &&
+      childDataDiff.type === DataType.ParamData
+    ) {
+      updatedData = updateLastUpdated(updatedData, path, childDataDiff.lastUpdated);
+    }
+
+    Object.entries(getChildren(innerData)).forEach(([childName, grandchildDataDiff]) =>
+      applyLastUpdated(grandchildDataDiff, [...path, childName]),
+    );
+  };
+
+  applyLastUpdated(dataDiff, []);
+
+  return updatedData;
 }
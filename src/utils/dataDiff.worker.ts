@@ -0,0 +1,43 @@
+import { Data, Diff } from "@/types";
+import { getDataDiff } from "@/utils/dataDiff";
+
+/** Message sent to the worker with the data to compare. */
+export type DataDiffRequest = { oldData: Data; newData: Data };
+
+/** Message sent from the worker with its progress, the difference, or an error. */
+export type DataDiffResponse =
+  | { type: "progress"; progress: number }
+  | { type: "result"; dataDiff: Data<Diff> | null }
+  | { type: "error"; message: string };
+
+/** Minimum time in milliseconds between progress messages. */
+const progressInterval = 50;
+
+const respond = (response: DataDiffResponse) => self.postMessage(response);
+
+/**
+ * Compute the difference between the data in the request (see `getDataDiff()`), sending
+ * messages with the progress while comparing. Each worker computes one difference (see
+ * `getDataDiffInWorker()`).
+ */
+self.addEventListener(
+  "message",
+  ({ data: { oldData, newData } }: MessageEvent<DataDiffRequest>) => {
+    let lastProgressTime = performance.now();
+
+    try {
+      const dataDiff = getDataDiff(oldData, newData, (numCompared, numTotal) => {
+        const now = performance.now();
+
+        if (now - lastProgressTime >= progressInterval) {
+          lastProgressTime = now;
+          respond({ type: "progress", progress: numCompared / numTotal });
+        }
+      });
+
+      respond({ type: "result", dataDiff });
+    } catch (error) {
+      respond({ type: "error", message: String(error) });
+    }
+  },
+);
@@ -0,0 +1,71 @@
+import { Data, Diff } from "@/types";
+import type { DataDiffRequest, DataDiffResponse } from "./dataDiff.worker";
+
+type DataDiffOptions = {
+  /** Called with the fraction of the data compared so far, from 0 to 1. */
+  onProgress?: (progress: number) => void;
+  /** Signal to stop computing the difference. */
+  signal?: AbortSignal;
+};
+
+/**
+ * Return the difference between the two given `Data` objects (see `getDataDiff()`),
+ * computed in a Web Worker so that the page stays responsive while comparing large data.
+ * The data is sent to the worker as a structured clone, so the timestamps that
+ * `getDataDiff()` would modify in the new `Data` are not modified (see
+ * `applyDataDiffLastUpdated()`).
+ *
+ * If the given signal is aborted, the worker is terminated and the returned promise is
+ * rejected with the reason of the signal.
+ */
+export function getDataDiffInWorker(
+  oldData: Data,
+  newData: Data,
+  { onProgress, signal }: DataDiffOptions = {},
+) {
+  return new Promise<Data<Diff> | null>((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(signal.reason);
+      return;
+    }
+
+    const worker = new Worker(new URL("./dataDiff.worker.ts", import.meta.url), {
+      type: "module",
+    });
+
+    const stop = () => {
+      worker.terminate();
+      signal?.removeEventListener("abort", abort);
+    };
+
+    const abort = () => {
+      stop();
+      reject(signal?.reason);
+    };
+
+    signal?.addEventListener("abort", abort);
+
+    worker.addEventListener("message", ({ data }: MessageEvent<DataDiffResponse>) => {
+      if (data.type === "progress") {
+        onProgress?.(data.progress);
+        return;
+      }
+
+      stop();
+
+      if (data.type === "result") {
+        resolve(data.dataDiff);
+      } else {
+        reject(new Error(data.message));
+      }
+    });
+
+    worker.addEventListener("error", (event) => {
+      stop();
+      reject(new Error(event.message));
+    });
+
+    const request: DataDiffRequest = { oldData, newData };
+    worker.postMessage(request);
+  });
+}
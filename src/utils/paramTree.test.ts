@@ -0,0 +1,172 @@
+import { Data, DataType } from "@/types";
+import {
+  pathKey,
+  getChildPath,
+  isPathOpen,
+  getRowOffsets,
+  getChildOffset,
+  getVisibleChildren,
+} from "./paramTree";
+
+const list = (data: Data[]): Data => ({ type: DataType.List, data });
+
+const dict = (data: { [key: string]: Data }): Data => ({ type: DataType.Dict, data });
+
+const unloadedDict = (numChildren: number): Data => ({
+  type: DataType.Dict,
+  data: {},
+  numChildren,
+});
+
+const paramData = (data: Data): Data => ({
+  type: DataType.ParamData,
+  className: "Param",
+  lastUpdated: 0,
+  data,
+});
+
+// root
+//   a: 1
+//   b
+//     0: 2
+//     1
+//       c: 3
+//   d (ParamData)
+//     e: 4
+//   f (3 children, not loaded)
+const data = dict({
+  a: 1,
+  b: list([2, dict({ c: 3 })]),
+  d: paramData(dict({ e: 4 })),
+  f: unloadedDict(3),
+});
+
+describe("getChildPath", () => {
+  it("returns the path to the child", () => {
+    expect(getChildPath(["a", "b"], "c")).toEqual(["a", "b", "c"]);
+  });
+
+  it("returns the same array for the same path and child name", () => {
+    const path = ["a"];
+    expect(getChildPath(path, "b")).toBe(getChildPath(path, "b"));
+    expect(getChildPath(path, "b")).not.toBe(getChildPath(path, "c"));
+    expect(getChildPath(path, "b")).not.toBe(getChildPath(["a"], "b"));
+  });
+});
+
+const openPaths = (...paths: string[][]) => new Set(paths.map(pathKey));
+
+describe("isPathOpen", () => {
+  it.each`
+    path          | expected
+    ${[]}         | ${true}
+    ${["b"]}      | ${true}
+    ${["b", "1"]} | ${false}
+    ${["d"]}      | ${false}
+    ${["d", "e"]} | ${false}
+  `("returns $expected for path $path", ({ path, expected }) => {
+    expect(isPathOpen(path, openPaths([], ["b"], ["d", "e"]))).toBe(expected);
+  });
+
+  it("returns false if the root is closed", () => {
+    expect(isPathOpen(["b"], openPaths(["b"]))).toBe(false);
+  });
+});
+
+describe("getRowOffsets", () => {
+  it("includes no groups if the root is closed", () => {
+    expect(getRowOffsets(data, openPaths(), new Map())).toEqual(new Map());
+  });
+
+  it("omits groups whose children are all closed", () => {
+    expect(getRowOffsets(data, openPaths([]), new Map())).toEqual(new Map());
+  });
+
+  it("includes the rows of open children", () => {
+    const rowOffsets = getRowOffsets(
+      data,
+      openPaths([], ["b"], ["b", "1"], ["d"]),
+      new Map(),
+    );
+    expect(rowOffsets).toEqual(
+      new Map([
+        [pathKey([]), { indices: [1, 2], extraRows: [3, 4] }],
+        [pathKey(["b"]), { indices: [1], extraRows: [1] }],
+      ]),
+    );
+  });
+
+  it("ignores open groups whose parents are closed or that no longer exist", () => {
+    const rowOffsets = getRowOffsets(
+      data,
+      openPaths([], ["b", "1"], ["x"], ["a", "y"]),
+      new Map(),
+    );
+    expect(rowOffsets).toEqual(new Map());
+  });
+
+  it("assumes the children of unloaded groups are closed", () => {
+    const rowOffsets = getRowOffsets(data, openPaths([], ["f"]), new Map());
+    expect(rowOffsets).toEqual(
+      new Map([[pathKey([]), { indices: [3], extraRows: [3] }]]),
+    );
+  });
+
+  it("uses loaded subtrees for unloaded groups", () => {
+    const subtrees = new Map([
+      [pathKey(["f"]), dict({ g: 5, h: dict({ i: 6, j: 7 }), k: unloadedDict(2) })],
+    ]);
+    const rowOffsets = getRowOffsets(data, openPaths([], ["f"], ["f", "h"]), subtrees);
+    expect(rowOffsets).toEqual(
+      new Map([
+        [pathKey([]), { indices: [3], extraRows: [5] }],
+        [pathKey(["f"]), { indices: [1], extraRows: [2] }],
+      ]),
+    );
+  });
+});
+
+// Children 0 and 2 take one row, child 1 takes 4 rows (rows 2 to 5), and child 3 takes
+// 2 rows (rows 7 and 8)
+const groupRows = { indices: [1, 3], extraRows: [3, 4] };
+
+describe("getChildOffset", () => {
+  it.each`
+    index | expected
+    ${0}  | ${1}
+    ${1}  | ${2}
+    ${2}  | ${6}
+    ${3}  | ${7}
+    ${4}  | ${9}
+  `("returns $expected for child $index", ({ index, expected }) => {
+    expect(getChildOffset(groupRows, index)).toBe(expected);
+  });
+
+  it("assumes children take one row if none are open", () => {
+    expect(getChildOffset(undefined, 0)).toBe(1);
+    expect(getChildOffset(undefined, 5)).toBe(6);
+  });
+});
+
+describe("getVisibleChildren", () => {
+  it.each`
+    start | end   | expected
+    ${0}  | ${1}  | ${{ start: 0, end: 0 }}
+    ${0}  | ${2}  | ${{ start: 0, end: 1 }}
+    ${1}  | ${2}  | ${{ start: 0, end: 1 }}
+    ${3}  | ${4}  | ${{ start: 1, end: 2 }}
+    ${5}  | ${7}  | ${{ start: 1, end: 3 }}
+    ${8}  | ${20} | ${{ start: 3, end: 4 }}
+    ${9}  | ${20} | ${{ start: 4, end: 4 }}
+    ${0}  | ${20} | ${{ start: 0, end: 4 }}
+  `("returns $expected for rows $start to $end", ({ start, end, expected }) => {
+    expect(getVisibleChildren(groupRows, 4, { start, end })).toEqual(expected);
+  });
+
+  it("assumes children take one row if none are open", () => {
+    expect(getVisibleChildren(undefined, 100_000, { start: 500, end: 530 })).toEqual({
+      start: 499,
+      end: 529,
+    });
+  });
+});
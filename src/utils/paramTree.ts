@@ -0,0 +1,232 @@
+import { Path, Data } from "@/types";
+import { isLeaf, unwrapParamData, getChildren } from "@/utils/data";
+
+/**
+ * Rows taken up by the open children of a group in the parameter list. Each item takes
+ * up one row, followed by the rows of its children if it is an open group, so only the
+ * open children of a group need to be stored to find the row of any of its children.
+ */
+export type GroupRows = {
+  /** Indices of the open children that take up more than one row, in order. */
+  indices: number[];
+  /** Number of extra rows taken up by the children up to each of these indices. */
+  extraRows: number[];
+};
+
+/**
+ * Rows taken up by the open children of each open group in a parameter tree, keyed by
+ * the path key of the group (see `pathKey()`). Groups whose children are all closed are
+ * not included.
+ */
+export type RowOffsets = Map<string, GroupRows>;
+
+/** Range of rows or children, from `start` (inclusive) to `end` (exclusive). */
+export type RowRange = { start: number; end: number };
+
+/** Cached indices of the children of groups, keyed by their children objects. */
+const childIndicesCache = new WeakMap<object, Map<string, number>>();
+
+/** Cached paths of the children of paths, keyed by the parent paths. */
+const childPathsCache = new WeakMap<Path, Map<string, Path>>();
+
+/** Key for the given path, used to identify items in sets and maps. */
+export function pathKey(path: Path) {
+  return JSON.stringify(path);
+}
+
+/**
+ * Path to the child with the given name of the data at the given path. The same array is
+ * returned each time for the same path array and child name, so child paths can be
+ * compared by identity (e.g. to skip rerendering items whose props have not changed).
+ */
+export function getChildPath(path: Path, childName: string) {
+  let childPaths = childPathsCache.get(path);
+
+  if (childPaths === undefined) {
+    childPaths = new Map();
+    childPathsCache.set(path, childPaths);
+  }
+
+  let childPath = childPaths.get(childName);
+
+  if (childPath === undefined) {
+    childPath = [...path, childName];
+    childPaths.set(childName, childPath);
+  }
+
+  return childPath;
+}
+
+/**
+ * Whether the group at the given path and all of the groups containing it are open, i.e.
+ * whether its children are shown, where `openPaths` contains the path keys of open
+ * groups.
+ */
+export function isPathOpen(path: Path, openPaths: Set<string>) {
+  for (let length = 0; length <= path.length; length += 1) {
+    if (!openPaths.has(pathKey(path.slice(0, length)))) return false;
+  }
+
+  return true;
+}
+
+/**
+ * Index of the first integer from `low` to `high` (exclusive) that satisfies the given
+ * condition, or `high` if none do, where the condition is false for all integers before
+ * this index and true for all integers after it.
+ */
+function bisect(low: number, high: number, condition: (index: number) => boolean) {
+  while (low < high) {
+    const middle = Math.floor((low + high) / 2);
+
+    if (condition(middle)) {
+      high = middle;
+    } else {
+      low = middle + 1;
+    }
+  }
+
+  return low;
+}
+
+/** Map from the names of the given children of a group to their indices. */
+function getChildIndices(children: { [key: string]: Data }) {
+  let childIndices = childIndicesCache.get(children);
+
+  if (childIndices === undefined) {
+    childIndices = new Map(Object.keys(children).map((name, index) => [name, index]));
+    childIndicesCache.set(children, childIndices);
+  }
+
+  return childIndices;
+}
+
+/**
+ * Get the rows taken up by the open children of each open group in the given data (see
+ * `RowOffsets`). `openPaths` contains the path keys of open groups, and `subtrees`
+ * contains subtrees that were loaded separately, keyed by their path keys, for groups
+ * whose children are not included in the data. If an open group's children have not been
+ * loaded, its children are assumed to be closed.
+ *
+ * Only open groups are visited, so the time this takes does not depend on the number of
+ * children of each group (after the first time a group is visited).
+ */
+export function getRowOffsets(
+  data: Data,
+  openPaths: Set<string>,
+  subtrees: Map<string, Data>,
+) {
+  const rowOffsets: RowOffsets = new Map();
+
+  // Names of the open children of each group, keyed by the path key of the group
+  const openChildNames = new Map<string, string[]>();
+
+  for (const key of openPaths) {
+    const path = JSON.parse(key) as Path;
+
+    if (path.length > 0) {
+      const parentKey = pathKey(path.slice(0, -1));
+      const childNames = openChildNames.get(parentKey) ?? [];
+      childNames.push(path[path.length - 1]);
+      openChildNames.set(parentKey, childNames);
+    }
+  }
+
+  /** Return the number of rows taken up by the item with the given data and path. */
+  const getNumRows = (itemData: Data, path: Path, key: string): number => {
+    const { innerData } = unwrapParamData(itemData);
+
+    if (isLeaf(innerData) || !openPaths.has(key)) return 1;
+
+    let group = innerData;
+
+    if (group.numChildren !== undefined) {
+      const subtree = subtrees.get(key);
+      const innerSubtree =
+        subtree !== undefined ? unwrapParamData(subtree).innerData : null;
+
+      if (innerSubtree === null || isLeaf(innerSubtree)) return 1 + group.numChildren;
+
+      group = innerSubtree;
+    }
+
+    const children = getChildren(group);
+    const childIndices = getChildIndices(children);
+    const openChildren: { index: number; extraRows: number }[] = [];
+
+    for (const childName of openChildNames.get(key) ?? []) {
+      const index = childIndices.get(childName);
+
+      if (index !== undefined) {
+        const childPath = [...path, childName];
+        const numRows = getNumRows(children[childName], childPath, pathKey(childPath));
+        if (numRows > 1) openChildren.push({ index, extraRows: numRows - 1 });
+      }
+    }
+
+    let extraRows = 0;
+
+    if (openChildren.length > 0) {
+      openChildren.sort((a, b) => a.index - b.index);
+
+      const groupRows: GroupRows = { indices: [], extraRows: [] };
+
+      for (const openChild of openChildren) {
+        extraRows += openChild.extraRows;
+        groupRows.indices.push(openChild.index);
+        groupRows.extraRows.push(extraRows);
+      }
+
+      rowOffsets.set(key, groupRows);
+    }
+
+    return 1 + childIndices.size + extraRows;
+  };
+
+  getNumRows(data, [], pathKey([]));
+
+  return rowOffsets;
+}
+
+/**
+ * Number of rows from a group's row to the row of its child with the given index, where
+ * `groupRows` are the rows taken up by the group's open children, or undefined if all of
+ * its children are closed. For a group with n children, the child offset n is the total
+ * number of rows taken up by the group.
+ */
+export function getChildOffset(groupRows: GroupRows | undefined, index: number) {
+  if (groupRows === undefined) return 1 + index;
+
+  const { indices, extraRows } = groupRows;
+
+  // Number of open children before the child with the given index
+  const numOpenBefore = bisect(0, indices.length, (i) => indices[i] >= index);
+
+  return 1 + index + (numOpenBefore > 0 ? extraRows[numOpenBefore - 1] : 0);
+}
+
+/**
+ * Get the range of indices of the children of a group whose rows overlap the given
+ * range of rows, where the group has the given open children (see `getChildOffset()`)
+ * and number of children, and the range of rows is relative to the group's row.
+ */
+export function getVisibleChildren(
+  groupRows: GroupRows | undefined,
+  numChildren: number,
+  rows: RowRange,
+): RowRange {
+  // The first visible child is the first whose rows end after the start of the range,
+  // and the children after the last visible child start at or after its end
+  const start = bisect(
+    0,
+    numChildren,
+    (index) => getChildOffset(groupRows, index + 1) > rows.start,
+  );
+  const end = bisect(
+    start,
+    numChildren,
+    (index) => getChildOffset(groupRows, index) >= rows.end,
+  );
+
+  return { start, end };
+}
@@ -0,0 +1,148 @@
+"""
+Benchmark suite for the backend API using a synthetic database.
+
+Generates a database with the given number of commits, each containing a tree of
+parameters with the given depth, width, and leaf size (see
+``tests.benchmarks.helpers.create_tree()``), and measures the latency and peak Python
+memory of ``/api/commit-history``, ``/api/data/<commit ID>``, and ``/api/commit``
+requests through the Flask test client. Results are printed as JSON (and optionally
+written to a file), and can be compared to the results of a previous run to detect
+regressions. Run from the repository root using::
+
+    python -m tests.benchmarks.api [--commits N] [--depth N] [--width N]
+        [--leaf-size N] [--repeat N] [--output FILE] [--baseline FILE]
+        [--threshold FRACTION]
+
+If ``--baseline`` is given, the exit code is 1 if the median time of any request
+increased by more than the threshold fraction (default 0.2) compared to the baseline.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable
+import os
+import sys
+import json
+import tempfile
+from argparse import ArgumentParser, Namespace
+from flask.testing import FlaskClient
+from paramview._app import create_app
+from paramview._cache import CommitCache
+from paramview._database import ParamViewDB
+from tests.benchmarks.helpers import (
+    create_db,
+    create_tree,
+    time_call,
+    peak_memory,
+    environment,
+    output_results,
+)
+
+
+def _requests(
+    client: FlaskClient, db: ParamViewDB, num_commits: int
+) -> dict[str, Callable[[], Any]]:
+    """Return functions that make each benchmarked request using the given client."""
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    data_url = f"/api/data/{num_commits}"
+    etag = client.get(data_url).headers["ETag"]
+    commit_body = {"message": "Benchmark commit", "data": db.load(1, raw_json=True)}
+
+    def data_uncached() -> None:
+        commit_cache.clear()
+        client.get(data_url)
+
+    def subtree_uncached() -> None:
+        commit_cache.clear()
+        client.get(f"{data_url}?depth=1")
+
+    return {
+        "commit_history_full": lambda: client.get("/api/commit-history"),
+        "commit_history_after_latest": lambda: client.get(
+            f"/api/commit-history?after={num_commits}"
+        ),
+        "data_uncached": data_uncached,
+        "data_cached": lambda: client.get(data_url),
+        "data_revalidate": lambda: client.get(
+            data_url, headers={"If-None-Match": etag}
+        ),
+        "subtree_depth_1_uncached": subtree_uncached,
+        "commit": lambda: client.post("/api/commit", json=commit_body),
+    }
+
+
+def _run(args: Namespace) -> dict[str, Any]:
+    """Run the benchmarks with the given arguments and return the results."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "param.db")
+        data = create_tree(args.depth, args.width, args.leaf_size)
+        create_db(db_path, args.commits, data)
+        app, _ = create_app(db_path)
+        client = app.test_client()
+        db = ParamViewDB(db_path)
+        data_size = len(db.load(1, raw_json=True))
+        results = {
+            name: {
+                **time_call(request, args.repeat),
+                "peak_memory_mb": peak_memory(request),
+            }
+            for name, request in _requests(client, db, args.commits).items()
+        }
+        db.dispose()
+        for app_db in app.config["dbs"].values():
+            app_db.dispose()
+    return {
+        "params": {
+            "commits": args.commits,
+            "depth": args.depth,
+            "width": args.width,
+            "leaf_size": args.leaf_size,
+            "repeat": args.repeat,
+            "data_size_mb": data_size / 1024 / 1024,
+        },
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def _regressions(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> dict[str, float]:
+    """
+    Return the ratio of the new median time to the baseline median time for each
+    request whose median time increased by more than the given fraction.
+    """
+    regressions = {}
+    for name, result in results["results"].items():
+        baseline_result = baseline["results"].get(name)
+        if baseline_result is None or baseline_result["median_ms"] == 0:
+            continue
+        ratio = result["median_ms"] / baseline_result["median_ms"]
+        if ratio > 1 + threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--commits", type=int, default=10_000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--leaf-size", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results of a previous run to compare to")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    results = _run(args)
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        results["regressions"] = _regressions(results, baseline, args.threshold)
+    output_results(results, args.output)
+    if len(results.get("regressions", {})) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark for retrieving the commit history from a large database.
+
+Compares requesting the full commit history with requesting only the newest commits
+using the ``after`` query parameter, which is what clients do when the database is
+updated. Run from the repository root using::
+
+    python -m tests.benchmarks.commit_history [--commits N] [--repeat N]
+"""
+
+from __future__ import annotations
+import os
+import json
+import tempfile
+from argparse import ArgumentParser
+from paramview._app import create_app
+from tests.benchmarks.helpers import create_db, time_call
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "param.db")
+        create_db(db_path, args.commits, {"value": 1})
+        app, _ = create_app(db_path)
+        client = app.test_client()
+        db = next(iter(app.config["dbs"].values()))
+        latest_id = args.commits
+        results = {
+            "commits": args.commits,
+            "full": time_call(lambda: client.get("/api/commit-history"), args.repeat),
+            "after_latest": time_call(
+                lambda: client.get(f"/api/commit-history?after={latest_id}"),
+                args.repeat,
+            ),
+            "after_one_new": time_call(
+                lambda: client.get(f"/api/commit-history?after={latest_id - 1}"),
+                args.repeat,
+            ),
+            "full_then_slice": time_call(lambda: db.commit_history()[-1:], args.repeat),
+        }
+        db.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
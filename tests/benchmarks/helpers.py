@@ -0,0 +1,141 @@
+"""Helper functions for benchmarks."""
+
+from __future__ import annotations
+from typing import Any, Callable, Iterator
+import json
+import time
+import socket
+import platform
+import itertools
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from importlib.metadata import distribution
+import requests
+from sqlalchemy import insert
+from paramdb import ParamDB, ParamDict
+from paramdb._database import _Snapshot, _encode
+
+_START_DATETIME = datetime(2023, 1, 1)
+
+
+def create_db(db_path: str, num_commits: int, data: Any = None) -> None:
+    """
+    Create a ParamDB database at the given path containing the given number of commits,
+    each containing the given data. Commits are inserted in a single transaction, which
+    is much faster than calling ``ParamDB.commit()`` for each commit.
+    """
+    db = ParamDB[Any](db_path)
+    encoded_data = _encode(data, raw_json=False)
+    rows = [
+        {
+            "message": f"Commit {commit_id}",
+            "data": encoded_data,
+            "timestamp": _START_DATETIME + timedelta(seconds=commit_id),
+        }
+        for commit_id in range(1, num_commits + 1)
+    ]
+    # pylint: disable-next=no-member,protected-access
+    with db._Session.begin() as session:
+        session.execute(insert(_Snapshot), rows)
+    db.dispose()  # Explicitly close DB to avoid Windows permission error
+
+
+def _create_tree(
+    depth: int, width: int, leaf_size: int, leaf_ids: Iterator[int]
+) -> ParamDict[Any]:
+    """Create a tree for ``create_tree()``, numbering leaves using ``leaf_ids``."""
+    if depth <= 1:
+        return ParamDict(
+            {f"leaf{i}": f"{next(leaf_ids):0{leaf_size}d}" for i in range(width)}
+        )
+    return ParamDict(
+        {
+            f"group{i}": _create_tree(depth - 1, width, leaf_size, leaf_ids)
+            for i in range(width)
+        }
+    )
+
+
+def create_tree(depth: int, width: int, leaf_size: int) -> ParamDict[Any]:
+    """
+    Return a tree of nested parameter dictionaries with the given depth and width (the
+    number of children of each dictionary), where each leaf is a distinct string of
+    (at least) ``leaf_size`` digits. The tree has ``width ** depth`` leaves.
+    """
+    return _create_tree(depth, width, leaf_size, itertools.count())
+
+
+def time_stats(times: list[float]) -> dict[str, float]:
+    """Return the median, minimum, and maximum of the given times in milliseconds."""
+    return {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "max_ms": max(times),
+    }
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """
+    Call the given function the given number of times and return the median, minimum,
+    and maximum times in milliseconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return time_stats(times)
+
+
+def peak_memory(func: Callable[[], Any]) -> float:
+    """
+    Call the given function and return the peak memory in MB allocated by Python while
+    it runs, as measured by ``tracemalloc``.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def free_port() -> int:
+    """Return a port that is currently free."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def wait_for_server(url: str, timeout: float = 30) -> None:
+    """Wait until the server at the given URL responds."""
+    start = time.monotonic()
+    while True:
+        try:
+            requests.get(f"{url}/api/database-name", timeout=1).raise_for_status()
+            return
+        except requests.RequestException:
+            if time.monotonic() - start > timeout:
+                raise
+            time.sleep(0.1)
+
+
+def environment() -> dict[str, str]:
+    """Return information about the environment to include in benchmark results."""
+    return {
+        "paramview": distribution("paramview").version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def output_results(results: dict[str, Any], output: str | None) -> None:
+    """Print the given results as JSON, and write them to the given file if any."""
+    results_json = json.dumps(results, indent=2)
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as output_file:
+            output_file.write(results_json + "\n")
+    print(results_json)
@@ -0,0 +1,150 @@
+"""
+Benchmark for rendering the parameter list in a browser, using a synthetic commit with
+large groups.
+
+Generates a database with one commit containing the given number of groups, each with
+the given number of leaves (by default 5 groups of 20,000 leaves, for 100,000 leaves in
+total), serves it in a separate process using ``start_server()``, and uses Playwright
+to measure in Chromium the time to load the page, expand the first group, and scroll to
+its last leaf, in both view and edit mode. The number of parameter list items rendered
+after expanding the group is also reported, which should depend on the height of the
+browser window rather than the size of the group. Run from the repository root (after
+building the frontend and installing Playwright's Chromium) using::
+
+    python -m tests.benchmarks.param_list [--groups N] [--leaves N] [--repeat N]
+        [--output FILE]
+
+Results are printed as JSON (and optionally written to a file).
+"""
+
+from __future__ import annotations
+from typing import Any
+import os
+import sys
+import time
+import tempfile
+import subprocess
+from argparse import ArgumentParser, Namespace
+from playwright.sync_api import Page, sync_playwright
+from paramdb import ParamDict
+from paramview import start_server
+from tests.benchmarks.helpers import (
+    create_db,
+    free_port,
+    wait_for_server,
+    time_stats,
+    environment,
+    output_results,
+)
+
+_MODES = ("view", "edit")
+
+_ITEM_SELECTOR = '[data-testid^="parameter-list-item-"]'
+"""Selector for items in the parameter list."""
+
+
+def _create_data(num_groups: int, num_leaves: int) -> ParamDict[Any]:
+    """Return data with the given number of groups, each with the given leaves."""
+    return ParamDict(
+        {
+            f"group{i}": ParamDict({f"leaf{j}": j + 0.5 for j in range(num_leaves)})
+            for i in range(num_groups)
+        }
+    )
+
+
+def _measure(page: Page, url: str, mode: str, num_leaves: int) -> dict[str, float]:
+    """
+    Load the page at the given URL in the given mode, expand the first group, and scroll
+    to its last leaf, returning the time in milliseconds for each step and the number
+    of items rendered after expanding the group.
+    """
+    group_item = page.get_by_test_id("parameter-list-item-group0")
+    first_leaf_item = group_item.get_by_test_id("parameter-list-item-leaf0")
+    last_leaf_item = group_item.get_by_test_id(
+        f"parameter-list-item-leaf{num_leaves - 1}"
+    )
+    start = time.perf_counter()
+    page.goto(url)
+    if mode == "edit":
+        page.get_by_test_id("edit-button").click()
+    group_item.wait_for()
+    loaded = time.perf_counter()
+    group_item.get_by_role("button").first.click()
+    first_leaf_item.wait_for()
+    expanded = time.perf_counter()
+    rendered_items = page.locator(_ITEM_SELECTOR).count()
+    page.get_by_test_id("parameter-list-item-root").locator("..").evaluate(
+        "list => list.scrollTo(0, list.scrollHeight)"
+    )
+    last_leaf_item.wait_for()
+    scrolled = time.perf_counter()
+    return {
+        "load": (loaded - start) * 1000,
+        "expand": (expanded - loaded) * 1000,
+        "scroll": (scrolled - expanded) * 1000,
+        "rendered_items": rendered_items,
+    }
+
+
+def _run(args: Namespace, db_path: str) -> dict[str, Any]:
+    """Run the benchmark against a server for the given database."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", __spec__.name, "--serve", db_path, "--port", str(port)],
+        stderr=subprocess.DEVNULL,
+    )
+    results: dict[str, Any] = {}
+    try:
+        wait_for_server(url)
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch()
+            page = browser.new_page(viewport={"width": 1280, "height": 800})
+            page.set_default_timeout(120_000)
+            for mode in _MODES:
+                runs = [
+                    _measure(page, url, mode, args.leaves) for _ in range(args.repeat)
+                ]
+                results[mode] = {
+                    step: time_stats([run[step] for run in runs])
+                    for step in ("load", "expand", "scroll")
+                }
+                results[mode]["rendered_items"] = runs[-1]["rendered_items"]
+            browser.close()
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--groups", type=int, default=5)
+    parser.add_argument("--leaves", type=int, default=20_000, help="leaves per group")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--serve", help="serve this database (internal)")
+    parser.add_argument("--port", type=int, help="port for --serve (internal)")
+    args = parser.parse_args()
+    if args.serve is not None:
+        start_server(args.serve, default_port=args.port, open_window=False)
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "param.db")
+        create_db(db_path, 1, _create_data(args.groups, args.leaves))
+        results = {
+            "params": {
+                "groups": args.groups,
+                "leaves": args.leaves,
+                "repeat": args.repeat,
+            },
+            "environment": environment(),
+            "results": _run(args, db_path),
+        }
+    output_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Load test for many viewers of a database that is being written to.
+
+Starts the server in a separate process using ``start_server()``, connects the given
+number of SocketIO clients that behave like the frontend (on each ``database_update``
+event, they request the commit history if the event does not include the new commits,
+then request the data of the latest commit), and makes commits at the given rate. Run
+from the repository root using::
+
+    python -m tests.benchmarks.socketio_load [--clients N] [--rate N] [--seconds N]
+        [--depth N] [--width N] [--watch {events,poll}]
+
+Reports percentiles of the latency from each commit to each client being notified of
+it and to each client having loaded its data, the server's CPU usage, and the request
+throughput, as JSON. Server CPU usage is read from ``/proc``, so is only reported on
+Linux. Clients use HTTP long-polling unless the ``websocket-client`` package is
+installed.
+"""
+
+from __future__ import annotations
+from typing import Any
+import os
+import sys
+import json
+import time
+import statistics
+import tempfile
+import subprocess
+from argparse import ArgumentParser, Namespace
+import requests
+import socketio  # type: ignore
+from paramdb import ParamDB
+from paramview import start_server
+from paramview._watch_db import WATCH_BACKENDS
+from tests.benchmarks.helpers import (
+    create_db,
+    create_tree,
+    free_port,
+    wait_for_server,
+)
+
+
+def _cpu_seconds(pid: int) -> float | None:
+    """
+    Return the CPU time in seconds (user and system) used so far by the process with
+    the given ID, or None if it cannot be read from ``/proc``.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as stat_file:
+            # Fields after the command name, which is in parentheses and can contain
+            # spaces; utime and stime are the 12th and 13th of these
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _percentiles(values: list[float]) -> dict[str, float | None]:
+    """Return the 50th, 90th, and 99th percentiles and maximum of the given values."""
+    if len(values) < 2:
+        value = values[0] if len(values) == 1 else None
+        return {"p50": value, "p90": value, "p99": value, "max": value}
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": quantiles[49],
+        "p90": quantiles[89],
+        "p99": quantiles[98],
+        "max": max(values),
+    }
+
+
+class _Viewer:
+    """
+    SocketIO client that behaves like the frontend. Events are handled one at a time
+    by the client's background thread.
+    """
+
+    def __init__(self, url: str, commit_times: dict[int, float]) -> None:
+        self._url = url
+        self._commit_times = commit_times
+        self._session = requests.Session()
+        self.notify_latencies: list[float] = []
+        """Latencies in ms from each commit to this viewer being notified of it."""
+        self.load_latencies: list[float] = []
+        """Latencies in ms from each commit to this viewer loading the latest data."""
+        self.num_requests = 0
+        """Number of HTTP requests made in response to events."""
+        self._sio = socketio.Client(reconnection=False, handle_sigint=False)
+        self._sio.on("database_update", self._database_update)
+
+    def connect(self) -> None:
+        """Connect to the server."""
+        self._sio.connect(self._url, wait_timeout=10)
+
+    def disconnect(self) -> None:
+        """Disconnect from the server."""
+        self._sio.disconnect()
+
+    def _get(self, path: str) -> Any:
+        """Make a GET request to the API and return the JSON response."""
+        response = self._session.get(f"{self._url}/api/{path}", timeout=60)
+        response.raise_for_status()
+        self.num_requests += 1
+        return response.json()
+
+    def _database_update(self, update: dict[str, Any] | None = None) -> None:
+        received = time.monotonic()
+        if update is None or update["reset"]:
+            commit_ids = [commit["id"] for commit in self._get("commit-history")]
+            latest_commit_id = commit_ids[-1] if len(commit_ids) > 0 else None
+        else:
+            commit_ids = [commit["id"] for commit in update["commits"]]
+            latest_commit_id = update["latestCommitId"]
+        if latest_commit_id is not None:
+            self._get(f"data/{latest_commit_id}")
+        loaded = time.monotonic()
+        for commit_id in commit_ids:
+            commit_time = self._commit_times.get(commit_id)
+            if commit_time is not None:
+                self.notify_latencies.append((received - commit_time) * 1000)
+                self.load_latencies.append((loaded - commit_time) * 1000)
+
+
+def _write_commits(
+    db_path: str, rate: float, seconds: float, commit_times: dict[int, float]
+) -> int:
+    """
+    Make commits to the given database at the given rate per second for the given
+    number of seconds, recording the time of each commit. Return the number of commits.
+    """
+    db = ParamDB[Any](db_path)
+    num_commits = 0
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        commit_entry = db.commit(f"Load test commit {num_commits}", {"value": 1})
+        commit_times[commit_entry.id] = time.monotonic()
+        num_commits += 1
+        next_commit = start + num_commits / rate
+        time.sleep(max(0.0, next_commit - time.monotonic()))
+    db.dispose()  # Explicitly close DB to avoid Windows permission error
+    return num_commits
+
+
+def _run(args: Namespace, db_path: str) -> dict[str, Any]:
+    """Run the load test against a server for the given database."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", __spec__.name, "--serve", db_path]
+        + ["--port", str(port), "--watch", args.watch],
+        stderr=subprocess.DEVNULL,
+    )
+    viewers: list[_Viewer] = []
+    try:
+        wait_for_server(url)
+        commit_times: dict[int, float] = {}
+        viewers = [_Viewer(url, commit_times) for _ in range(args.clients)]
+        for viewer in viewers:
+            viewer.connect()
+        start_cpu = _cpu_seconds(server.pid)
+        start = time.monotonic()
+        num_commits = _write_commits(db_path, args.rate, args.seconds, commit_times)
+        time.sleep(args.drain)  # Let the last notifications and requests finish
+        duration = time.monotonic() - start
+        end_cpu = _cpu_seconds(server.pid)
+    finally:
+        for viewer in viewers:
+            viewer.disconnect()
+        server.terminate()
+        server.wait()
+    server_cpu = None if start_cpu is None or end_cpu is None else end_cpu - start_cpu
+    return _summarize(args, viewers, num_commits, duration, server_cpu)
+
+
+def _summarize(
+    args: Namespace,
+    viewers: list[_Viewer],
+    num_commits: int,
+    duration: float,
+    server_cpu: float | None,
+) -> dict[str, Any]:
+    """Return the results of a load test run with the given viewers."""
+    notify_latencies = [ms for viewer in viewers for ms in viewer.notify_latencies]
+    load_latencies = [ms for viewer in viewers for ms in viewer.load_latencies]
+    num_requests = sum(viewer.num_requests for viewer in viewers)
+    return {
+        "clients": args.clients,
+        "rate": args.rate,
+        "seconds": args.seconds,
+        "watch": args.watch,
+        "commits": num_commits,
+        "notifications": len(notify_latencies),
+        "missed_notifications": num_commits * args.clients - len(notify_latencies),
+        "notify_latency_ms": _percentiles(notify_latencies),
+        "load_latency_ms": _percentiles(load_latencies),
+        "requests": num_requests,
+        "requests_per_second": num_requests / duration,
+        "server_cpu_seconds": server_cpu,
+        "server_cpu_percent": (
+            None if server_cpu is None else server_cpu / duration * 100
+        ),
+    }
+
+
+def main() -> None:
+    """Run the load test and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=5, help="commits per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--drain", type=float, default=2)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--watch", choices=WATCH_BACKENDS, default="events")
+    parser.add_argument("--serve", help="serve this database (internal)")
+    parser.add_argument("--port", type=int, help="port for --serve (internal)")
+    args = parser.parse_args()
+    if args.serve is not None:
+        start_server(
+            args.serve,
+            default_port=args.port,
+            open_window=False,
+            watch_backend=args.watch,
+        )
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "param.db")
+        create_db(db_path, 1, create_tree(args.depth, args.width, 16))
+        results = _run(args, db_path)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark for the peak memory used to send the data for a very large commit.
+
+Compares streaming the data (the default for data larger than
+``paramview._stream.STREAMING_THRESHOLD``) with loading the full data into memory before
+sending it. Each case is run in a separate process so that the peak resident set size
+(RSS) of one does not affect the other. Run from the repository root using::
+
+    python -m tests.benchmarks.stream_memory [--size-mb N]
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from argparse import ArgumentParser
+from paramview._app import create_app
+from tests.benchmarks.helpers import create_db
+
+_CASES = ("streamed", "buffered")
+
+
+def _peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of the current process in MB. This is read from
+    ``/proc`` (so only works on Linux), since unlike ``resource.getrusage()``, it is not
+    inherited from the parent process.
+    """
+    with open("/proc/self/status", encoding="utf-8") as status_file:
+        for line in status_file:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("peak RSS not found in /proc/self/status")
+
+
+def _run_case(db_path: str, case: str) -> None:
+    """
+    Request the data from the first commit in the given database, reading the response
+    in chunks, and print the peak RSS before and after the request as JSON.
+    """
+    if case == "buffered":
+        # pylint: disable-next=import-outside-toplevel
+        from paramview import _api
+
+        _api.STREAMING_THRESHOLD = sys.maxsize  # type: ignore[attr-defined]
+    app, _ = create_app(db_path)
+    client = app.test_client()
+    client.get("/api/database-name")  # Initialize the app before measuring
+    baseline_rss_mb = _peak_rss_mb()
+    response = client.get("/api/data/1", buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    print(
+        json.dumps(
+            {
+                "response_mb": size / 1024 / 1024,
+                "baseline_rss_mb": baseline_rss_mb,
+                "peak_rss_mb": _peak_rss_mb(),
+            }
+        )
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--case", choices=_CASES, help="run a single case (internal)")
+    parser.add_argument("--db-path", help="database to use for --case (internal)")
+    args = parser.parse_args()
+    if args.case is not None:
+        _run_case(args.db_path, args.case)
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "param.db")
+        # Distinct strings of about 100 bytes each, so the data does not compress to a
+        # trivial size
+        num_items = args.size_mb * 1024 * 1024 // 100
+        create_db(db_path, 1, [f"{i:096x}" for i in range(num_items)])
+        results: dict[str, object] = {"size_mb": args.size_mb}
+        for case in _CASES:
+            output = subprocess.run(
+                [sys.executable, "-m", __spec__.name, "--case", case]
+                + ["--db-path", db_path],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+            results[case] = json.loads(output)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
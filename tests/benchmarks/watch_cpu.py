@@ -0,0 +1,90 @@
+"""
+Benchmark for the CPU time used to watch the database while other files in its
+directory are changing.
+
+For each watch backend (see ``paramview._watch_db.WATCH_BACKENDS``), the database is
+watched while a separate process repeatedly writes and deletes other files in the
+database's directory, and the CPU time used by the watching process is measured. Run
+from the repository root using::
+
+    python -m tests.benchmarks.watch_cpu [--seconds N] [--files-per-second N]
+"""
+
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+from argparse import ArgumentParser
+from eventlet import sleep  # type: ignore
+from paramview._app import create_app
+from paramview._watch_db import WATCH_BACKENDS, watch_db
+from tests.benchmarks.helpers import create_db
+
+
+def _write_noise(directory: str, seconds: float, files_per_second: int) -> None:
+    """
+    Write and delete files in the given directory at the given rate for the given
+    number of seconds.
+    """
+    end = time.monotonic() + seconds
+    i = 0
+    while time.monotonic() < end:
+        path = os.path.join(directory, f"noise{i % 100}.txt")
+        with open(path, "w", encoding="utf-8") as noise_file:
+            noise_file.write("noise")
+        os.remove(path)
+        i += 1
+        time.sleep(1 / files_per_second)
+
+
+def _measure(
+    db_path: str, backend: str, seconds: float, files_per_second: int
+) -> float:
+    """
+    Return the CPU time in ms used by this process while watching the database with the
+    given backend for the given number of seconds, with a separate process writing
+    files in the database's directory.
+    """
+    _, socketio = create_app(db_path)
+    stop_watch_db = watch_db(db_path, socketio, backend=backend)
+    noise_process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", __spec__.name, "--noise-dir", os.path.dirname(db_path)]
+        + ["--seconds", str(seconds), "--files-per-second", str(files_per_second)]
+    )
+    start = time.process_time()
+    sleep(seconds)  # Yield to the eventlet hub so the watcher can run
+    cpu_time_ms = (time.process_time() - start) * 1000
+    noise_process.wait()
+    stop_watch_db()
+    return cpu_time_ms
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--files-per-second", type=int, default=1000)
+    parser.add_argument("--noise-dir", help="write noise to this directory (internal)")
+    args = parser.parse_args()
+    if args.noise_dir is not None:
+        _write_noise(args.noise_dir, args.seconds, args.files_per_second)
+        return
+    results: dict[str, object] = {
+        "seconds": args.seconds,
+        "files_per_second": args.files_per_second,
+    }
+    for backend in WATCH_BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "param.db")
+            create_db(db_path, 1, {"value": 1})
+            results[f"{backend}_cpu_ms"] = _measure(
+                db_path, backend, args.seconds, args.files_per_second
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -363,3 +363,56 @@ def test_exit_edit_mode_valid_changes_accept(
         capture_dialogs.last_dialog_message
         == "You have unsaved changes. Do you want to discard them?"
     )
+
+
+def test_row_heights(page: Page) -> None:
+    """
+    Rows have the same fixed height in edit mode as in view mode, which the parameter
+    list relies on to position rows that are scrolled out of view.
+    """
+    row_height = 29
+    leaf_test_ids = [
+        f"parameter-list-item-{name}"
+        for name in ["int", "float", "bool", "str", "None", "datetime", "Quantity"]
+    ]
+    dict_item = page.get_by_test_id("parameter-list-item-dict")
+    dict_item.get_by_role("button").click()
+    expect(dict_item.get_by_test_id("parameter-list-item-str")).to_be_visible()
+
+    for edit_mode in [True, False]:
+        if not edit_mode:
+            page.get_by_test_id("cancel-edit-button").click()
+        for test_id in leaf_test_ids:
+            bounding_box = page.get_by_test_id(test_id).first.bounding_box()
+            assert bounding_box is not None
+            assert bounding_box["height"] == row_height, (test_id, edit_mode)
+
+        # Open group with two children
+        bounding_box = dict_item.bounding_box()
+        assert bounding_box is not None
+        assert bounding_box["height"] == 3 * row_height, edit_mode
+
+
+def test_input_kept_when_remounted(page: Page) -> None:
+    """
+    Input (including invalid input) is kept when an item is unmounted and mounted again,
+    e.g. when its group is closed and reopened.
+    """
+    dict_item = page.get_by_test_id("parameter-list-item-dict")
+    dict_item_button = dict_item.get_by_role("button").first
+    leaf_input = (
+        dict_item.get_by_test_id("parameter-list-item-int")
+        .get_by_test_id("leaf-input")
+        .get_by_role("textbox")
+    )
+
+    dict_item_button.click()
+    leaf_input.fill("123a")
+    expect(leaf_input).to_have_attribute("aria-invalid", "true")
+
+    # Close and reopen the group
+    dict_item_button.click()
+    expect(leaf_input).not_to_be_attached()
+    dict_item_button.click()
+    expect(leaf_input).to_have_value("123a")
+    expect(leaf_input).to_have_attribute("aria-invalid", "true")
@@ -5,9 +5,11 @@ Called automatically by Pytest before running tests.
 """
 
 from __future__ import annotations
-from typing import Any
+from typing import Any, Iterator
 import os
 from pathlib import Path
+import eventlet  # type: ignore
+from eventlet import wsgi
 from flask.testing import FlaskClient
 from flask_socketio import SocketIOTestClient  # type: ignore
 import pytest
@@ -69,3 +71,13 @@ def fixture_socketio_client(
 ) -> SocketIOTestClient:
     """Test client for the SocketIO instance."""
     return clients[1]
+
+
+@pytest.fixture(name="server_url")
+def fixture_server_url(client: FlaskClient) -> Iterator[str]:
+    """URL of an eventlet WSGI server running the Flask app, like ``start_server``."""
+    sock = eventlet.listen(("127.0.0.1", 0))
+    server = eventlet.spawn(wsgi.server, sock, client.application, log_output=False)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    server.kill()
+    sock.close()
@@ -2,9 +2,24 @@
 
 from __future__ import annotations
 from typing import Any
+import os
+import time
+import shutil
+import pytest
+import eventlet  # type: ignore
+
+# pylint: disable-next=no-name-in-module
+from eventlet.green.urllib.request import urlopen  # type: ignore
 from flask import json
 from flask.testing import FlaskClient
-from paramdb import ParamDB
+from sqlalchemy import delete
+from paramdb import ParamDB, ParamDict
+from paramdb._database import _Snapshot
+from paramview._app import create_app
+from paramview._cache import CommitCache
+from paramview._database import ParamViewDB
+from paramview._single_flight import SingleFlight
+from paramview._subtree import get_subtree, truncate
 
 
 def test_database_name(db_name: str, client: FlaskClient) -> None:
@@ -23,6 +38,73 @@ def test_commit_history(db: ParamDB[Any], client: FlaskClient) -> None:
     assert response.json == json.loads(json.dumps(db.commit_history()))
 
 
+@pytest.mark.parametrize(
+    "query,start,end",
+    [
+        ("after=0", 0, None),
+        ("after=1", 1, None),
+        ("after=3", 3, None),
+        ("limit=2", 0, 2),
+        ("limit=0", 0, 0),
+        ("after=1&limit=1", 1, 2),
+        ("after=2&limit=5", 2, None),
+    ],
+)
+def test_commit_history_after_limit(
+    db: ParamDB[Any],
+    client: FlaskClient,
+    query: str,
+    start: int,
+    end: int | None,
+) -> None:
+    """Gets part of the commit history using the after and limit query parameters."""
+    response = client.get(f"/api/commit-history?{query}")
+    assert response.status_code == 200  # Success
+    assert response.mimetype == "application/json"
+    assert response.json == json.loads(json.dumps(db.commit_history(start, end)))
+
+
+@pytest.mark.parametrize("name", ["after", "limit"])
+def test_commit_history_negative_query_fails(client: FlaskClient, name: str) -> None:
+    """Fails to get the commit history with a negative after or limit."""
+    response = client.get(f"/api/commit-history?{name}=-1")
+    assert response.status_code == 400  # Bad request
+    error_json = response.json
+    assert isinstance(error_json, dict)
+    assert f"{name} must be non-negative, not -1" in error_json["description"]
+
+
+@pytest.mark.parametrize("query", ["after=abc", "limit=abc", "after=1.5"])
+def test_commit_history_invalid_query_fails(client: FlaskClient, query: str) -> None:
+    """Fails to get the commit history if after or limit is not an integer."""
+    response = client.get(f"/api/commit-history?{query}")
+    assert response.status_code == 400  # Bad request
+    error_json = response.json
+    assert isinstance(error_json, dict)
+    name, value = query.split("=")
+    assert f"{name} must be an integer, not '{value}'" in error_json["description"]
+
+
+def test_commit_history_revalidate(db: ParamDB[Any], client: FlaskClient) -> None:
+    """
+    The commit history has an entity tag, and revalidating returns an empty 304 response
+    until the commit history changes.
+    """
+    response = client.get("/api/commit-history")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+    headers = {"If-None-Match": etag}
+    response = client.get("/api/commit-history", headers=headers)
+    assert response.status_code == 304  # Not modified
+    assert response.headers["ETag"] == etag
+    assert response.data == b""
+    db.commit("New commit", 123)
+    response = client.get("/api/commit-history", headers=headers)
+    assert response.status_code == 200  # Success
+    assert response.headers["ETag"] != etag
+    assert response.json == json.loads(json.dumps(db.commit_history()))
+
+
 def test_data_nonexistent_fails(client: FlaskClient) -> None:
     """Fails to get data from a nonexistent commit."""
     response = client.get("/api/data/0")
@@ -49,6 +131,244 @@ def test_data(db: ParamDB[Any], client: FlaskClient) -> None:
             assert list(response_data) == list(loaded_data)
 
 
+def test_data_cache_headers(client: FlaskClient) -> None:
+    """Data has a strong entity tag and can be cached indefinitely."""
+    response = client.get("/api/data/1")
+    assert response.status_code == 200  # Success
+    etag, weak = response.get_etag()
+    assert etag is not None
+    assert not weak
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+    assert client.get("/api/data/2").get_etag()[0] != etag
+
+
+def test_data_revalidate(client: FlaskClient) -> None:
+    """
+    Revalidating data returns an empty 304 response without loading the data from the
+    database.
+    """
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    etag = client.get("/api/data/1").headers["ETag"]
+    commit_cache.clear()
+    response = client.get("/api/data/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304  # Not modified
+    assert response.headers["ETag"] == etag
+    assert response.cache_control.immutable
+    assert response.data == b""
+    assert commit_cache.stats.misses == 1  # Only from the first request
+    assert client.get("/api/data/2", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_data_commit_ids_reused(db: ParamDB[Any], client: FlaskClient) -> None:
+    """
+    Data and entity tags are updated if a commit ID is reused with different data after
+    commits are deleted from the database.
+    """
+    response = client.get("/api/data/3")
+    old_data, old_etag = response.text, response.headers["ETag"]
+    with db._Session.begin() as session:  # pylint: disable=no-member,protected-access
+        session.execute(delete(_Snapshot).where(_Snapshot.id == 3))
+    db.commit("Reuse commit ID 3", ParamDict(d=4))
+    response = client.get("/api/data/3")
+    assert response.text != old_data
+    assert response.text == db.load(3, raw_json=True)
+    assert response.headers["ETag"] != old_etag
+
+
+def test_data_cached(client: FlaskClient) -> None:
+    """Data for a commit is cached after it is first requested."""
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    first_response = client.get("/api/data/1")
+    assert commit_cache.stats.misses == 1
+    assert commit_cache.stats.hits == 0
+    second_response = client.get("/api/data/1")
+    assert commit_cache.stats.misses == 1
+    assert commit_cache.stats.hits == 1
+    assert first_response.text == second_response.text
+
+
+def test_data_database_replaced(
+    db_path: str, db: ParamDB[Any], client: FlaskClient
+) -> None:
+    """Data is reloaded if the database file is replaced with a different file."""
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    response = client.get("/api/data/1")
+    old_data, old_etag = response.text, response.headers["ETag"]
+    new_db_path = f"{db_path}-new"
+    new_db = ParamDB[Any](new_db_path)
+    new_db.commit("New initial commit", ParamDict(d=4))
+    expected_new_data = new_db.load(1, raw_json=True)
+    new_db.dispose()  # Explicitly close DB to avoid Windows permission error
+    db.dispose()
+    os.replace(new_db_path, db_path)
+    response = client.get("/api/data/1")
+    new_data = response.text
+    assert new_data != old_data
+    assert new_data == expected_new_data
+    assert commit_cache.stats.clears == 1
+    assert response.headers["ETag"] != old_etag
+
+
+def test_data_streamed(
+    monkeypatch: pytest.MonkeyPatch, db: ParamDB[Any], client: FlaskClient
+) -> None:
+    """
+    Streams data at least as large as the streaming threshold without caching it, and
+    sends smaller data all at once.
+    """
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    raw_json = {
+        entry.id: db.load(entry.id, raw_json=True) for entry in db.commit_history()
+    }
+    large_id = max(raw_json, key=lambda commit_id: len(raw_json[commit_id]))
+    small_id = min(raw_json, key=lambda commit_id: len(raw_json[commit_id]))
+    monkeypatch.setattr("paramview._api.STREAMING_THRESHOLD", len(raw_json[large_id]))
+    response = client.get(f"/api/data/{large_id}")
+    assert "Content-Length" not in response.headers  # Streamed
+    assert response.text == raw_json[large_id]
+    assert response.get_etag()[0] is not None
+    assert commit_cache.stats.num_entries == 0
+    response = client.get(f"/api/data/{small_id}")
+    assert "Content-Length" in response.headers
+    assert response.text == raw_json[small_id]
+    assert commit_cache.stats.num_entries == 1
+
+
+def test_data_subtree(db: ParamDB[Any], client: FlaskClient) -> None:
+    """Gets the subtree of data at a given path."""
+    db.commit("Nested data", ParamDict(p=ParamDict({"a/b~c": [1, [2, 3]]})))
+    data = json.loads(db.load(4, raw_json=True))
+    response = client.get("/api/data/4/p/a~1b~0c/1")
+    assert response.status_code == 200  # Success
+    assert response.json == get_subtree(data, ["p", "a/b~c", "1"])
+    assert response.cache_control.immutable
+    assert response.headers["ETag"] != client.get("/api/data/4/p").headers["ETag"]
+
+
+@pytest.mark.parametrize("url_path", ["1/d", "1/zzz", "1/b/x", "3/9", "3/x"])
+def test_data_subtree_nonexistent_fails(client: FlaskClient, url_path: str) -> None:
+    """Fails to get a subtree at a path that does not exist."""
+    response = client.get(f"/api/data/{url_path}")
+    assert response.status_code == 404  # Not found
+    error_json = response.json
+    assert isinstance(error_json, dict)
+    assert "NotFound" in error_json["description"]
+    assert "does not exist" in error_json["description"]
+
+
+def test_data_depth(db: ParamDB[Any], client: FlaskClient) -> None:
+    """Gets data and subtrees with groups below a given depth collapsed."""
+    db.commit("Nested data", ParamDict(p=ParamDict(q=[1, [2, 3]])))
+    data = json.loads(db.load(4, raw_json=True))
+    for depth in range(4):
+        response = client.get(f"/api/data/4?depth={depth}")
+        assert response.status_code == 200  # Success
+        assert response.json == truncate(data, depth)
+        response = client.get(f"/api/data/4/p/q?depth={depth}")
+        assert response.json == truncate(get_subtree(data, ["p", "q"]), depth)
+    etags = {
+        client.get(f"/api/data/4?depth={depth}").headers["ETag"] for depth in range(4)
+    }
+    assert len(etags) == 4
+
+
+def test_data_negative_depth_fails(client: FlaskClient) -> None:
+    """Fails to get data with a negative depth."""
+    response = client.get("/api/data/1?depth=-1")
+    assert response.status_code == 400  # Bad request
+    error_json = response.json
+    assert isinstance(error_json, dict)
+    assert "depth must be non-negative, not -1" in error_json["description"]
+
+
+def test_data_invalid_depth_fails(client: FlaskClient) -> None:
+    """Fails to get data if the depth is not an integer."""
+    response = client.get("/api/data/1?depth=abc")
+    assert response.status_code == 400  # Bad request
+    error_json = response.json
+    assert isinstance(error_json, dict)
+    assert "depth must be an integer, not 'abc'" in error_json["description"]
+
+
+def test_data_subtree_cached(client: FlaskClient) -> None:
+    """Subtrees are cached and parse the commit data only once."""
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    client.get("/api/data/1/a")
+    client.get("/api/data/1/b")
+    assert commit_cache.stats.misses == 3  # Subtrees a and b, and the parsed data
+    assert commit_cache.stats.hits == 1  # Parsed data for subtree b
+    client.get("/api/data/1/a")
+    assert commit_cache.stats.misses == 3
+    assert commit_cache.stats.hits == 2
+
+
+def test_data_subtree_parsed_data_size(db_path: str) -> None:
+    """Parsed commit data is only cached if it fits in the cache."""
+    app, _ = create_app(db_path, cache_size=0)
+    client = app.test_client()
+    commit_cache: CommitCache = app.config["commit_cache"]
+    assert '"data":2' in client.get("/api/data/1/a").text
+    assert '"data":1' in client.get("/api/data/1/b").text
+    assert commit_cache.stats.num_entries == 0
+    assert commit_cache.stats.hits == 0
+
+
+def test_data_single_flight(
+    client: FlaskClient, server_url: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Concurrent requests for the same commit data share a single database load."""
+    num_loads = 0
+    load_compressed = ParamViewDB.load_compressed
+
+    def slow_load_compressed(self: ParamViewDB, commit_id: int) -> bytes:
+        nonlocal num_loads
+        num_loads += 1
+        time.sleep(0.2)
+        return load_compressed(self, commit_id)
+
+    monkeypatch.setattr(ParamViewDB, "load_compressed", slow_load_compressed)
+    requests = [eventlet.spawn(urlopen, f"{server_url}/api/data/1") for _ in range(5)]
+    bodies = []
+    for greenthread in requests:
+        with greenthread.wait() as response:
+            bodies.append(response.read())
+    assert bodies == [bodies[0]] * 5
+    assert num_loads == 1
+    single_flight: SingleFlight = client.application.config["single_flight"]
+    assert single_flight.stats.deduplicated == 4
+
+
+def test_commit_history_single_flight_after_commit(
+    db: ParamDB[Any],
+    client: FlaskClient,
+    server_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Requests for the commit history made after a commit do not share a load that
+    started before it.
+    """
+    commit_history_after = ParamViewDB.commit_history_after
+
+    def slow_commit_history_after(self: ParamViewDB, *args: Any) -> Any:
+        commit_history = commit_history_after(self, *args)
+        time.sleep(0.2)
+        return commit_history
+
+    monkeypatch.setattr(ParamViewDB, "commit_history_after", slow_commit_history_after)
+    old_request = eventlet.spawn(urlopen, f"{server_url}/api/commit-history")
+    eventlet.sleep(0.1)  # Let the first request load the commit history
+    db.commit("New commit", 123)
+    new_request = eventlet.spawn(urlopen, f"{server_url}/api/commit-history")
+    with old_request.wait() as response:
+        assert len(json.loads(response.read())) == 3
+    with new_request.wait() as response:
+        assert len(json.loads(response.read())) == 4
+    single_flight: SingleFlight = client.application.config["single_flight"]
+    assert single_flight.stats.deduplicated == 0
+
+
 def test_commit_not_json_fails(client: FlaskClient) -> None:
     """Fails to create a commit if the mimetype is not JSON."""
     response = client.post("/api/commit", data="not JSON")
@@ -135,3 +455,51 @@ def test_commit(db: ParamDB[Any], client: FlaskClient) -> None:
     loaded_data = db.load(commit_id, raw_json=True)
     assert loaded_message == message
     assert loaded_data == data_str
+
+
+def test_metrics_disabled(client: FlaskClient) -> None:
+    """Fails to get metrics if they are not enabled."""
+    response = client.get("/api/metrics")
+    assert response.status_code == 404  # Not found
+
+
+def test_metrics(db_path: str) -> None:
+    """Gets metrics for requests, database operations, and SocketIO clients."""
+    app, socketio = create_app(db_path, metrics=True)
+    client = app.test_client()
+    socketio_client = socketio.test_client(app)
+    client.get("/api/data/1")
+    client.get("/api/data/1")
+    response = client.get("/api/metrics")
+    assert response.status_code == 200  # Success
+    assert response.mimetype == "text/plain"
+    lines = response.text.splitlines()
+    labels = 'route="/api/data/<int:commit_id>",method="GET"'
+    assert f'paramview_requests_total{{{labels},status="200"}} 2' in lines
+    assert f"paramview_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert f"paramview_response_size_bytes_count{{{labels}}} 2" in lines
+    # The commit timestamp is cached, so the second request does not access the database
+    assert (
+        'paramview_db_operation_duration_seconds_count{operation="load_commit_entry"} 1'
+        in lines
+    )
+    assert "paramview_commit_cache_hits_total 1" in lines
+    assert 'paramview_socketio_clients{database="param.db"} 1' in lines
+    socketio_client.disconnect()
+    lines = client.get("/api/metrics").text.splitlines()
+    assert 'paramview_socketio_clients{database="param.db"} 0' in lines
+
+
+def test_metrics_multiple_dbs(db_path: str) -> None:
+    """Gets metrics for all databases at /api/metrics if there are multiple."""
+    other_db_path = os.path.join(os.path.dirname(db_path), "other.db")
+    shutil.copy(db_path, other_db_path)
+    app, _ = create_app([db_path, other_db_path], metrics=True)
+    client = app.test_client()
+    client.get("/db/other.db/api/commit-history")
+    response = client.get("/api/metrics")
+    assert response.status_code == 200  # Success
+    assert (
+        'paramview_requests_total{route="/db/<db_name>/api/commit-history",'
+        'method="GET",status="200"} 1'
+    ) in response.text.splitlines()
@@ -1,13 +1,37 @@
 """Tests for the WSGI app that serves the frontend."""
 
 from __future__ import annotations
+from typing import Any
 import os
+import shutil
 from pathlib import Path
 from flask.testing import FlaskClient
 import pytest
+from paramdb import ParamDB
 from paramview._app import create_app
 
 
+@pytest.fixture(name="other_db_path")
+def fixture_other_db_path(db_path: str, tmp_path: Path) -> str:
+    """
+    Path to a second database in the same directory as the first, containing one more
+    commit.
+    """
+    other_db_path = str(tmp_path / "other.db")
+    shutil.copy(db_path, other_db_path)
+    other_db = ParamDB[Any](other_db_path)
+    other_db.commit("Other commit", 123)
+    other_db.dispose()  # Explicitly close DB to avoid Windows permission error
+    return other_db_path
+
+
+@pytest.fixture(name="multi_client")
+def fixture_multi_client(db_path: str, other_db_path: str) -> FlaskClient:
+    """Test client for a Flask app serving multiple databases."""
+    app, _ = create_app([db_path, other_db_path])
+    return app.test_client()
+
+
 def test_nonexistent_db_fails(tmp_path: Path) -> None:
     """Fails to create app if there is no database at the given path."""
     nonexistent_db_path = str(tmp_path / "nonexistent.db")
@@ -18,6 +42,84 @@ def test_nonexistent_db_fails(tmp_path: Path) -> None:
     )
 
 
+def test_duplicate_db_names_fails(db_path: str, tmp_path: Path) -> None:
+    """Fails to create app if multiple databases have the same file name."""
+    os.mkdir(tmp_path / "dir")
+    duplicate_db_path = str(tmp_path / "dir" / os.path.basename(db_path))
+    shutil.copy(db_path, duplicate_db_path)
+    with pytest.raises(ValueError) as exc_info:
+        create_app([db_path, duplicate_db_path])
+    assert str(exc_info.value) == (
+        f"databases '{db_path}' and '{duplicate_db_path}' have the same name"
+    )
+
+
+def test_empty_directory_fails(tmp_path: Path) -> None:
+    """Fails to create app if the given directory contains no databases."""
+    with open(tmp_path / "notes.txt", "w", encoding="utf-8") as f:
+        f.write("not a database")
+    with pytest.raises(FileNotFoundError) as exc_info:
+        create_app(str(tmp_path))
+    assert str(exc_info.value) == f"directory '{tmp_path}' contains no databases"
+
+
+@pytest.mark.usefixtures("other_db_path")
+def test_directory(db_name: str, tmp_path: Path) -> None:
+    """Serves the databases in the given directory, ignoring other files."""
+    with open(tmp_path / "notes.txt", "w", encoding="utf-8") as f:
+        f.write("not a database")
+    app, _ = create_app(str(tmp_path))
+    client = app.test_client()
+    assert client.get(f"/db/{db_name}/api/database-name").json == db_name
+    assert client.get("/db/other.db/api/database-name").json == "other.db"
+    assert client.get("/db/notes.txt/api/database-name").status_code == 404
+
+
+def test_multiple_dbs_api(db_name: str, multi_client: FlaskClient) -> None:
+    """Serves the API for each database under /db/<name>/api."""
+    assert multi_client.get(f"/db/{db_name}/api/database-name").json == db_name
+    assert multi_client.get("/db/other.db/api/database-name").json == "other.db"
+    db_history = multi_client.get(f"/db/{db_name}/api/commit-history").json
+    other_history = multi_client.get("/db/other.db/api/commit-history").json
+    assert isinstance(db_history, list) and isinstance(other_history, list)
+    assert len(db_history) == 3
+    assert len(other_history) == 4
+    assert multi_client.get(f"/db/{db_name}/api/data/4").status_code == 500
+    assert multi_client.get("/db/other.db/api/data/4").json is not None
+
+
+def test_multiple_dbs_cache_separate(db_name: str, multi_client: FlaskClient) -> None:
+    """Commit data from different databases with the same ID is cached separately."""
+    data = multi_client.get(f"/db/{db_name}/api/data/3").json
+    assert multi_client.get("/db/other.db/api/data/3").json == data
+    other_data = multi_client.get("/db/other.db/api/data/4").json
+    assert other_data != data
+
+
+def test_multiple_dbs_nonexistent(multi_client: FlaskClient) -> None:
+    """
+    Returns a 404 response for a database that does not exist, and for /api, which is
+    ambiguous when there are multiple databases.
+    """
+    for path in ["/db/nonexistent.db/api/database-name", "/api/database-name"]:
+        response = multi_client.get(path)
+        assert response.status_code == 404
+        assert response.mimetype == "application/json"
+    assert multi_client.get("/db/nonexistent.db/").status_code == 404
+
+
+def test_multiple_dbs_index(db_name: str, multi_client: FlaskClient) -> None:
+    """Lists the databases at the root path, linking to the frontend for each."""
+    response = multi_client.get("/")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    assert f'href="db/{db_name}/"' in response.text
+    assert 'href="db/other.db/"' in response.text
+    response = multi_client.get(f"/db/{db_name}/")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+
+
 def test_index(client: FlaskClient) -> None:
     """
     Gets static/index.html from the root path. This test creates an index.html file if
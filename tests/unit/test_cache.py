@@ -0,0 +1,103 @@
+"""Tests for paramview._cache."""
+
+from __future__ import annotations
+import sys
+import pytest
+from paramview._cache import CommitCache, data_size
+
+DATA = "x" * 100
+DATA_SIZE = sys.getsizeof(DATA)
+
+
+def test_negative_size_fails() -> None:
+    """Fails to create a cache with a negative size."""
+    with pytest.raises(ValueError) as exc_info:
+        CommitCache(-1)
+    assert str(exc_info.value) == "cache size must be non-negative, not -1"
+
+
+def test_get_put() -> None:
+    """Gets cached data and counts hits and misses."""
+    commit_cache = CommitCache(10 * DATA_SIZE)
+    assert commit_cache.get(1) is None
+    commit_cache.put(1, DATA)
+    assert commit_cache.get(1) == DATA
+    assert commit_cache.get(2) is None
+    stats = commit_cache.stats
+    assert stats.hits == 1
+    assert stats.misses == 2
+    assert stats.num_entries == 1
+    assert stats.size == DATA_SIZE
+    assert stats.max_size == 10 * DATA_SIZE
+
+
+def test_evicts_least_recently_used() -> None:
+    """Evicts the least recently used entries when the memory budget is exceeded."""
+    commit_cache = CommitCache(2 * DATA_SIZE)
+    commit_cache.put(1, DATA)
+    commit_cache.put(2, DATA)
+    commit_cache.get(1)  # Entry 2 is now the least recently used
+    commit_cache.put(3, DATA)
+    assert commit_cache.get(1) == DATA
+    assert commit_cache.get(2) is None
+    assert commit_cache.get(3) == DATA
+    stats = commit_cache.stats
+    assert stats.evictions == 1
+    assert stats.num_entries == 2
+    assert stats.size == 2 * DATA_SIZE
+
+
+def test_put_existing() -> None:
+    """Putting an existing commit ID replaces the entry without changing the size."""
+    commit_cache = CommitCache(2 * DATA_SIZE)
+    commit_cache.put(1, DATA)
+    commit_cache.put(1, DATA)
+    stats = commit_cache.stats
+    assert stats.num_entries == 1
+    assert stats.size == DATA_SIZE
+    assert stats.evictions == 0
+
+
+def test_too_large_not_cached() -> None:
+    """Data larger than the memory budget is not cached."""
+    commit_cache = CommitCache(DATA_SIZE - 1)
+    commit_cache.put(1, DATA)
+    assert commit_cache.get(1) is None
+    assert commit_cache.stats.size == 0
+
+
+def test_clear() -> None:
+    """Clears all entries."""
+    commit_cache = CommitCache(10 * DATA_SIZE)
+    commit_cache.put(1, DATA)
+    commit_cache.put(2, DATA)
+    commit_cache.clear()
+    assert commit_cache.get(1) is None
+    assert commit_cache.get(2) is None
+    stats = commit_cache.stats
+    assert stats.clears == 1
+    assert stats.num_entries == 0
+    assert stats.size == 0
+
+
+def test_put_size() -> None:
+    """Uses the given size of the data instead of the size of the data object."""
+    commit_cache = CommitCache(10)
+    commit_cache.put(1, [DATA], size=4)
+    commit_cache.put(2, [DATA], size=4)
+    commit_cache.put(3, [DATA], size=4)
+    assert commit_cache.get(1) is None
+    assert commit_cache.get(3) == [DATA]
+    stats = commit_cache.stats
+    assert stats.evictions == 1
+    assert stats.size == 8
+
+
+def test_data_size() -> None:
+    """Estimates the size of data containing lists and dictionaries."""
+    data = {"a": [DATA, 1.5], "b": {"c": None}}
+    assert data_size(DATA) == DATA_SIZE
+    assert data_size(data) == sum(
+        sys.getsizeof(item)
+        for item in (data, "a", data["a"], DATA, 1.5, "b", data["b"], "c", None)
+    )
@@ -2,22 +2,64 @@
 
 from __future__ import annotations
 from importlib.metadata import distribution
+import sys
+import json
+import subprocess
 import pytest
 from pytest import CaptureFixture
+from paramview._watch_db import WATCH_BACKENDS
 from paramview._cli import _parse_args
 
 PROGRAM_NAME = "paramview"
 DB_PATH = "test.db"
+IMPORT_TIME_BUDGET = 0.2
+"""Maximum time in seconds to import the CLI (it currently takes a few milliseconds)."""
+SLOW_MODULES = (
+    "flask",
+    "flask_socketio",
+    "eventlet",
+    "watchdog",
+    "paramdb",
+    "sqlalchemy",
+    "importlib.metadata",
+)
+"""Modules that are slow to import, so should not be imported by the CLI module."""
 VERSION_MSG = f"{PROGRAM_NAME} {distribution(PROGRAM_NAME).version}"
-USAGE_MSG = f"usage: {PROGRAM_NAME} [-h] [-V] [-p PORT] [--no-open] <database path>"
+USAGE_MSG = (
+    f"usage: {PROGRAM_NAME} [-h] [-V] [-p PORT] [--cache-size MB] [--min-interval MS]"
+    " [--max-latency MS] [--watch {events,poll}] [--poll-interval MS] [--threads N]"
+    " [--workers N] [--metrics] [--profile DIR] [--no-open] <database path>"
+    " [<database path> ...]"
+)
 POSITIONAL_ARGS_MSG = """
 positional arguments:
-  <database path>       path to the ParamDB database file
+  <database path>       path to a ParamDB database file, or a directory containing
+                        database files (multiple databases are served under
+                        /db/<name>/)
 """
 OPTIONAL_ARGS_MSG = """
   -h, --help            show this help message and exit
   -V, --version         show program's version number and exit
   -p PORT, --port PORT  port to use (default is 5050)
+  --cache-size MB       memory in MB to use for caching commit data (default is 128)
+  --min-interval MS     time in ms without database changes to wait before notifying
+                        clients (default is 50)
+  --max-latency MS      maximum time in ms to wait before notifying clients of database
+                        changes (default is 500)
+  --watch {events,poll}
+                        how to detect database changes: watch file system events in
+                        the database directory, or poll the database file (default is
+                        events)
+  --poll-interval MS    time in ms between checks when using --watch poll (default is
+                        100)
+  --threads N           number of threads to use for database operations (default is
+                        20)
+  --workers N           number of processes to serve requests from, which allows
+                        using more than one CPU core (default is 1)
+  --metrics             serve metrics in Prometheus format at /api/metrics (default
+                        is off)
+  --profile DIR         profile each request, saving profiles to this directory
+                        (slows down the server, so only use for debugging)
   --no-open             don't open a new browser window (default is to open one)
 """
 ERROR_MSG = f"{PROGRAM_NAME}: error:"
@@ -36,7 +78,13 @@ def _sw(*strings: str) -> str:
 def test_db_path() -> None:
     """Parses the database path."""
     args = _parse_args([DB_PATH])
-    assert args.db_path == DB_PATH
+    assert args.db_paths == [DB_PATH]
+
+
+def test_multiple_db_paths() -> None:
+    """Parses multiple database paths."""
+    args = _parse_args([DB_PATH, "other.db", "databases"])
+    assert args.db_paths == [DB_PATH, "other.db", "databases"]
 
 
 def test_port_default() -> None:
@@ -52,6 +100,101 @@ def test_port(port_arg: str) -> None:
     assert args.port == 1234
 
 
+def test_cache_size_default() -> None:
+    """Default cache size is 128 MB."""
+    args = _parse_args([DB_PATH])
+    assert args.cache_size == 128
+
+
+def test_cache_size() -> None:
+    """Parses the cache size."""
+    args = _parse_args([DB_PATH, "--cache-size", "16"])
+    assert args.cache_size == 16
+
+
+def test_min_interval_max_latency_default() -> None:
+    """Default minimum interval is 50 ms and maximum latency is 500 ms."""
+    args = _parse_args([DB_PATH])
+    assert args.min_interval == 50
+    assert args.max_latency == 500
+
+
+def test_min_interval_max_latency() -> None:
+    """Parses the minimum interval and maximum latency."""
+    args = _parse_args([DB_PATH, "--min-interval", "10", "--max-latency", "100"])
+    assert args.min_interval == 10
+    assert args.max_latency == 100
+
+
+def test_watch_default() -> None:
+    """Default watch backend is events, and default poll interval is 100 ms."""
+    args = _parse_args([DB_PATH])
+    assert args.watch == "events"
+    assert args.poll_interval == 100
+
+
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_watch_backends(backend: str) -> None:
+    """Accepts every watch backend."""
+    args = _parse_args([DB_PATH, "--watch", backend])
+    assert args.watch == backend
+
+
+def test_watch() -> None:
+    """Parses the watch backend and poll interval."""
+    args = _parse_args([DB_PATH, "--watch", "poll", "--poll-interval", "20"])
+    assert args.watch == "poll"
+    assert args.poll_interval == 20
+
+
+def test_threads_default() -> None:
+    """Default number of threads is 20."""
+    args = _parse_args([DB_PATH])
+    assert args.threads == 20
+
+
+def test_threads() -> None:
+    """Parses the number of threads."""
+    args = _parse_args([DB_PATH, "--threads", "4"])
+    assert args.threads == 4
+
+
+def test_workers_default() -> None:
+    """Default number of workers is 1."""
+    args = _parse_args([DB_PATH])
+    assert args.workers == 1
+
+
+def test_workers() -> None:
+    """Parses the number of workers."""
+    args = _parse_args([DB_PATH, "--workers", "4"])
+    assert args.workers == 4
+
+
+def test_metrics_default() -> None:
+    """Metrics are disabled by default."""
+    args = _parse_args([DB_PATH])
+    assert args.metrics is False
+
+
+def test_metrics() -> None:
+    """Parses the metrics flag."""
+    args = _parse_args([DB_PATH, "--metrics"])
+    assert args.metrics is True
+
+
+def test_profile_default() -> None:
+    """Requests are not profiled by default."""
+    args = _parse_args([DB_PATH])
+    assert args.profile is None
+
+
+def test_profile() -> None:
+    """Parses the profile directory."""
+    args = _parse_args([DB_PATH, "--profile", "profiles"])
+    assert args.profile == "profiles"
+
+
 @pytest.mark.parametrize("version_arg", ["--version", "-V"])
 def test_version(version_arg: str, capsys: CaptureFixture[str]) -> None:
     """Prints version message to stdout and exists with code 0."""
@@ -80,7 +223,7 @@ def test_no_args(capsys: CaptureFixture[str]) -> None:
     assert _sw(capsys.readouterr().err) == _sw(USAGE_MSG, ERROR_MSG, REQUIRED_MSG)
 
 
-@pytest.mark.parametrize("unrecognized_arg", ["arg", "--arg", "-a"])
+@pytest.mark.parametrize("unrecognized_arg", ["--arg", "-a"])
 def test_parse_args_unrecognized(
     unrecognized_arg: str, capsys: CaptureFixture[str]
 ) -> None:
@@ -91,3 +234,22 @@ def test_parse_args_unrecognized(
     assert _sw(capsys.readouterr().err) == _sw(
         USAGE_MSG, ERROR_MSG, UNRECOGNIZED_MSG, unrecognized_arg
     )
+
+
+def test_import_time() -> None:
+    """
+    Importing the CLI does not import slow modules (they are imported once the server
+    starts), and takes less than the import time budget.
+    """
+    code = """
+import sys, time, json
+start = time.perf_counter()
+import paramview._cli
+print(json.dumps({"time": time.perf_counter() - start, "modules": list(sys.modules)}))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    import_info = json.loads(result.stdout)
+    assert [module for module in SLOW_MODULES if module in import_info["modules"]] == []
+    assert import_info["time"] < IMPORT_TIME_BUDGET
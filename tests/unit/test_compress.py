@@ -0,0 +1,146 @@
+"""Tests for paramview._compress."""
+
+from __future__ import annotations
+from typing import Any
+import gzip
+from pathlib import Path
+from flask.testing import FlaskClient
+import pytest
+from paramdb import ParamDB
+from paramview._cache import CommitCache
+from paramview._compress import COMPRESSION_THRESHOLD, compress
+
+GZIP_HEADERS = {"Accept-Encoding": "gzip, deflate"}
+
+
+@pytest.fixture(name="large_commit_id")
+def fixture_large_commit_id(db: ParamDB[Any]) -> int:
+    """ID of a commit whose data is larger than the compression threshold."""
+    return db.commit("Large commit", list(range(COMPRESSION_THRESHOLD))).id
+
+
+def test_api_compressed(
+    db: ParamDB[Any], client: FlaskClient, large_commit_id: int
+) -> None:
+    """Compresses large API responses if the client accepts gzip."""
+    response = client.get(f"/api/data/{large_commit_id}", headers=GZIP_HEADERS)
+    assert response.status_code == 200  # Success
+    assert response.mimetype == "application/json"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.data).decode() == db.load(
+        large_commit_id, raw_json=True
+    )
+    _, weak = response.get_etag()
+    assert weak
+
+
+def test_api_encoding_not_accepted(client: FlaskClient, large_commit_id: int) -> None:
+    """Does not compress API responses if the client does not accept compression."""
+    response = client.get(f"/api/data/{large_commit_id}")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+    response = client.get(
+        f"/api/data/{large_commit_id}", headers={"Accept-Encoding": "gzip;q=0"}
+    )
+    assert "Content-Encoding" not in response.headers
+
+
+def test_api_small_not_compressed(client: FlaskClient) -> None:
+    """Does not compress API responses smaller than the compression threshold."""
+    response = client.get("/api/data/1", headers=GZIP_HEADERS)
+    assert len(response.data) < COMPRESSION_THRESHOLD
+    assert "Content-Encoding" not in response.headers
+
+
+def test_api_compressed_revalidate(client: FlaskClient, large_commit_id: int) -> None:
+    """Revalidates compressed responses using their weak entity tags."""
+    etag = client.get(f"/api/data/{large_commit_id}", headers=GZIP_HEADERS).headers[
+        "ETag"
+    ]
+    response = client.get(
+        f"/api/data/{large_commit_id}",
+        headers={**GZIP_HEADERS, "If-None-Match": etag},
+    )
+    assert response.status_code == 304  # Not modified
+
+
+def test_api_compressed_cached(
+    monkeypatch: pytest.MonkeyPatch,
+    db: ParamDB[Any],
+    client: FlaskClient,
+    large_commit_id: int,
+) -> None:
+    """
+    Caches compressed API responses, so data is only compressed once for each encoding
+    and is not loaded again while the compressed data is cached.
+    """
+    compressed_encodings: list[str] = []
+
+    def counting_compress(data: bytes, encoding: str) -> bytes:
+        compressed_encodings.append(encoding)
+        return compress(data, encoding)
+
+    monkeypatch.setattr("paramview._api.compress", counting_compress)
+    commit_cache: CommitCache = client.application.config["commit_cache"]
+    url = f"/api/data/{large_commit_id}"
+    data = db.load(large_commit_id, raw_json=True)
+    response = client.get(url, headers=GZIP_HEADERS)
+    assert gzip.decompress(response.data).decode() == data
+    num_misses = commit_cache.stats.misses
+    response = client.get(url, headers=GZIP_HEADERS)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).decode() == data
+    assert compressed_encodings == ["gzip"]
+    assert commit_cache.stats.misses == num_misses
+    assert client.get(url).text == data  # Not compressed
+
+
+def test_api_streamed_compressed(
+    monkeypatch: pytest.MonkeyPatch,
+    db: ParamDB[Any],
+    client: FlaskClient,
+    large_commit_id: int,
+) -> None:
+    """Compresses streamed API responses as they are streamed."""
+    monkeypatch.setattr("paramview._api.STREAMING_THRESHOLD", 0)
+    response = client.get(f"/api/data/{large_commit_id}", headers=GZIP_HEADERS)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers  # Streamed
+    assert gzip.decompress(response.data).decode() == db.load(
+        large_commit_id, raw_json=True
+    )
+
+
+@pytest.mark.parametrize(
+    "accept_encoding,expected_encoding",
+    [("br, gzip", "br"), ("gzip", "gzip"), ("br;q=0.5, gzip", "gzip"), ("", None)],
+)
+def test_precompressed_static(
+    tmp_path: Path,
+    client: FlaskClient,
+    accept_encoding: str,
+    expected_encoding: str | None,
+) -> None:
+    """Serves precompressed static files if the client accepts their encoding."""
+    client.application.static_folder = str(tmp_path)
+    (tmp_path / "style.css").write_text("original")
+    (tmp_path / "style.css.gz").write_text("gzip")
+    (tmp_path / "style.css.br").write_text("br")
+    response = client.get("/style.css", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200  # Success
+    assert response.mimetype == "text/css"
+    assert response.headers.get("Content-Encoding") == expected_encoding
+    assert response.text == (expected_encoding or "original")
+
+
+def test_precompressed_index(tmp_path: Path, client: FlaskClient) -> None:
+    """Serves a precompressed index.html from the root path."""
+    client.application.static_folder = str(tmp_path)
+    (tmp_path / "index.html").write_text("original")
+    (tmp_path / "index.html.gz").write_text("gzip")
+    response = client.get("/", headers=GZIP_HEADERS)
+    assert response.status_code == 200  # Success
+    assert response.mimetype == "text/html"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.text == "gzip"
@@ -0,0 +1,79 @@
+"""Tests for paramview._database."""
+
+from __future__ import annotations
+from typing import Any
+import json
+import pytest
+from zstandard import ZstdDecompressor
+from paramdb import ParamDB
+from paramdb._database import _Snapshot
+from paramview._database import ParamViewDB
+
+
+def test_paramdb_internals(db: ParamDB[Any]) -> None:
+    """
+    The private ParamDB internals used by ParamViewDB exist. If this fails, ParamDB has
+    changed its internals and ParamViewDB must be updated (or ParamDB pinned to an older
+    version).
+    """
+    columns = {column.name for column in _Snapshot.__table__.columns}
+    assert {"id", "message", "timestamp", "data"} <= columns
+    for name in ("_Session", "_select_commit", "_index_error"):
+        assert callable(getattr(db, name, None)), f"ParamDB has no attribute {name}"
+
+
+def test_commit_history_after(db_path: str, db: ParamDB[Any]) -> None:
+    """Returns commit entries after the given ID, up to the given limit."""
+    param_view_db = ParamViewDB(db_path)
+    commit_history = db.commit_history()
+    assert param_view_db.commit_history_after() == commit_history
+    assert param_view_db.commit_history_after(1) == commit_history[1:]
+    assert param_view_db.commit_history_after(1, 1) == commit_history[1:2]
+    assert param_view_db.commit_history_after(3) == []
+    with pytest.raises(ValueError) as exc_info:
+        param_view_db.commit_history_after(limit=-1)
+    assert str(exc_info.value) == "limit must be non-negative, not -1"
+
+
+def test_latest_commit_id(db_path: str) -> None:
+    """Returns the ID of the latest commit."""
+    assert ParamViewDB(db_path).latest_commit_id() == 3
+
+
+def test_load_compressed(db_path: str, db: ParamDB[Any]) -> None:
+    """Loads the compressed JSON data of a commit."""
+    compressed = ParamViewDB(db_path).load_compressed(1)
+    raw_json = ZstdDecompressor().decompress(compressed)
+    assert json.loads(raw_json) == json.loads(db.load(1, raw_json=True))
+
+
+def test_load_compressed_nonexistent(db_path: str, db: ParamDB[Any]) -> None:
+    """Raises the same IndexError as ParamDB for a nonexistent commit."""
+    with pytest.raises(IndexError) as exc_info:
+        ParamViewDB(db_path).load_compressed(4)
+    with pytest.raises(IndexError) as expected_exc_info:
+        db.load(4)
+    assert str(exc_info.value) == str(expected_exc_info.value)
+
+
+def test_cached_commit_timestamp(db_path: str, db: ParamDB[Any]) -> None:
+    """Returns cached commit timestamps until the database is modified."""
+    param_view_db = ParamViewDB(db_path)
+    assert param_view_db.cached_commit_timestamp(1) is None
+    param_view_db.cache_commit_timestamp(1, 123.0, param_view_db.file_version())
+    assert param_view_db.cached_commit_timestamp(1) == 123.0
+    assert param_view_db.cached_commit_timestamp(2) is None
+    db.commit("Another commit", {})
+    assert param_view_db.cached_commit_timestamp(1) is None
+
+
+def test_cached_commit_timestamps_discarded(db_path: str, db: ParamDB[Any]) -> None:
+    """Cached commit timestamps are discarded once the database is modified."""
+    param_view_db = ParamViewDB(db_path)
+    param_view_db.cache_commit_timestamp(1, 123.0, param_view_db.file_version())
+    param_view_db.cache_commit_timestamp(2, 456.0, param_view_db.file_version())
+    db.commit("Another commit", {})
+    param_view_db.cache_commit_timestamp(3, 789.0, param_view_db.file_version())
+    assert param_view_db.cached_commit_timestamp(3) == 789.0
+    # pylint: disable-next=protected-access
+    assert param_view_db._commit_timestamps[1] == {3: 789.0}
@@ -0,0 +1,110 @@
+"""Tests for paramview._metrics."""
+
+from __future__ import annotations
+import pytest
+from paramview._cache import CacheStats
+from paramview._single_flight import SingleFlightStats
+from paramview._metrics import Metrics
+
+CACHE_STATS = CacheStats(
+    hits=3, misses=1, evictions=2, clears=0, num_entries=5, size=100, max_size=1000
+)
+SINGLE_FLIGHT_STATS = SingleFlightStats(calls=4, deduplicated=1, in_flight=0)
+
+
+def _render(metrics: Metrics) -> list[str]:
+    """Return the lines of the rendered metrics, with test cache statistics."""
+    return metrics.render(CACHE_STATS, SINGLE_FLIGHT_STATS).splitlines()
+
+
+def test_metrics_empty() -> None:
+    """Renders help and type lines for every metric, and the given statistics."""
+    lines = _render(Metrics())
+    assert "# TYPE paramview_requests_total counter" in lines
+    assert "# TYPE paramview_request_duration_seconds histogram" in lines
+    assert "# TYPE paramview_socketio_clients gauge" in lines
+    assert "paramview_commit_cache_hits_total 3" in lines
+    assert "paramview_commit_cache_misses_total 1" in lines
+    assert "paramview_commit_cache_hit_ratio 0.75" in lines
+    assert "paramview_commit_cache_evictions_total 2" in lines
+    assert "paramview_commit_cache_size_bytes 100" in lines
+    assert "paramview_single_flight_calls_total 4" in lines
+    assert "paramview_single_flight_deduplicated_total 1" in lines
+
+
+def test_metrics_hit_ratio_no_lookups() -> None:
+    """The cache hit ratio is 0 if there have been no lookups."""
+    cache_stats = CacheStats(
+        hits=0, misses=0, evictions=0, clears=0, num_entries=0, size=0, max_size=0
+    )
+    lines = Metrics().render(cache_stats, SINGLE_FLIGHT_STATS).splitlines()
+    assert "paramview_commit_cache_hit_ratio 0" in lines
+
+
+def test_metrics_requests() -> None:
+    """Records request counts, latency histograms, and response sizes per route."""
+    metrics = Metrics()
+    metrics.observe_request("/api/data/<int:commit_id>", "GET", 200, 0.003, 300)
+    metrics.observe_request("/api/data/<int:commit_id>", "GET", 200, 0.2, None)
+    metrics.observe_request("/api/data/<int:commit_id>", "GET", 404, 0.001, 100)
+    lines = _render(metrics)
+    labels = 'route="/api/data/<int:commit_id>",method="GET"'
+    duration = "paramview_request_duration_seconds"
+    size = "paramview_response_size_bytes"
+    assert f'paramview_requests_total{{{labels},status="200"}} 2' in lines
+    assert f'paramview_requests_total{{{labels},status="404"}} 1' in lines
+    assert f'{duration}_bucket{{{labels},le="0.001"}} 1' in lines
+    assert f'{duration}_bucket{{{labels},le="0.005"}} 2' in lines
+    assert f'{duration}_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"{duration}_count{{{labels}}} 3" in lines
+    sum_line = next(line for line in lines if line.startswith(f"{duration}_sum"))
+    assert float(sum_line.split()[-1]) == pytest.approx(0.204)
+    assert f'{size}_bucket{{{labels},le="256"}} 1' in lines
+    assert f'{size}_bucket{{{labels},le="1024"}} 2' in lines
+    assert f"{size}_count{{{labels}}} 2" in lines
+
+
+def test_metrics_timed() -> None:
+    """Records the time of database operations, including when they raise."""
+    metrics = Metrics()
+
+    def fail() -> None:
+        raise ValueError("failed")
+
+    assert metrics.timed("load", lambda x: x + 1)(1) == 2
+    with pytest.raises(ValueError):
+        metrics.timed("load", fail)()
+    lines = _render(metrics)
+    assert 'paramview_db_operation_duration_seconds_count{operation="load"} 2' in lines
+
+
+def test_metrics_socketio_clients() -> None:
+    """Records the number of connected SocketIO clients for each database."""
+    metrics = Metrics()
+    metrics.socketio_connected("a.db")
+    metrics.socketio_connected("a.db")
+    metrics.socketio_connected("b.db")
+    metrics.socketio_connected("a.db", -1)
+    lines = _render(metrics)
+    assert 'paramview_socketio_clients{database="a.db"} 1' in lines
+    assert 'paramview_socketio_clients{database="b.db"} 1' in lines
+
+
+def test_metrics_watch_updates() -> None:
+    """Records raw watcher events, emitted updates, and lag for each database."""
+    metrics = Metrics()
+    metrics.observe_watch_update("a.db", 3, 0.02, emitted=True)
+    metrics.observe_watch_update("a.db", 1, 0.2, emitted=False)
+    lines = _render(metrics)
+    assert 'paramview_watch_events_total{database="a.db"} 4' in lines
+    assert 'paramview_watch_updates_total{database="a.db"} 1' in lines
+    assert 'paramview_watch_lag_seconds_bucket{database="a.db",le="0.025"} 1' in lines
+    assert 'paramview_watch_lag_seconds_count{database="a.db"} 2' in lines
+
+
+def test_metrics_escapes_labels() -> None:
+    """Escapes backslashes, quotes, and newlines in label values."""
+    metrics = Metrics()
+    metrics.socketio_connected('a\\"\n.db')
+    lines = _render(metrics)
+    assert 'paramview_socketio_clients{database="a\\\\\\"\\n.db"} 1' in lines
@@ -0,0 +1,90 @@
+"""Tests for paramview._offload."""
+
+from __future__ import annotations
+import time
+import threading
+import pytest
+import eventlet  # type: ignore
+
+# pylint: disable-next=no-name-in-module
+from eventlet.green.urllib.request import urlopen  # type: ignore
+from paramview._database import ParamViewDB
+from paramview._offload import (
+    DEFAULT_NUM_THREADS,
+    set_num_threads,
+    offload,
+    run_inline,
+)
+
+
+def test_offload() -> None:
+    """Calls the function in another thread and returns its result."""
+    assert offload(threading.get_ident) != threading.get_ident()
+    assert offload(sum, [1, 2, 3], start=4) == 10
+
+
+def test_offload_raises() -> None:
+    """Raises exceptions from the function in the calling thread."""
+    with pytest.raises(KeyError) as exc_info:
+        offload({}.__getitem__, "key")
+    assert exc_info.value.args == ("key",)
+
+
+def test_run_inline() -> None:
+    """Calls the function in the calling thread within ``run_inline()``."""
+    with run_inline():
+        assert offload(threading.get_ident) == threading.get_ident()
+    assert offload(threading.get_ident) != threading.get_ident()
+
+
+@pytest.mark.parametrize("num_threads", [-1, 0, 1])
+def test_too_few_threads_fails(num_threads: int) -> None:
+    """Fails to set fewer than 2 threads."""
+    with pytest.raises(ValueError) as exc_info:
+        set_num_threads(num_threads)
+    assert str(exc_info.value) == (
+        f"number of threads must be at least 2, not {num_threads}"
+    )
+
+
+def test_set_num_threads() -> None:
+    """Restarts the thread pool with the given number of threads."""
+    offload(time.sleep, 0)  # Ensure the thread pool has started
+    set_num_threads(3)
+    try:
+        threads_started = []
+        barrier = threading.Barrier(3, timeout=1)
+
+        def wait_for_barrier() -> None:
+            threads_started.append(threading.get_ident())
+            barrier.wait()
+
+        # All 3 calls must run at once for the barrier to be passed
+        greenthreads = [eventlet.spawn(offload, wait_for_barrier) for _ in range(3)]
+        for greenthread in greenthreads:
+            greenthread.wait()
+        assert len(set(threads_started)) == 3
+    finally:
+        set_num_threads(DEFAULT_NUM_THREADS)
+
+
+def test_slow_load_does_not_block(
+    server_url: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A slow database load does not delay concurrent requests."""
+    load_compressed = ParamViewDB.load_compressed
+
+    def slow_load_compressed(self: ParamViewDB, commit_id: int) -> bytes:
+        time.sleep(1)  # Not monkeypatched by eventlet, so this blocks its thread
+        return load_compressed(self, commit_id)
+
+    monkeypatch.setattr(ParamViewDB, "load_compressed", slow_load_compressed)
+    start = time.monotonic()
+    slow_request = eventlet.spawn(urlopen, f"{server_url}/api/data/1")
+    eventlet.sleep(0.1)  # Let the slow request start
+    with urlopen(f"{server_url}/api/database-name") as response:
+        assert response.status == 200
+    assert time.monotonic() - start < 0.5
+    with slow_request.wait() as response:
+        assert response.status == 200
+    assert time.monotonic() - start >= 1
@@ -0,0 +1,62 @@
+"""Tests for paramview._profile."""
+
+from __future__ import annotations
+import os
+import pstats
+from pathlib import Path
+from flask.testing import FlaskClient
+from paramview._app import create_app
+
+
+def _server_timing(client: FlaskClient, url: str, **kwargs: object) -> dict[str, float]:
+    """Return the durations in ms in the ``Server-Timing`` header of the response."""
+    response = client.get(url, **kwargs)
+    durations = {}
+    for metric in response.headers["Server-Timing"].split(", "):
+        name, duration, description = metric.split(";")
+        assert duration.startswith("dur=")
+        assert description.startswith("desc=")
+        durations[name] = float(duration.removeprefix("dur="))
+    return durations
+
+
+def test_server_timing(client: FlaskClient) -> None:
+    """
+    API responses include a Server-Timing header with the time spent loading from the
+    database, serializing, and compressing.
+    """
+    durations = _server_timing(client, "/api/data/1")
+    assert list(durations) == ["db", "serialize", "compress", "total"]
+    assert all(duration >= 0 for duration in durations.values())
+    assert durations["total"] >= durations["db"] + durations["serialize"]
+
+
+def test_server_timing_cached(client: FlaskClient) -> None:
+    """Responses that do not serialize data only include the times that were spent."""
+    etag = client.get("/api/data/1").headers["ETag"]
+    durations = _server_timing(client, "/api/data/1", headers={"If-None-Match": etag})
+    assert list(durations) == ["db", "compress", "total"]
+
+
+def test_profile_requests(db_path: str, tmp_path: Path) -> None:
+    """
+    Saves the profile of each request, including functions run in the thread pool, to
+    the given directory, which is created if necessary.
+    """
+    profile_dir = tmp_path / "profiles"
+    app, _ = create_app(db_path, profile_dir=str(profile_dir))
+    client = app.test_client()
+    response = client.get("/api/data/1")
+    assert response.status_code == 200  # Success
+    assert response.json == client.get("/api/data/1").json
+    profile_files = sorted(os.listdir(profile_dir))
+    assert len(profile_files) == 2
+    assert all(
+        profile_file.endswith(".pstats") and ".GET.api.data.1." in profile_file
+        for profile_file in profile_files
+    )
+    stats = pstats.Stats(str(profile_dir / profile_files[0]))
+    function_names = {
+        function_name for _, _, function_name in stats.stats  # type: ignore
+    }
+    assert "load_compressed" in function_names
@@ -0,0 +1,78 @@
+"""Tests for paramview._single_flight."""
+
+from __future__ import annotations
+import pytest
+import eventlet  # type: ignore
+from paramview._single_flight import SingleFlightStats, SingleFlight
+
+
+def test_single_flight_empty() -> None:
+    """Starts with no calls."""
+    assert SingleFlight().stats == SingleFlightStats(
+        calls=0, deduplicated=0, in_flight=0
+    )
+
+
+def test_single_flight_concurrent() -> None:
+    """Concurrent calls with the same key share a single load."""
+    single_flight = SingleFlight()
+    num_loads = 0
+
+    def load() -> int:
+        nonlocal num_loads
+        num_loads += 1
+        eventlet.sleep(0.05)
+        return 123
+
+    greenthreads = [eventlet.spawn(single_flight.do, "key", load) for _ in range(5)]
+    eventlet.sleep(0)  # Let the greenthreads start
+    assert single_flight.stats == SingleFlightStats(
+        calls=5, deduplicated=4, in_flight=1
+    )
+    assert [greenthread.wait() for greenthread in greenthreads] == [123] * 5
+    assert num_loads == 1
+    assert single_flight.stats.in_flight == 0
+
+
+def test_single_flight_different_keys() -> None:
+    """Concurrent calls with different keys do not share loads."""
+    single_flight = SingleFlight()
+
+    def load(value: str) -> str:
+        eventlet.sleep(0.05)
+        return value
+
+    greenthreads = [
+        eventlet.spawn(single_flight.do, key, lambda key=key: load(key))
+        for key in ["a", "b"]
+    ]
+    assert [greenthread.wait() for greenthread in greenthreads] == ["a", "b"]
+    assert single_flight.stats.deduplicated == 0
+
+
+def test_single_flight_sequential() -> None:
+    """Calls made after a load finishes run a new load."""
+    single_flight = SingleFlight()
+    assert single_flight.do("key", lambda: 1) == 1
+    assert single_flight.do("key", lambda: 2) == 2
+    assert single_flight.stats == SingleFlightStats(
+        calls=2, deduplicated=0, in_flight=0
+    )
+
+
+def test_single_flight_exception() -> None:
+    """Concurrent calls share the exception raised by a load."""
+    single_flight = SingleFlight()
+
+    def load() -> None:
+        eventlet.sleep(0.05)
+        raise KeyError("key")
+
+    greenthreads = [eventlet.spawn(single_flight.do, "key", load) for _ in range(3)]
+    for greenthread in greenthreads:
+        with pytest.raises(KeyError):
+            greenthread.wait()
+    assert single_flight.stats == SingleFlightStats(
+        calls=3, deduplicated=2, in_flight=0
+    )
+    assert single_flight.do("key", lambda: 1) == 1
@@ -0,0 +1,94 @@
+"""Tests for paramview._subtree."""
+
+from __future__ import annotations
+from typing import Any
+import pytest
+from paramview._subtree import parse_data_path, get_subtree, truncate
+
+QUANTITY = {"type": "Quantity", "value": 1.0, "unit": "m"}
+
+
+def _list(*items: Any) -> dict[str, Any]:
+    """Return a list object containing the given items."""
+    return {"type": "list", "data": list(items)}
+
+
+def _dict(**items: Any) -> dict[str, Any]:
+    """Return a dictionary object containing the given items."""
+    return {"type": "dict", "data": items}
+
+
+def _param(data: Any) -> dict[str, Any]:
+    """Return a ParamData object wrapping the given data."""
+    return {
+        "type": "ParamData",
+        "className": "CustomParam",
+        "lastUpdated": 1.0,
+        "data": data,
+    }
+
+
+DATA = _param(_dict(a=_list(1, _param(_dict(b=QUANTITY))), c=None))
+
+
+@pytest.mark.parametrize(
+    "pointer,path",
+    [
+        ("a", ["a"]),
+        ("a/0/b", ["a", "0", "b"]),
+        ("a~1b/~0c", ["a/b", "~c"]),
+        ("~01", ["~1"]),
+        ("a//", ["a", "", ""]),
+    ],
+)
+def test_parse_data_path(pointer: str, path: list[str]) -> None:
+    """Parses JSON pointers into paths, unescaping "~" and "/"."""
+    assert parse_data_path(pointer) == path
+
+
+def test_get_subtree() -> None:
+    """Gets subtrees of data at paths through ParamData, lists, and dictionaries."""
+    assert get_subtree(DATA, []) is DATA
+    assert get_subtree(DATA, ["c"]) is None
+    assert get_subtree(DATA, ["a", "0"]) == 1
+    assert get_subtree(DATA, ["a", "1", "b"]) is QUANTITY
+
+
+@pytest.mark.parametrize(
+    "path,exception",
+    [
+        (["d"], KeyError),
+        (["a", "2"], IndexError),
+        (["a", "-1"], IndexError),
+        (["a", "b"], IndexError),
+        (["c", "d"], KeyError),
+        (["a", "1", "b", "value"], KeyError),
+    ],
+)
+def test_get_subtree_nonexistent_fails(path: list[str], exception: type) -> None:
+    """Fails to get subtrees at paths that do not exist."""
+    with pytest.raises(exception) as exc_info:
+        get_subtree(DATA, path)
+    assert "does not exist" in str(exc_info.value)
+
+
+def test_truncate() -> None:
+    """Removes the children of groups below the given depth."""
+    assert truncate(DATA, 0) == _param({"type": "dict", "data": {}, "numChildren": 2})
+    assert truncate(DATA, 1) == _param(
+        _dict(a={"type": "list", "data": [], "numChildren": 2}, c=None)
+    )
+    assert truncate(DATA, 2) == _param(
+        _dict(
+            a=_list(1, _param({"type": "dict", "data": {}, "numChildren": 1})), c=None
+        )
+    )
+    assert truncate(DATA, 3) == DATA
+    assert truncate(QUANTITY, 0) is QUANTITY
+
+
+def test_truncate_negative_depth_fails() -> None:
+    """Fails to truncate data to a negative depth."""
+    with pytest.raises(ValueError) as exc_info:
+        truncate(DATA, -1)
+    assert str(exc_info.value) == "depth must be non-negative, not -1"
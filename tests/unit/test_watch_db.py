@@ -1,12 +1,33 @@
 """Tests for paramview._watch_db."""
 
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Iterator
+import os
 import time
+import shutil
+import sqlite3
+import logging
+import pytest
 from eventlet import sleep  # type: ignore
+from flask.testing import FlaskClient
 from flask_socketio import SocketIOTestClient  # type: ignore
+from sqlalchemy import delete
 from paramdb import ParamDB
-from paramview._watch_db import watch_db
+from paramdb._database import _Snapshot
+from paramview._app import create_app
+from paramview._cache import CacheStats
+from paramview._single_flight import SingleFlightStats
+from paramview._metrics import Metrics
+from paramview import _watch_db
+from paramview._watch_db import (
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_MAX_LATENCY,
+    WATCH_BACKENDS,
+    watch_db,
+)
+
+JOURNAL_MODES = ("delete", "wal")
+"""SQLite journal modes to test (rollback journal, the default, and WAL)."""
 
 
 def wait_for_socketio_events(socketio_client: SocketIOTestClient) -> list[Any]:
@@ -21,19 +42,338 @@ def wait_for_socketio_events(socketio_client: SocketIOTestClient) -> list[Any]:
     return received
 
 
+@pytest.fixture(name="journal_mode")
+def fixture_journal_mode() -> str:
+    """
+    SQLite journal mode of the database. Tests that should run with every journal mode
+    override this by parametrizing ``journal_mode``.
+    """
+    return "delete"
+
+
+@pytest.fixture(name="db_path")
+def fixture_db_path(db_path: str, journal_mode: str) -> str:
+    """Path to a ParamDB database using the given journal mode."""
+    connection = sqlite3.connect(db_path)
+    connection.execute(f"PRAGMA journal_mode={journal_mode}")
+    connection.close()
+    return db_path
+
+
+@pytest.fixture(name="backend")
+def fixture_backend() -> str:
+    """
+    Watch backend used by ``start_watch_db``. Tests that should run with every backend
+    override this by parametrizing ``backend``.
+    """
+    return "events"
+
+
+@pytest.fixture(name="start_watch_db")
+def fixture_start_watch_db(
+    db_path: str, socketio_client: SocketIOTestClient, backend: str
+) -> Iterator[Callable[..., None]]:
+    """
+    Function to start watching the database with the given keyword arguments. The
+    watcher is stopped after the test, even if it fails.
+    """
+    stop_functions: list[Callable[[], None]] = []
+
+    def start_watch_db(**kwargs: Any) -> None:
+        kwargs.setdefault("backend", backend)
+        kwargs.setdefault("poll_interval", 0.02)
+        stop_functions.append(watch_db(db_path, socketio_client.socketio, **kwargs))
+
+    yield start_watch_db
+    for stop_watch_db in stop_functions:
+        stop_watch_db()
+
+
 def test_socketio_connected(socketio_client: SocketIOTestClient) -> None:
     """The server is connected to SocketIO."""
     assert socketio_client.is_connected()
 
 
+@pytest.mark.parametrize("journal_mode", JOURNAL_MODES)
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
 def test_emits_on_update(
-    db_path: str, db: ParamDB[Any], socketio_client: SocketIOTestClient
+    db: ParamDB[Any],
+    client: FlaskClient,
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
 ) -> None:
-    """Emits a SocketIO event when the database is updated."""
-    stop_watch_db = watch_db(db_path, socketio_client.socketio)
+    """
+    Emits a SocketIO event containing the latest commit ID and new commit entries when
+    the database is updated.
+    """
+    start_watch_db()
     assert len(socketio_client.get_received()) == 0
     db.commit("", 123)
     received = wait_for_socketio_events(socketio_client)
     assert len(received) == 1
     assert received[0]["name"] == "database_update"
-    stop_watch_db()
+    update = received[0]["args"][0]
+    assert update.pop("numFileEvents") >= 1
+    assert update == (
+        {
+            "latestCommitId": 4,
+            "previousCommitId": 3,
+            "commits": client.get("/api/commit-history?after=3").json,
+            "reset": False,
+        }
+    )
+
+
+@pytest.mark.parametrize("journal_mode", JOURNAL_MODES)
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_notification_latency(
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """
+    Emits a SocketIO event for a single commit within the minimum interval plus a
+    margin for detecting the change, for both journal modes.
+    """
+    start_watch_db()
+    start = time.monotonic()
+    db.commit("", 123)
+    received = wait_for_socketio_events(socketio_client)
+    latency = time.monotonic() - start
+    assert len(received) == 1
+    assert received[0]["args"][0]["latestCommitId"] == 4
+    assert latency < min(DEFAULT_MIN_INTERVAL + 0.2, DEFAULT_MAX_LATENCY)
+
+
+@pytest.mark.parametrize("journal_mode", JOURNAL_MODES)
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_no_emit_without_commit(
+    db_path: str,
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """
+    Does not emit a SocketIO event if the journal file is deleted without a commit being
+    made.
+    """
+    start_watch_db()
+    with open(f"{db_path}-journal", "w", encoding="utf-8"):
+        pass
+    os.remove(f"{db_path}-journal")
+    assert len(wait_for_socketio_events(socketio_client)) == 0
+
+
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_emits_reset_on_delete(
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """Emits a SocketIO event indicating a reset when commits are deleted."""
+    start_watch_db()
+    with db._Session.begin() as session:  # pylint: disable=no-member,protected-access
+        session.execute(delete(_Snapshot).where(_Snapshot.id == 3))
+    received = wait_for_socketio_events(socketio_client)
+    assert len(received) == 1
+    update = received[0]["args"][0]
+    assert update.pop("numFileEvents") >= 1
+    assert update == (
+        {"latestCommitId": 2, "previousCommitId": 3, "commits": [], "reset": True}
+    )
+
+
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_emits_reset_on_replace(
+    db_path: str,
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """Emits a SocketIO event indicating a reset when the database is replaced."""
+    start_watch_db()
+    new_db_path = f"{db_path}-new"
+    new_db = ParamDB[Any](new_db_path)
+    new_db.commit("New initial commit", 123)
+    new_db.dispose()  # Explicitly close DB to avoid Windows permission error
+    db.dispose()
+    os.replace(new_db_path, db_path)
+    db.commit("", 456)
+    received = wait_for_socketio_events(socketio_client)
+    assert len(received) == 1
+    update = received[0]["args"][0]
+    assert update.pop("numFileEvents") >= 1
+    assert update == (
+        {"latestCommitId": 2, "previousCommitId": 3, "commits": [], "reset": True}
+    )
+
+
+def test_keeps_watching_after_error(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """
+    Logs an unexpected error reading updates, emits a SocketIO event without a payload,
+    and keeps watching the database.
+    """
+    database_update = _watch_db._database_update  # pylint: disable=protected-access
+
+    def failing_database_update(*_: Any) -> Any:
+        monkeypatch.setattr(_watch_db, "_database_update", database_update)
+        raise RuntimeError("Unexpected error")
+
+    monkeypatch.setattr(_watch_db, "_database_update", failing_database_update)
+    start_watch_db()
+    with caplog.at_level(logging.ERROR, logger="paramview._watch_db"):
+        db.commit("", 123)
+        received = wait_for_socketio_events(socketio_client)
+    assert len(received) == 1
+    assert received[0]["args"] == []
+    assert "Unexpected error" in caplog.text
+    db.commit("", 456)
+    received = wait_for_socketio_events(socketio_client)
+    assert len(received) == 1
+    assert [commit["id"] for commit in received[0]["args"][0]["commits"]] == [4, 5]
+
+
+def test_coalesces_events(
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """Emits one SocketIO event for a burst of commits within the minimum interval."""
+    start_watch_db(min_interval=0.2, max_latency=10)
+    for i in range(5):
+        db.commit(f"Burst commit {i}", i)
+    received = wait_for_socketio_events(socketio_client)
+    sleep(0.3)
+    received += socketio_client.get_received()
+    assert len(received) == 1
+    update = received[0]["args"][0]
+    assert [commit["id"] for commit in update["commits"]] == [4, 5, 6, 7, 8]
+    assert update["numFileEvents"] >= 5
+
+
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_max_latency(
+    db: ParamDB[Any],
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """
+    Emits SocketIO events at least every maximum latency during continuous commits, and
+    each commit is included in exactly one event.
+    """
+    start_watch_db(min_interval=0.2, max_latency=0.3)
+    for i in range(20):
+        db.commit(f"Continuous commit {i}", i)
+        sleep(0.05)
+    sleep(0.5)
+    received = socketio_client.get_received()
+    assert len(received) >= 2
+    commit_ids = [
+        commit["id"] for event in received for commit in event["args"][0]["commits"]
+    ]
+    assert commit_ids == list(range(4, 24))
+
+
+def test_records_metrics(
+    db: ParamDB[Any],
+    db_name: str,
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """Records the number of raw events, emitted updates, and lag in the metrics."""
+    metrics = Metrics()
+    start_watch_db(metrics=metrics)
+    db.commit("", 123)
+    assert len(wait_for_socketio_events(socketio_client)) == 1
+    cache_stats = CacheStats(
+        hits=0, misses=0, evictions=0, clears=0, num_entries=0, size=0, max_size=0
+    )
+    single_flight_stats = SingleFlightStats(calls=0, deduplicated=0, in_flight=0)
+    lines = metrics.render(cache_stats, single_flight_stats).splitlines()
+    labels = f'database="{db_name}"'
+    assert f"paramview_watch_updates_total{{{labels}}} 1" in lines
+    assert f"paramview_watch_lag_seconds_count{{{labels}}} 1" in lines
+    assert any(
+        line.startswith(f"paramview_watch_events_total{{{labels}}}") for line in lines
+    )
+
+
+def test_poll_ignores_directory(
+    db_path: str,
+    socketio_client: SocketIOTestClient,
+    start_watch_db: Callable[..., None],
+) -> None:
+    """
+    Does not detect changes to other files in the database's directory when polling.
+    """
+    start_watch_db(backend="poll", min_interval=0, max_latency=0)
+    db_dir = os.path.dirname(db_path)
+    for i in range(10):
+        with open(os.path.join(db_dir, f"other{i}.txt"), "w", encoding="utf-8") as f:
+            f.write("data")
+    with open(f"{db_path}-journal", "w", encoding="utf-8"):
+        pass
+    os.remove(f"{db_path}-journal")
+    assert len(wait_for_socketio_events(socketio_client)) == 0
+
+
+@pytest.mark.parametrize("backend", WATCH_BACKENDS)
+def test_multiple_dbs_rooms(db_path: str, db_name: str, backend: str) -> None:
+    """
+    Watches multiple databases with one watcher, emitting each database's SocketIO
+    events only to clients in its room.
+    """
+    other_db_path = os.path.join(os.path.dirname(db_path), "other.db")
+    shutil.copy(db_path, other_db_path)
+    app, socketio = create_app([db_path, other_db_path])
+    db_client = socketio.test_client(app, query_string=f"database={db_name}")
+    other_client = socketio.test_client(app, query_string="database=other.db")
+    stop_watch_db = watch_db(
+        [db_path, other_db_path], socketio, backend=backend, poll_interval=0.02
+    )
+    try:
+        other_db = ParamDB[Any](other_db_path)
+        other_db.commit("Other commit", 123)
+        other_db.dispose()  # Explicitly close DB to avoid Windows permission error
+        received = wait_for_socketio_events(other_client)
+        assert len(received) == 1
+        assert received[0]["args"][0]["latestCommitId"] == 4
+        assert len(db_client.get_received()) == 0
+    finally:
+        stop_watch_db()
+
+
+def test_nonexistent_db_room_rejected(db_path: str) -> None:
+    """Rejects SocketIO connections for databases that do not exist."""
+    app, socketio = create_app(db_path)
+    socketio_client = socketio.test_client(app, query_string="database=nonexistent.db")
+    assert not socketio_client.is_connected()
+
+
+@pytest.mark.parametrize(
+    "kwargs,message",
+    [
+        ({"min_interval": -1}, "minimum interval must be non-negative, not -1"),
+        ({"max_latency": -1}, "maximum latency must be non-negative, not -1"),
+        ({"poll_interval": 0}, "poll interval must be positive, not 0"),
+        (
+            {"backend": "inotify"},
+            "watch backend must be one of events, poll, not 'inotify'",
+        ),
+    ],
+)
+def test_invalid_options_fail(
+    db_path: str,
+    socketio_client: SocketIOTestClient,
+    kwargs: dict[str, Any],
+    message: str,
+) -> None:
+    """Fails to watch the database with invalid options."""
+    with pytest.raises(ValueError) as exc_info:
+        watch_db(db_path, socketio_client.socketio, **kwargs)
+    assert str(exc_info.value) == message
@@ -0,0 +1,86 @@
+"""Tests for paramview._workers."""
+
+from __future__ import annotations
+import json
+import socket
+import pytest
+import eventlet  # type: ignore
+
+# pylint: disable-next=no-name-in-module
+from eventlet.green.urllib.request import urlopen  # type: ignore
+from flask_socketio import SocketIO  # type: ignore
+from paramview._workers import MessageBroker, QueueManager, Workers, check_num_workers
+
+
+def test_check_num_workers() -> None:
+    """Accepts one worker, or multiple workers if the platform supports it."""
+    check_num_workers(1)
+    check_num_workers(2)
+
+
+@pytest.mark.parametrize("num_workers", [-1, 0])
+def test_check_num_workers_invalid(num_workers: int) -> None:
+    """Raises a ValueError if there are fewer than one worker."""
+    with pytest.raises(ValueError) as exc_info:
+        check_num_workers(num_workers)
+    assert (
+        str(exc_info.value)
+        == f"number of workers must be at least 1, not {num_workers}"
+    )
+
+
+def test_check_num_workers_unsupported(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Raises a ValueError for multiple workers if SO_REUSEPORT is not supported."""
+    monkeypatch.delattr(socket, "SO_REUSEPORT")
+    check_num_workers(1)
+    with pytest.raises(ValueError) as exc_info:
+        check_num_workers(2)
+    assert str(exc_info.value) == "multiple workers are not supported on this platform"
+
+
+def test_queue_manager() -> None:
+    """
+    Events emitted by a SocketIO instance with a write-only queue manager are relayed by
+    the broker to other queue managers connected to it.
+    """
+    broker = MessageBroker()
+    try:
+        listener = QueueManager(broker.address, broker.authkey)
+        emitter = SocketIO(
+            message_queue=None,
+            client_manager=QueueManager(
+                broker.address, broker.authkey, write_only=True
+            ),
+        )
+        emitter.emit("database_update", {"commits": []}, to="param.db")
+        # pylint: disable-next=protected-access
+        message = next(listener._listen())
+        assert message["method"] == "emit"
+        assert message["event"] == "database_update"
+        assert message["data"] == [{"commits": []}]
+        assert message["room"] == "param.db"
+    finally:
+        broker.close()
+
+
+def test_workers(db_path: str) -> None:
+    """Worker processes serve the database on the same port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    workers = Workers(
+        [db_path], "127.0.0.1", port, num_workers=2, num_threads=2, app_options={}
+    )
+    try:
+        commit_history = None
+        for _ in range(100):
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/api/commit-history") as response:
+                    commit_history = json.load(response)
+                break
+            except OSError:
+                eventlet.sleep(0.1)  # The workers have not started listening yet
+        assert commit_history is not None
+        assert [commit["id"] for commit in commit_history] == [1, 2, 3]
+    finally:
+        workers.stop()
@@ -1,10 +1,72 @@
+import { copyFileSync, readdirSync, readFileSync, writeFileSync } from "fs";
 import path, { resolve } from "path";
+import { brotliCompressSync, gzipSync } from "zlib";
 import license from "rollup-plugin-license";
-import { defineConfig } from "vite";
+import { defineConfig, Plugin } from "vite";
 import react from "@vitejs/plugin-react-swc";
 
+/** Directory that the frontend is built to. */
+const outDir = "paramview/static";
+
+/** Font licenses to copy into the build, mapping from source to destination paths. */
+const fontLicenses = {
+  "node_modules/@fontsource/roboto/LICENSE": `${outDir}/assets/roboto-license.txt`,
+};
+
+/** Extensions of built files to precompress. */
+const precompressExtensions = [".html", ".js", ".css", ".svg", ".txt"];
+
+/** Minimum size in bytes of built files to precompress. */
+const precompressThreshold = 1024;
+
+/**
+ * Plugin that copies font licenses into the build. This runs when the bundle is written,
+ * so the copies exist before the precompress plugin runs.
+ */
+function copyFontLicenses(): Plugin {
+  return {
+    name: "copy-font-licenses",
+    apply: "build",
+    writeBundle: () => {
+      Object.entries(fontLicenses).forEach(([src, dest]) => {
+        copyFileSync(resolve(__dirname, src), resolve(__dirname, dest));
+      });
+    },
+  };
+}
+
+/**
+ * Plugin that writes gzip (.gz) and Brotli (.br) compressed copies of built files next to
+ * the originals. The backend serves these to clients that accept the encoding. This runs
+ * after the bundle is closed, once all other files have been written.
+ */
+function precompress(): Plugin {
+  const precompressDir = (dir: string) => {
+    readdirSync(dir, { withFileTypes: true }).forEach((entry) => {
+      const entryPath = path.join(dir, entry.name);
+
+      if (entry.isDirectory()) {
+        precompressDir(entryPath);
+      } else if (precompressExtensions.includes(path.extname(entry.name))) {
+        const data = readFileSync(entryPath);
+
+        if (data.length >= precompressThreshold) {
+          writeFileSync(`${entryPath}.gz`, gzipSync(data, { level: 9 }));
+          writeFileSync(`${entryPath}.br`, brotliCompressSync(data));
+        }
+      }
+    });
+  };
+
+  return {
+    name: "precompress",
+    apply: "build",
+    closeBundle: () => precompressDir(resolve(__dirname, outDir)),
+  };
+}
+
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), copyFontLicenses(), precompress()],
   resolve: {
     alias: {
       "@": resolve(__dirname, "./src"),
@@ -22,7 +84,7 @@ export default defineConfig({
     },
   },
   build: {
-    outDir: "paramview/static",
+    outDir,
     chunkSizeWarningLimit: 1000,
     rollupOptions: {
       plugins: [